@@ -4,8 +4,17 @@ Main application file with UI components and views
 """
 
 import streamlit as st
-import streamlit.components.v1 as components
-from src.algorithms import AlignmentScoring, get_aligner
+from config import (
+    ALIGNMENT_MEMORY_BUDGET,
+    INCREMENTAL_MEMORY_BUDGET,
+    MATRIX_VIEW_MAX_CELLS,
+    MATRIX_VIEW_MAX_SIDE,
+    SCORING_SCHEMES,
+)
+from src.algorithms import AlignmentScoring, warmup
+from src.heatmap import matrix_view
+from src.incremental import IncrementalAligner
+from src.planner import AlignmentPlanner
 from ui import (
     AlignmentStats,
     AlignmentVisualizer,
@@ -42,6 +51,20 @@ def render_sidebar():
     return algorithm, AlignmentScoring(match_score, mismatch_score, gap_penalty)
 
 
+def session_aligner(scoring, local):
+    """
+    Incremental aligner of this session, which keeps the last DP matrices so
+    that re-running after editing the end of a sequence only fills new cells
+    """
+    key = (local, scoring.match, scoring.mismatch, scoring.gap)
+    cached = st.session_state.get("incremental_aligner")
+    if cached is None or cached[0] != key:
+        # New scoring or algorithm: the previous matrices are stale
+        cached = (key, IncrementalAligner(scoring, local=local, memory_budget=INCREMENTAL_MEMORY_BUDGET))
+        st.session_state["incremental_aligner"] = cached
+    return cached[1]
+
+
 def render_sequence_inputs():
     """Render input fields for sequences"""
     col1, col2 = st.columns(2)
@@ -109,8 +132,31 @@ def render_alignment_result(aligned_seq1, aligned_seq2, stats, algorithm_name):
         st.write(f"**Alignment Length:** {metrics['length']}")
 
 
+def render_matrix_view(seq1, seq2, scoring, aligned_seq1, aligned_seq2, local):
+    """Render the downsampled DP matrix with the traceback path"""
+    with st.expander("🔥 DP Matrix View"):
+        if scoring.affine:
+            st.info("The matrix view is only available for linear gap penalties.")
+            return
+        cells = (len(seq1) + 1) * (len(seq2) + 1)
+        if cells > MATRIX_VIEW_MAX_CELLS:
+            st.info(f"The matrix view is limited to {MATRIX_VIEW_MAX_CELLS:,} cells ({cells:,} requested).")
+            return
+
+        view = matrix_view(seq1, seq2, scoring, aligned_seq1, aligned_seq2,
+                           local=local, max_side=MATRIX_VIEW_MAX_SIDE)
+        rows, cols = view.shape
+        st.image(
+            view.to_rgb(min_side=MATRIX_VIEW_MAX_SIDE),
+            caption=(f"{len(seq1) + 1}x{len(seq2) + 1} matrix pooled to {rows}x{cols} "
+                     f"(max per block); traceback path in red"),
+        )
+
+
 def render_explanation(): 
     """Render explantion  section"""
+    import streamlit.components.v1 as components
+    
     url = "https://experiments.mostafa.io/needleman-wunsch/"
     with st.expander("💡  Algorithm Understanding"):
         # Crear un iframe
@@ -153,6 +199,12 @@ def render_footer():
 # MAIN APPLICATION
 # ============================================================================
 
+@st.cache_resource
+def warmup_aligners():
+    """Build scoring tables and compile kernels once per server process"""
+    warmup(AlignmentScoring.from_scheme(scheme) for scheme in SCORING_SCHEMES.values())
+
+
 def main():
     """Main application entry point"""
     # Page configuration
@@ -161,6 +213,7 @@ def main():
         page_icon="🧬",
         layout="wide"
     )
+    warmup_aligners()
 
    
     # Header
@@ -180,18 +233,28 @@ def main():
         else:
             with st.spinner("Aligning sequences..."):
                 try:
+                    planner = AlignmentPlanner(memory_budget=ALIGNMENT_MEMORY_BUDGET)
                     if "Needleman-Wunsch" in algorithm_choice:
-                        aligner = get_aligner("needleman-wunsch", scoring)
+                        plan = planner.plan("needleman-wunsch", scoring, len(seq1), len(seq2))
                         algo_name = "Needleman-Wunsch (Global Alignment)"
                     else:
-                        aligner = get_aligner("smith-waterman", scoring)
+                        plan = planner.plan("smith-waterman", scoring, len(seq1), len(seq2))
                         algo_name = "Smith-Waterman (Local Alignment)"
                     
-                    score, aligned_seq1, aligned_seq2 = aligner.align(seq1, seq2)
+                    local = "Smith-Waterman" in algo_name
+                    if plan.strategy == "full":
+                        aligner = session_aligner(scoring, local)
+                        score, aligned_seq1, aligned_seq2 = aligner.align(seq1, seq2)
+                        reused = aligner.reused_cells / ((len(seq1) + 1) * (len(seq2) + 1))
+                        st.caption(f"⚙️ Engine: {plan.describe()} · ♻️ {reused:.0%} of the matrix reused")
+                    else:
+                        score, aligned_seq1, aligned_seq2 = plan.align(seq1, seq2)
+                        st.caption(f"⚙️ Engine: {plan.describe()}")
                     
                     stats = AlignmentStats(aligned_seq1, aligned_seq2, score)
                     
                     render_alignment_result(aligned_seq1, aligned_seq2, stats, algo_name)
+                    render_matrix_view(seq1, seq2, scoring, aligned_seq1, aligned_seq2, local)
                     
                 except Exception as e:
                     st.error(f"❌ Error during alignment: {str(e)}")
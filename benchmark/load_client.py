@@ -0,0 +1,93 @@
+"""
+Load-test client for the alignment service (src/service.py)
+
+Start the service, then run for example:
+    python -m src.service --port 8765 --workers 4
+    python benchmark/load_client.py --port 8765 --clients 16 --requests 50 --length 150
+
+Each client thread sends random DNA pairs (optionally several per request as a
+streamed batch) and the script reports throughput and latency percentiles.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+def post_align(conn, body):
+    """Send one request; returns (status, results) reading NDJSON streams line by line"""
+    conn.request("POST", "/align", body=json.dumps(body), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    if response.getheader("Content-Type") == "application/x-ndjson":
+        results = [json.loads(line) for line in response if line.strip()]
+    else:
+        results = [json.loads(response.read())]
+    return response.status, results
+
+
+def run_client(args, seed, latencies, statuses):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(args.host, args.port, timeout=args.timeout)
+    for _ in range(args.requests):
+        pairs = [
+            {"seq1": random_dna(args.length * 2, rng), "seq2": random_dna(args.length, rng)}
+            for _ in range(args.batch)
+        ]
+        body = {"algorithm": args.algorithm, "score_only": args.score_only}
+        if args.batch == 1:
+            body.update(pairs[0])
+        else:
+            body["pairs"] = pairs
+
+        start = time.perf_counter()
+        status, _ = post_align(conn, body)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(status)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the BioSeqAligner service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--batch", type=int, default=1, help="Pairs per request")
+    parser.add_argument("--length", type=int, default=150, help="Query length (target is twice as long)")
+    parser.add_argument("--algorithm", default="local")
+    parser.add_argument("--score-only", action="store_true")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    latencies, statuses = [], []
+    threads = [
+        threading.Thread(target=run_client, args=(args, seed, latencies, statuses))
+        for seed in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pairs = len(latencies) * args.batch
+    print(f"Requests: {len(latencies)} ({pairs} pairs) in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s, {pairs / elapsed:.1f} pairs/s")
+    print(f"Latency p50: {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95: {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f} ms, "
+          f"max: {latencies[-1] * 1000:.1f} ms")
+    print("Status codes:", {code: statuses.count(code) for code in sorted(set(statuses))})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold-start benchmark for the alignment library
+
+Every measurement runs in a fresh interpreter, as a new Streamlit or service
+process would:
+    python benchmark/startup_benchmark.py --runs 5 --length 200
+
+Reported (median over the runs):
+    import        time to import src.algorithms
+    first align   import + first local alignment, without warm-up
+    warmup        time spent in src.algorithms.warmup()
+    warm align    first local alignment after warm-up
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, random, sys, time
+start = time.perf_counter()
+from src.algorithms import AlignmentScoring, get_aligner, warmup
+imported = time.perf_counter()
+
+rng = random.Random(0)
+seq1 = ''.join(rng.choice("ACGT") for _ in range({length} * 2))
+seq2 = ''.join(rng.choice("ACGT") for _ in range({length}))
+aligner = get_aligner("local", AlignmentScoring())
+
+warmup_time = 0.0
+if {warm}:
+    before = time.perf_counter()
+    warmup()
+    warmup_time = time.perf_counter() - before
+
+before = time.perf_counter()
+aligner.align(seq1, seq2)
+end = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "first_align": end - start - warmup_time,
+    "warmup": warmup_time,
+    "align": end - before,
+    "numba_loaded": "numba" in sys.modules,
+}}))
+"""
+
+
+def run_probe(length, warm):
+    """Run PROBE in a new interpreter and return its measurements"""
+    code = PROBE.format(length=length, warm=warm)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_ms(samples, key):
+    return statistics.median(sample[key] for sample in samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for BioSeqAligner")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode")
+    parser.add_argument("--length", type=int, default=200, help="Query length (target is twice as long)")
+    args = parser.parse_args()
+
+    cold = [run_probe(args.length, warm=False) for _ in range(args.runs)]
+    warm = [run_probe(args.length, warm=True) for _ in range(args.runs)]
+
+    print(f"Median over {args.runs} fresh processes, {args.length}x{args.length * 2} local alignment")
+    print(f"import src.algorithms:        {median_ms(cold, 'import'):8.1f} ms")
+    print(f"import + first align (cold):  {median_ms(cold, 'first_align'):8.1f} ms")
+    print(f"warmup():                     {median_ms(warm, 'warmup'):8.1f} ms")
+    print(f"first align after warmup:     {median_ms(warm, 'align'):8.1f} ms")
+    print(f"Numba loaded at first align:  {cold[0]['numba_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
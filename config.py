@@ -4,11 +4,12 @@ Contains default settings and configuration options for the application
 """
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
+# Load environment variables from .env file (dotenv is only imported when one exists)
 env_path = Path(__file__).parent / '.env'
-load_dotenv(dotenv_path=env_path)
+if env_path.exists():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=env_path)
 
 # NCBI Entrez configuration
 ENTREZ_EMAIL = os.getenv('ENTREZ_EMAIL', 'default@example.com')
@@ -16,6 +17,17 @@ ENTREZ_EMAIL = os.getenv('ENTREZ_EMAIL', 'default@example.com')
 # Data paths
 ECOLI_PATH = os.getenv('ECOLI_PATH', 'data/ecoli_k12_mg1655.fasta')
 
+# Memory an alignment may use; the planner picks a leaner engine above it
+ALIGNMENT_MEMORY_BUDGET = int(os.getenv('ALIGNMENT_MEMORY_BUDGET', 512 * 2**20))
+
+# DP matrices kept per session for incremental re-alignment after edits
+INCREMENTAL_MEMORY_BUDGET = int(os.getenv('INCREMENTAL_MEMORY_BUDGET', 128 * 2**20))
+
+# DP matrix view: pixels per side of the pooled image, and the largest matrix
+# it recomputes (the pooling pass streams every cell once)
+MATRIX_VIEW_MAX_SIDE = 256
+MATRIX_VIEW_MAX_CELLS = int(os.getenv('MATRIX_VIEW_MAX_CELLS', 50_000_000))
+
 # Default scoring parameters
 DEFAULT_MATCH_SCORE = 1
 DEFAULT_MISMATCH_SCORE = -1
@@ -46,6 +58,29 @@ SCORING_SCHEMES = {
         "mismatch": -3,
         "gap": -2,
         "description": "Similar to BLAST default parameters"
+    },
+    "Edit distance": {
+        "match": 0,
+        "mismatch": -1,
+        "gap": -1,
+        "description": "Unit-cost edits (score = -edit distance), uses the bit-parallel engine"
+    },
+    "Affine": {
+        "match": 1,
+        "mismatch": -1,
+        "gap_open": -5,
+        "gap_extend": -1,
+        "description": "Affine gaps: opening a gap costs more than extending it"
+    },
+    "BLOSUM62": {
+        "matrix": "BLOSUM62",
+        "gap": -4,
+        "description": "Protein scoring with the BLOSUM62 substitution matrix"
+    },
+    "PAM250": {
+        "matrix": "PAM250",
+        "gap": -5,
+        "description": "Protein scoring for distant homologs with the PAM250 matrix"
     }
 }
 
@@ -78,5 +113,10 @@ ALGORITHMS = {
         "name": "Smith-Waterman (Local)",
         "type": "smith-waterman",
         "description": "Local alignment - best for finding similar regions"
+    },
+    "Semi-Global": {
+        "name": "Semi-Global (Query in Target)",
+        "type": "semi-global",
+        "description": "End gaps are free - best for placing a read inside a reference window"
     }
 }
@@ -3,31 +3,203 @@ Sequence Alignment Algorithms Module
 Contains implementations of Needleman-Wunsch and Smith-Waterman algorithms
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import numpy as np
 
+from src import kernels
+from src.bitparallel import edit_distance
+from src.matrices import flat_table, load_matrix
+
 
 class AlignmentScoring:
-    """Scoring parameters for sequence alignment"""
+    """
+    Scoring parameters for sequence alignment
     
-    def __init__(self, match=1, mismatch=-1, gap=-2):
+    Residue scores come either from a flat match/mismatch scheme or from a
+    named substitution matrix (e.g. "BLOSUM62" for proteins). Both are exposed
+    as an integer lookup table indexed by residue byte code.
+    """
+    
+    def __init__(self, match=1, mismatch=-1, gap=-2, matrix=None, gap_open=None, gap_extend=None):
         self.match = match
         self.mismatch = mismatch
         self.gap = gap
+        self.matrix = matrix
+        if matrix is not None:
+            load_matrix(matrix)  # Validate the name and warm the cache
+        
+        # Affine gaps: a gap of length k costs gap_open + (k-1) * gap_extend
+        self.gap_open = gap_open
+        self.gap_extend = gap if gap_extend is None else gap_extend
+        if gap_open is not None and gap_open > self.gap_extend:
+            raise ValueError("gap_open must not be smaller than gap_extend as a penalty")
+        if gap_open is not None and gap_open == self.gap_extend:
+            self.gap = gap_open  # Equal penalties degenerate to a linear gap
+    
+    @property
+    def affine(self):
+        """True when gaps are scored with separate open/extend penalties"""
+        return self.gap_open is not None and self.gap_open != self.gap_extend
+    
+    def gap_cost(self, length):
+        """Score of a single gap of the given length"""
+        if length == 0:
+            return 0
+        if self.gap_open is None:
+            return length * self.gap
+        return self.gap_open + (length - 1) * self.gap_extend
+    
+    @classmethod
+    def from_scheme(cls, scheme):
+        """Build scoring from a config.SCORING_SCHEMES entry"""
+        return cls(**{k: v for k, v in scheme.items() if k != "description"})
+    
+    @property
+    def table(self):
+        """(256, 256) substitution lookup table (module-level cached)"""
+        if self.matrix is not None:
+            return load_matrix(self.matrix)
+        return flat_table(self.match, self.mismatch)
+    
+    def edit_cost(self, free_end_gaps=False):
+        """
+        Score lost per edit when this scheme ranks alignments like edit distance
+        
+        A global score equals matches*match + mismatches*mismatch + gaps*gap,
+        which is (len1 + len2) * match/2 - cost * edits exactly when
+        match - mismatch == match/2 - gap. With free end gaps the aligned
+        length varies, so match must also be 0.
+        
+        Returns:
+            int or None: Cost of one edit, or None if the scheme is not equivalent
+        """
+        if self.matrix is not None or self.affine:
+            return None
+        cost = self.match - self.mismatch
+        if cost <= 0 or self.match != 2 * (self.mismatch - self.gap):
+            return None
+        if free_end_gaps and self.match != 0:
+            return None
+        return cost
     
     def similarity(self, x, y):
         """Calculate similarity score between two characters"""
+        if self.matrix is not None:
+            return int(self.table[ord(x), ord(y)])
         return self.match if x == y else self.mismatch
 
 
+def _cell(pos):
+    """DP cell as a tuple of Python ints"""
+    return int(pos[0]), int(pos[1])
+
+
 class SequenceAligner:
     """Base class for sequence alignment algorithms"""
     
+    STRANDS = ("+", "-", "both")
+    
     def __init__(self, scoring: AlignmentScoring):
         self.scoring = scoring
     
     def align(self, seq1, seq2):
         """Perform sequence alignment. To be implemented by subclasses."""
         raise NotImplementedError("Subclasses must implement align method")
+    
+    def score(self, seq1, seq2):
+        """Return only the alignment score. Subclasses may avoid the traceback."""
+        return self.align(seq1, seq2)[0]
+    
+    def align_span(self, seq1, seq2):
+        """
+        Perform the alignment and report the cell where its traceback starts
+        
+        The aligned residues are the k residues of seq1 ending at i and the l
+        residues of seq2 ending at j, so their coordinates come from the DP
+        rather than from searching the sequences. Global alignments end at
+        (len(seq1), len(seq2)); local and semi-global engines override this.
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, (i, j))
+        """
+        return self.align(seq1, seq2) + ((len(seq1), len(seq2)),)
+    
+    def align_span_strands(self, seq1, seq2, strand="both", executor=None):
+        """
+        align_strands counterpart of align_span
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, (i, j), strand), with j on
+                the orientation of seq2 that was aligned
+        """
+        result, best_strand = self._best_strand(self.align_span, seq1, seq2, strand, executor)
+        return result + (best_strand,)
+    
+    def prepare(self, seq):
+        """
+        Prepare a query reused against many targets (see PreparedSequence)
+        
+        Pass the result as seq2 (the query side of one-vs-many runs) to any aligner.
+        """
+        return prepare(seq)
+    
+    def matrix_dtype(self, seq1, seq2):
+        """Integer dtype of the DP matrix for this pair (narrowest that cannot overflow)"""
+        return score_dtype(len(seq1), len(seq2), self.scoring)
+    
+    def align_strands(self, seq1, seq2, strand="both", executor=None):
+        """
+        Align seq2 as given and/or reverse-complemented against seq1
+        
+        Args:
+            seq1: First sequence / reference (string or list)
+            seq2: Second sequence / query, which may come from either strand
+            strand: "+" (as given), "-" (reverse complement) or "both"
+            executor: Optional concurrent.futures executor to run both strands in parallel
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, strand) for the best-scoring strand
+        """
+        result, best_strand = self._best_strand(self.align, seq1, seq2, strand, executor)
+        return result + (best_strand,)
+    
+    def score_strands(self, seq1, seq2, strand="both", executor=None):
+        """
+        Score-only counterpart of align_strands
+        
+        Returns:
+            tuple: (score, strand) for the best-scoring strand
+        """
+        return self._best_strand(self.score, seq1, seq2, strand, executor)
+    
+    def _best_strand(self, method, seq1, seq2, strand, executor):
+        """Run method on the requested orientations of seq2 and keep the best (ties go to '+')"""
+        if strand not in self.STRANDS:
+            raise ValueError(f"Unknown strand: {strand}")
+        
+        candidates = []
+        if strand in ("+", "both"):
+            candidates.append(("+", seq2))
+        if strand in ("-", "both"):
+            candidates.append(("-", reverse_complement(seq2)))
+        
+        if executor is not None and len(candidates) > 1:
+            futures = [executor.submit(method, seq1, query) for _, query in candidates]
+            outputs = [future.result() for future in futures]
+        else:
+            outputs = [method(seq1, query) for _, query in candidates]
+        
+        scores = [out[0] if isinstance(out, tuple) else out for out in outputs]
+        best = scores.index(max(scores))
+        return outputs[best], candidates[best][0]
+    
+    def _check_linear_gaps(self):
+        """Raise for engines that only implement linear gap penalties"""
+        if self.scoring.affine:
+            raise ValueError(f"{type(self).__name__} only supports linear gap penalties")
 
 
 class NeedlemanWunsch(SequenceAligner):
@@ -77,28 +249,26 @@ class NeedlemanWunsch(SequenceAligner):
         Returns:
             tuple: (score, aligned_seq1, aligned_seq2)
         """
-        a = list(seq1) if isinstance(seq1, str) else seq1
-        b = list(seq2) if isinstance(seq2, str) else seq2
+        fast = _ungapped_alignment(seq1, seq2, self.scoring)
+        if fast is not None:
+            return fast
+        
+        a = _residues(seq1)
+        b = _residues(seq2)
         
         n, m = len(a), len(b)
         
-        # Initialize DP matrix
-        F = np.zeros((n+1, m+1), dtype=int)
-        F[1:, 0] = np.arange(1, n+1) * self.scoring.gap
-        F[0, 1:] = np.arange(1, m+1) * self.scoring.gap
+        if self.scoring.affine:
+            score, end_pos, P = _affine_fill(_encode(seq1), _encode(seq2), self.scoring)
+            return (score,) + _affine_traceback(P, a, b, end_pos)
         
-        # Fill DP matrix
-        for i in range(1, n+1):
-            for j in range(1, m+1):
-                diag = F[i-1, j-1] + self.scoring.similarity(a[i-1], b[j-1])
-                up = F[i-1, j] + self.scoring.gap
-                left = F[i, j-1] + self.scoring.gap
-                F[i, j] = max(diag, up, left)
+        # Fill DP matrix row by row over the integer-encoded sequences
+        F = _fill_matrix(_encode(seq1), _encode(seq2), self.scoring)
         
         # Traceback to get alignment
         aligned_a, aligned_b = self._traceback(F, a, b)
         
-        return F[n, m], aligned_a, aligned_b
+        return int(F[n, m]), aligned_a, aligned_b
 
 
 class SmithWaterman(SequenceAligner):
@@ -152,36 +322,971 @@ class SmithWaterman(SequenceAligner):
         Returns:
             tuple: (score, aligned_seq1, aligned_seq2)
         """
-        a = list(seq1) if isinstance(seq1, str) else seq1
-        b = list(seq2) if isinstance(seq2, str) else seq2
+        return self.align_span(seq1, seq2)[:3]
+    
+    def align_span(self, seq1, seq2):
+        """Smith-Waterman alignment and its end cell, (0, 0) when nothing aligns"""
+        fast = _ungapped_alignment(seq1, seq2, self.scoring, local=True)
+        if fast is not None:
+            return fast + ((len(seq1), len(seq2)),)
         
-        n, m = len(a), len(b)
+        a = _residues(seq1)
+        b = _residues(seq2)
         
-        # Initialize DP matrix
-        F = np.zeros((n+1, m+1), dtype=int)
-        max_score = 0
-        max_pos = (0, 0)
+        if self.scoring.affine:
+            score, end_pos, P = _affine_fill(_encode(seq1), _encode(seq2), self.scoring, local=True)
+            if score == 0:
+                return 0, '', '', (0, 0)
+            return (score,) + _affine_traceback(P, a, b, end_pos) + (_cell(end_pos),)
         
-        # Fill DP matrix
-        for i in range(1, n+1):
-            for j in range(1, m+1):
-                # Can restart alignment (key difference from Needleman-Wunsch)
-                F[i, j] = max(
-                    0,
-                    F[i-1, j-1] + self.scoring.similarity(a[i-1], b[j-1]),
-                    F[i-1, j] + self.scoring.gap,
-                    F[i, j-1] + self.scoring.gap
-                )
-                
-                # Track maximum score position
-                if F[i, j] > max_score:
-                    max_score = F[i, j]
-                    max_pos = (i, j)
+        # Fill DP matrix (values clamped at 0: alignment can restart anywhere)
+        F = _fill_matrix(_encode(seq1), _encode(seq2), self.scoring, local=True)
+        
+        # First maximum in row-major order
+        max_pos = np.unravel_index(F.argmax(), F.shape)
+        max_score = int(F[max_pos])
         
         # Traceback from maximum score
         aligned_a, aligned_b = self._traceback(F, a, b, max_pos)
         
-        return max_score, aligned_a, aligned_b
+        return max_score, aligned_a, aligned_b, _cell(max_pos)
+
+
+def encode(seq):
+    """
+    Encode a sequence as a uint8 array of byte codes
+    
+    Encoded arrays are accepted by every aligner, so a sequence reused across
+    many alignments only needs to be converted once.
+    """
+    return _encode(seq)
+
+
+def _encode(seq):
+    """Encode a sequence (string or list of characters) as a uint8 array"""
+    if isinstance(seq, np.ndarray):
+        return seq
+    if isinstance(seq, str):
+        return np.frombuffer(seq.encode('ascii'), dtype=np.uint8)
+    return np.fromiter((ord(c) for c in seq), dtype=np.uint8, count=len(seq))
+
+
+def _residues(seq):
+    """Return an indexable sequence of characters, used by the tracebacks"""
+    if isinstance(seq, PreparedSequence) and seq._text is not None:
+        return seq._text
+    if isinstance(seq, np.ndarray):
+        return seq.tobytes().decode('ascii')
+    return list(seq) if isinstance(seq, str) else seq
+
+
+class PreparedSequence(np.ndarray):
+    """
+    Encoded sequence with the per-query work cached for reuse across targets
+    
+    It is a uint8 array of byte codes, so every engine and batch function
+    accepts it wherever a sequence is expected. On top of the encoding it
+    keeps the text used by the tracebacks, its reverse complement and, per
+    substitution table, the score row of each residue against it (the query
+    profile read by the NumPy fills instead of gathering from the table).
+    Slices and copies are plain encoded sequences without the caches.
+    
+    Create with prepare() or SequenceAligner.prepare().
+    """
+    
+    def __new__(cls, seq):
+        codes = np.array(_encode(seq), dtype=np.uint8)
+        codes.flags.writeable = False
+        prepared = codes.view(cls)
+        prepared._text = codes.tobytes().decode('ascii')
+        prepared._profiles = {}
+        prepared._reverse = None
+        prepared.digest = sequence_digest(codes)
+        return prepared
+    
+    def __array_finalize__(self, obj):
+        # Views and results of operations do not inherit the caches
+        self._text = None
+        self._profiles = None
+        self._reverse = None
+        self.digest = None
+    
+    def __reduce__(self):
+        # Pickle as the text so that process pools rebuild a prepared sequence
+        return PreparedSequence, (self.tobytes().decode('ascii'),)
+    
+    def __str__(self):
+        return self._text if self._text is not None else self.tobytes().decode('ascii')
+    
+    def reverse_complement(self):
+        """Prepared reverse complement (computed once)"""
+        if self._reverse is None:
+            self._reverse = PreparedSequence(_COMPLEMENT[np.asarray(self)[::-1]])
+            self._reverse._reverse = self
+        return self._reverse
+    
+    def score_rows(self, table):
+        """
+        Lazily filled {residue code: table[code][self]} for a substitution table
+        
+        Returns None for views, which have no cache.
+        """
+        if self._profiles is None:
+            return None
+        entry = self._profiles.get(id(table))
+        if entry is None or entry[0] is not table:
+            # The table is kept in the entry so that its id cannot be reused
+            entry = (table, {})
+            self._profiles[id(table)] = entry
+        return entry[1]
+
+
+def sequence_digest(seq):
+    """Digest of the residues of a sequence, used to key prepared sequences"""
+    return hashlib.blake2b(_encode(seq).tobytes(), digest_size=16).hexdigest()
+
+
+PREPARED_CACHE_SIZE = 256
+_prepared = OrderedDict()
+_prepared_lock = threading.Lock()
+
+
+def prepare(seq):
+    """
+    Return the PreparedSequence of a sequence from a bounded LRU cache
+    
+    Sequences are keyed by digest, so preparing the same query again (even
+    from a different string object) returns the cached object with its
+    profiles and reverse complement.
+    
+    Args:
+        seq: String, list, encoded array or PreparedSequence
+    """
+    if isinstance(seq, PreparedSequence) and seq._profiles is not None:
+        return seq
+    digest = sequence_digest(seq)
+    with _prepared_lock:
+        prepared = _prepared.get(digest)
+        if prepared is not None:
+            _prepared.move_to_end(digest)
+            return prepared
+    
+    prepared = PreparedSequence(seq)
+    with _prepared_lock:
+        prepared = _prepared.setdefault(digest, prepared)
+        _prepared.move_to_end(digest)
+        while len(_prepared) > PREPARED_CACHE_SIZE:
+            _prepared.popitem(last=False)
+    return prepared
+
+
+# Largest diagonal shift examined when bounding the gapped alternatives
+UNGAPPED_MAX_SHIFT = 8
+# Most alternating-sign runs of the gain profile scanned in Python
+UNGAPPED_MAX_RUNS = 4096
+
+
+def _max_gap_cost(length, scoring):
+    """Highest total score of gaps covering length residues of one sequence"""
+    # Splitting into r runs scores r * open + (length - r) * extend, linear in r
+    return max(scoring.gap_cost(length), length * scoring.gap_cost(1))
+
+
+def _max_block_gain(gain, penalty):
+    """
+    Best total of one or more disjoint blocks of consecutive rows
+    
+    Each block scores the sum of its row gains plus the penalty. Gains are
+    summed over runs of equal sign first: a block that helps the total starts
+    and ends on positive runs, or is a single row when every row loses.
+    
+    Returns:
+        float: The maximum, or inf when there are too many runs to scan
+    """
+    positive = gain > 0
+    starts = np.flatnonzero(np.diff(positive, prepend=~positive[0]))
+    if len(starts) > UNGAPPED_MAX_RUNS:
+        return float("inf")
+    inside = done = float("-inf")
+    for run in np.add.reduceat(gain, starts).tolist():
+        inside = max(inside, penalty + max(done, 0)) + run
+        done = max(done, inside)
+    return max(done, penalty + int(gain.max()))
+
+
+def _ungapped_alignment(seq1, seq2, scoring, local=False):
+    """
+    Fast path for equal-length pairs whose ungapped alignment is provably optimal
+    
+    A different global alignment leaves the main diagonal on blocks of
+    consecutive rows and pays at least one gap in each sequence per block,
+    and s gaps in each to reach diagonal +-s. Within a block, a row scores at
+    most the best substitution of its residue against the residues of seq2
+    within the shift reached (or 0 when it is gapped), so the gain of every
+    such alternative over the ungapped alignment is bounded by a maximum over
+    blocks of per-row gains. A different local alignment has at most n-1
+    aligned pairs, with best the highest substitution score between the
+    residues present. When the ungapped score beats the bound strictly the
+    optimum is unique, so the DP traceback would return the same alignment.
+    
+    Args:
+        seq1: First sequence (string, list or encoded array)
+        seq2: Second sequence
+        scoring: AlignmentScoring object
+        local: Check against the local (Smith-Waterman) bound
+    
+    Returns:
+        tuple or None: (score, aligned_seq1, aligned_seq2), or None if the DP is needed
+    """
+    if len(seq1) != len(seq2) or len(seq1) == 0 or scoring.gap_cost(1) > 0:
+        return None
+    a, b = _encode(seq1), _encode(seq2)
+    table = scoring.table
+    
+    present_a = np.flatnonzero(np.bincount(a, minlength=256))
+    present_b = np.flatnonzero(np.bincount(b, minlength=256))
+    best = int(table[np.ix_(present_a, present_b)].max())
+    if best < 0:
+        return None
+    
+    diagonal = table[a, b].astype(np.int64)
+    score = int(diagonal.sum())
+    n = len(a)
+    found = score, ''.join(_residues(seq1)), ''.join(_residues(seq2))
+    if local:
+        return found if score > (n-1) * best else None
+    if score > (n-1) * best + 2 * scoring.gap_cost(1):
+        return found
+    if scoring.gap_cost(2) > scoring.gap_cost(1):
+        return None  # Longer gaps would score better: no bound on far shifts
+    
+    # Blocks reaching beyond shift limit: every row gains at most best - D[i]
+    far = n * best - score
+    limit = next(
+        (shift for shift in range(1, UNGAPPED_MAX_SHIFT + 1)
+         if far + 2 * _max_gap_cost(shift + 1, scoring) < 0),
+        None,
+    )
+    if limit is None:
+        return None
+    
+    # Blocks within the limit: best substitution of each row over shifts 1..limit
+    nearby = np.zeros(n, dtype=np.int64)
+    for shift in range(1, min(limit, n - 1) + 1):
+        np.maximum(nearby[:-shift], table[a[:-shift], b[shift:]], out=nearby[:-shift])
+        np.maximum(nearby[shift:], table[a[shift:], b[:-shift]], out=nearby[shift:])
+    if _max_block_gain(nearby - diagonal, 2 * scoring.gap_cost(1)) >= 0:
+        return None
+    return found
+
+
+# Complement lookup table over byte codes (IUPAC aware, case preserving)
+_COMPLEMENT = np.arange(256, dtype=np.uint8)
+for _x, _y in zip("ACGTURYKMBVDHacgturykmbvdh", "TGCAAYRMKVBHDtgcaayrmkvbhd"):
+    _COMPLEMENT[ord(_x)] = ord(_y)
+
+
+def reverse_complement(seq):
+    """
+    Reverse-complement a nucleotide sequence through the byte lookup table
+    
+    Returns:
+        np.ndarray: Encoded reverse complement, accepted directly by every aligner
+            (the cached PreparedSequence for a prepared input)
+    """
+    if isinstance(seq, PreparedSequence) and seq._profiles is not None:
+        return seq.reverse_complement()
+    return _COMPLEMENT[_encode(seq)[::-1]]
+
+
+def _fill_row(prev, sub, first, gap, offsets, local=False):
+    """
+    Compute one row of the linear-gap DP matrix from the previous row
+    
+    The horizontal (left) dependency is resolved with a running maximum:
+    F[j] = max_k (H[k] + (j-k)*gap) = j*gap + max_k (H[k] - k*gap),
+    so the whole row is computed with NumPy operations.
+    
+    Args:
+        prev: Previous DP row (length m+1)
+        sub: Substitution scores of the current residue against seq2 (length m)
+        first: Value of the first column for this row
+        gap: Linear gap penalty
+        offsets: Precomputed np.arange(m+1) * gap
+        local: Clamp values at zero (Smith-Waterman)
+    
+    Returns:
+        np.ndarray: Current DP row
+    """
+    row = np.empty_like(prev)
+    row[0] = first
+    np.maximum(prev[:-1] + sub, prev[1:] + gap, out=row[1:])
+    if local:
+        np.maximum(row, 0, out=row)
+    row -= offsets
+    np.maximum.accumulate(row, out=row)
+    row += offsets
+    return row
+
+
+def _substitution_rows(a, b, scoring):
+    """Yield the substitution score vector of each residue of a against b"""
+    table = scoring.table
+    rows = b.score_rows(table) if isinstance(b, PreparedSequence) else None
+    if rows is None:
+        for x in a:
+            yield table[x][b]
+        return
+    
+    # Query profile of a prepared b: one row per distinct residue, reused by every target
+    for x in a:
+        row = rows.get(x)
+        if row is None:
+            row = table[x][np.asarray(b)]
+            row.flags.writeable = False
+            rows[x] = row
+        yield row
+
+
+def score_bounds(n, m, scoring):
+    """
+    Bounds of every value computed while filling an n x m linear-gap DP matrix
+    
+    A cell is at least the score of the all-gap path and at most min(n, m)
+    best substitutions; the bounds are widened by one step for the candidates
+    compared in each cell and by the j*gap shift used in _fill_row.
+    
+    Args:
+        n: Length of the first sequence (matrix rows)
+        m: Length of the second sequence (matrix columns)
+        scoring: AlignmentScoring object
+    
+    Returns:
+        tuple: (lowest, highest) possible intermediate value
+    """
+    table = scoring.table
+    best = max(int(table.max()), 0)
+    worst = min(int(table.min()), 0)
+    gap = scoring.gap
+    shift = m * abs(gap)
+    
+    low = (n + m) * min(gap, 0) + min(worst, gap) - shift
+    high = min(n, m) * best + (n + m) * max(gap, 0) + max(best, gap) + shift
+    return low, high
+
+
+# Candidate score dtypes, narrowest first
+SCORE_DTYPES = (np.int16, np.int32, np.int64)
+
+
+def score_dtype(n, m, scoring):
+    """
+    Narrowest integer dtype that cannot overflow for an n x m linear-gap fill
+    
+    Returns:
+        np.dtype: int16, int32 or int64
+    """
+    low, high = score_bounds(n, m, scoring)
+    for dtype in SCORE_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    raise OverflowError(f"Scores of a {n}x{m} alignment do not fit in 64-bit integers")
+
+
+def _iter_rows(a, b, scoring, local=False, free_a=False, free_b=False):
+    """
+    Yield the rows of the linear-gap DP matrix one at a time, starting at row 0
+    
+    Rows use the narrowest dtype that is safe for the pair (see score_dtype).
+    
+    Args:
+        a: Encoded first sequence (matrix rows)
+        b: Encoded second sequence (matrix columns)
+        scoring: AlignmentScoring object
+        local: Clamp values at zero (Smith-Waterman)
+        free_a: Leading residues of a can be skipped without penalty
+        free_b: Leading residues of b can be skipped without penalty
+    """
+    gap = scoring.gap
+    dtype = score_dtype(len(a), len(b), scoring)
+    offsets = np.arange(len(b)+1, dtype=dtype) * dtype.type(gap)
+    
+    row = np.zeros(len(b)+1, dtype=dtype) if local or free_b else offsets.copy()
+    yield row
+    
+    for i, sub in enumerate(_substitution_rows(a, b, scoring), start=1):
+        first = 0 if local or free_a else i * gap
+        row = _fill_row(row, sub, first, gap, offsets, local)
+        yield row
+
+
+def _fill_matrix(a, b, scoring, local=False, free_a=False, free_b=False):
+    """
+    Fill the full linear-gap DP matrix for encoded sequences a and b
+    
+    Returns:
+        np.ndarray: (n+1, m+1) score matrix, identical to the cell-by-cell fill,
+            stored in the narrowest safe dtype (see score_dtype)
+    """
+    F = np.empty((len(a)+1, len(b)+1), dtype=score_dtype(len(a), len(b), scoring))
+    
+    if kernels.jit_enabled():
+        # Compiled fill, runs without holding the GIL
+        return kernels.fill_linear(
+            _encode(a), _encode(b), scoring.table, scoring.gap, local, free_a, free_b, F
+        )
+    
+    for i, row in enumerate(_iter_rows(a, b, scoring, local, free_a, free_b)):
+        F[i] = row
+    return F
+
+
+# Traceback pointer layout for affine fills (one byte per cell):
+# bits 0-1 give the source of H (diagonal, vertical gap, horizontal gap, start),
+# bit 2 / bit 3 flag that the horizontal / vertical gap state was extended.
+_FROM_DIAG, _FROM_UP, _FROM_LEFT, _STOP = 0, 1, 2, 3
+_EXTEND_LEFT, _EXTEND_UP = 4, 8
+_NEG_INF = np.iinfo(np.int64).min // 4
+
+
+def _affine_fill(a, b, scoring, local=False):
+    """
+    Gotoh three-state fill for affine gaps, vectorized row by row
+    
+    Only the current H (best), E (horizontal gap) and F (vertical gap) rows
+    are kept, in buffers reused for every row; the traceback is stored as a
+    uint8 pointer matrix. E is resolved with a running maximum, which is
+    exact as long as opening a gap costs at least as much as extending one.
+    With Numba the compiled kernels.fill_affine computes the same pointers.
+    
+    Args:
+        a: Encoded first sequence (matrix rows)
+        b: Encoded second sequence (matrix columns)
+        scoring: AlignmentScoring object with affine gap parameters
+        local: Smith-Waterman variant (clamp at zero, track best cell)
+    
+    Returns:
+        tuple: (score, end_pos, pointers)
+    """
+    n, m = len(a), len(b)
+    gap_open, gap_extend = scoring.gap_open, scoring.gap_extend
+    P = np.empty((n+1, m+1), dtype=np.uint8)
+    
+    if kernels.jit_enabled():
+        # Compiled fill, runs without holding the GIL
+        score, i, j = kernels.fill_affine(
+            _encode(a), _encode(b), scoring.table, gap_open, gap_extend, local, P
+        )
+        return int(score), (int(i), int(j)), P
+    
+    cols = np.arange(m+1)
+    offsets = cols * gap_extend
+    E_shift = offsets[:-1] + gap_open
+    
+    if local:
+        H = np.zeros(m+1, dtype=np.int64)
+        P[0] = _STOP
+    else:
+        H = np.where(cols > 0, gap_open + offsets - gap_extend, 0)
+        P[0] = _FROM_LEFT | np.where(cols > 1, _EXTEND_LEFT, 0)
+        P[0, 0] = _STOP
+    F = np.full(m+1, _NEG_INF, dtype=np.int64)
+    
+    # Row buffers, overwritten in place for every row
+    F_open, F_ext, D = (np.empty(m+1, dtype=np.int64) for _ in range(3))
+    diag = np.full(m+1, _NEG_INF, dtype=np.int64)
+    E = np.full(m+1, _NEG_INF, dtype=np.int64)
+    left_open = np.empty(m, dtype=np.int64)
+    mask = np.empty(m+1, dtype=bool)
+    
+    best_score, best_pos = 0, (0, 0)
+    
+    for i, sub in enumerate(_substitution_rows(a, b, scoring), start=1):
+        # Vertical gaps only depend on the previous row
+        np.add(H, gap_open, out=F_open)
+        np.add(F, gap_extend, out=F_ext)
+        np.maximum(F_open, F_ext, out=F)
+        
+        np.add(H[:-1], sub, out=diag[1:])
+        
+        # Best score that does not end in a horizontal gap
+        np.maximum(diag, F, out=D)
+        if local:
+            D[0] = 0
+            np.maximum(D, 0, out=D)
+        else:
+            D[0] = gap_open + (i-1) * gap_extend
+            F[0] = D[0]
+        
+        # E[j] = max over k < j of D[k] + gap_open + (j-k-1) * gap_extend
+        np.subtract(D[:-1], offsets[:-1], out=E[1:])
+        np.maximum.accumulate(E[1:], out=E[1:])
+        E[1:] += E_shift
+        np.maximum(D, E, out=H)
+        
+        # Source of H: diagonal, then vertical gap, then horizontal gap
+        row = P[i]
+        row.fill(_FROM_LEFT)
+        np.equal(H, F, out=mask)
+        np.copyto(row, _FROM_UP, where=mask)
+        np.equal(H, diag, out=mask)
+        np.copyto(row, _FROM_DIAG, where=mask)
+        if local:
+            np.equal(H, 0, out=mask)
+            np.copyto(row, _STOP, where=mask)
+        else:
+            row[0] = _FROM_UP
+        
+        np.add(H[:-1], gap_open, out=left_open)
+        mask[0] = False
+        np.not_equal(E[1:], left_open, out=mask[1:])
+        np.bitwise_or(row, _EXTEND_LEFT, out=row, where=mask)
+        
+        np.greater(F_ext, F_open, out=mask)
+        if not local:
+            mask[0] = i > 1
+        np.bitwise_or(row, _EXTEND_UP, out=row, where=mask)
+        
+        if local:
+            j = int(H.argmax())
+            if H[j] > best_score:
+                best_score, best_pos = int(H[j]), (i, j)
+    
+    if not local:
+        best_score, best_pos = int(H[m]), (n, m)
+    
+    return best_score, best_pos, P
+
+
+def _pointer_fill(a, b, scoring, local=False, free_a=False, free_b=False):
+    """
+    Linear-gap fill keeping one pointer byte per cell instead of the scores
+    
+    Pointers use the affine layout without extension bits, so the path is
+    recovered with _affine_traceback. The source of each cell follows the
+    traceback preference (diagonal, then up, then left).
+    
+    Args:
+        a: Encoded first sequence (matrix rows)
+        b: Encoded second sequence (matrix columns)
+        scoring: AlignmentScoring object (linear gaps)
+        local: Clamp values at zero (Smith-Waterman)
+        free_a: Leading residues of a can be skipped without penalty
+        free_b: Leading residues of b can be skipped without penalty
+    
+    Returns:
+        tuple: (pointers, last row, last column, (best score, best cell));
+            the best cell is the first maximum in row-major order
+    """
+    n, m = len(a), len(b)
+    gap = scoring.gap
+    
+    P = np.empty((n+1, m+1), dtype=np.uint8)
+    P[0] = _STOP if local or free_b else _FROM_LEFT
+    P[:, 0] = _STOP if local or free_a else _FROM_UP
+    
+    rows = _iter_rows(a, b, scoring, local, free_a, free_b)
+    row = next(rows)
+    last_column = np.empty(n+1, dtype=row.dtype)
+    last_column[0] = row[m]
+    best_score, best_pos = 0, (0, 0)
+    
+    for i, (sub, current) in enumerate(zip(_substitution_rows(a, b, scoring), rows), start=1):
+        cells = current[1:]
+        source = np.where(
+            cells == row[:-1] + sub, _FROM_DIAG,
+            np.where(cells == row[1:] + gap, _FROM_UP, _FROM_LEFT)
+        )
+        if local:
+            source[cells == 0] = _STOP
+            j = int(current.argmax())
+            if current[j] > best_score:
+                best_score, best_pos = int(current[j]), (i, j)
+        P[i, 1:] = source
+        last_column[i] = current[m]
+        row = current
+    
+    return P, row, last_column, (best_score, best_pos)
+
+
+def _affine_traceback(P, a, b, end_pos):
+    """Follow the per-state pointers of _affine_fill back from end_pos"""
+    aln_a = []
+    aln_b = []
+    i, j = end_pos
+    state = _FROM_DIAG
+    
+    while i > 0 or j > 0:
+        ptr = P[i, j]
+        if state == _FROM_DIAG:
+            source = ptr & 3
+            if source == _STOP:
+                break
+            if source == _FROM_DIAG:
+                aln_a.append(a[i-1])
+                aln_b.append(b[j-1])
+                i -= 1
+                j -= 1
+            else:
+                state = source
+        elif state == _FROM_UP:
+            # Gap in sequence B - move up
+            aln_a.append(a[i-1])
+            aln_b.append('-')
+            i -= 1
+            state = _FROM_UP if ptr & _EXTEND_UP else _FROM_DIAG
+        else:
+            # Gap in sequence A - move left
+            aln_a.append('-')
+            aln_b.append(b[j-1])
+            j -= 1
+            state = _FROM_LEFT if ptr & _EXTEND_LEFT else _FROM_DIAG
+    
+    aln_a.reverse()
+    aln_b.reverse()
+    
+    return ''.join(aln_a), ''.join(aln_b)
+
+
+class LinearSpaceSmithWaterman(SmithWaterman):
+    """
+    Smith-Waterman Local Alignment in linear memory
+    Produces the same result as SmithWaterman while only keeping DP rows
+    for the full sequences and a matrix for the bounding box of the hit
+    """
+    
+    # Cells that cannot lie on an optimal path in the reverse pass
+    _UNREACHABLE = np.iinfo(np.int64).min // 4
+    
+    def _forward_pass(self, a, b):
+        """Score-only local fill returning the best score and its end cell"""
+        max_score = 0
+        max_pos = (0, 0)
+        
+        for i, row in enumerate(_iter_rows(a, b, self.scoring, local=True)):
+            j = int(row.argmax())
+            # Strict comparison keeps the first maximum in row-major order
+            if row[j] > max_score:
+                max_score = int(row[j])
+                max_pos = (i, j)
+        
+        return max_score, max_pos
+    
+    def _reverse_pass(self, a, b, max_score, max_pos):
+        """
+        Find the top-left corner of the region holding the optimal local path
+        
+        Runs a global fill anchored at the end cell over the reversed prefixes.
+        Every cell of the optimal path scores between 0 and max_score from the
+        end cell, so negative cells are pruned and the pass stops once a whole
+        row becomes unreachable.
+        """
+        i_end, j_end = max_pos
+        ra = a[:i_end][::-1]
+        rb = b[:j_end][::-1]
+        gap = self.scoring.gap
+        offsets = np.arange(j_end+1) * gap
+        
+        row = offsets.copy()
+        row[row < 0] = self._UNREACHABLE
+        i_start, j_start = i_end, j_end
+        
+        for r, sub in enumerate(_substitution_rows(ra, rb, self.scoring), start=1):
+            row = _fill_row(row, sub, r * gap, gap, offsets)
+            row[row < 0] = self._UNREACHABLE
+            
+            hits = np.flatnonzero(row == max_score)
+            if hits.size:
+                i_start = i_end - r
+                j_start = min(j_start, j_end - int(hits[-1]))
+            if row.max() == self._UNREACHABLE:
+                break
+        
+        return i_start, j_start
+    
+    def align_span(self, seq1, seq2):
+        """
+        Perform Smith-Waterman local alignment in linear memory
+        
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, end cell)
+        """
+        self._check_linear_gaps()
+        fast = _ungapped_alignment(seq1, seq2, self.scoring, local=True)
+        if fast is not None:
+            return fast + ((len(seq1), len(seq2)),)
+        
+        a = _residues(seq1)
+        b = _residues(seq2)
+        ea, eb = _encode(seq1), _encode(seq2)
+        
+        max_score, (i_end, j_end) = self._forward_pass(ea, eb)
+        if max_score == 0:
+            return 0, '', '', (0, 0)
+        
+        i_start, j_start = self._reverse_pass(ea, eb, max_score, (i_end, j_end))
+        
+        # Local fill restricted to the hit region reproduces the full-matrix traceback
+        F = _fill_matrix(ea[i_start:i_end], eb[j_start:j_end], self.scoring, local=True)
+        aligned_a, aligned_b = self._traceback(
+            F, a[i_start:i_end], b[j_start:j_end], (i_end - i_start, j_end - j_start)
+        )
+        
+        return max_score, aligned_a, aligned_b, _cell((i_end, j_end))
+
+
+class SemiGlobal(SequenceAligner):
+    """
+    Semi-Global Alignment Algorithm (end gaps are free)
+    
+    Modes:
+        contained: seq2 (query) is aligned end to end inside seq1 (target)
+        overlap: a suffix of one sequence is aligned to a prefix of the other
+    """
+    
+    MODES = ("contained", "overlap")
+    
+    def __init__(self, scoring: AlignmentScoring, mode="contained"):
+        super().__init__(scoring)
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown semi-global mode: {mode}")
+        self.mode = mode
+    
+    def _rows(self, a, b):
+        """Iterate the DP rows with the borders of the current mode"""
+        return _iter_rows(a, b, self.scoring, free_a=True, free_b=self.mode == "overlap")
+    
+    def _end_cell(self, F):
+        """Locate the cell where the alignment ends"""
+        n, m = F.shape[0] - 1, F.shape[1] - 1
+        i = int(F[:, m].argmax())
+        if self.mode == "overlap":
+            j = int(F[n, :].argmax())
+            if F[n, j] > F[i, m]:
+                return n, j
+        return i, m
+    
+    def _traceback(self, F, a, b, end_pos):
+        """Perform traceback from the end cell until a free border is reached"""
+        aln_a = []
+        aln_b = []
+        i, j = end_pos
+        
+        # In contained mode only seq2 must be consumed entirely
+        while j > 0 and (i > 0 or self.mode == "contained"):
+            if i > 0 and F[i, j] == F[i-1, j-1] + self.scoring.similarity(a[i-1], b[j-1]):
+                aln_a.append(a[i-1])
+                aln_b.append(b[j-1])
+                i -= 1
+                j -= 1
+            elif i > 0 and F[i, j] == F[i-1, j] + self.scoring.gap:
+                aln_a.append(a[i-1])
+                aln_b.append('-')
+                i -= 1
+            else:
+                aln_a.append('-')
+                aln_b.append(b[j-1])
+                j -= 1
+        
+        aln_a.reverse()
+        aln_b.reverse()
+        
+        return ''.join(aln_a), ''.join(aln_b)
+    
+    def score(self, seq1, seq2):
+        """Return the semi-global score keeping a single DP row in memory"""
+        self._check_linear_gaps()
+        best = None
+        row = None
+        for row in self._rows(_encode(seq1), _encode(seq2)):
+            if best is None or row[-1] > best:
+                best = row[-1]
+        if self.mode == "overlap":
+            best = max(best, row.max())
+        return int(best)
+    
+    def align(self, seq1, seq2):
+        """
+        Perform semi-global alignment
+        
+        Args:
+            seq1: First sequence / target (string or list)
+            seq2: Second sequence / query (string or list)
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2) restricted to the aligned region
+        """
+        return self.align_span(seq1, seq2)[:3]
+    
+    def align_span(self, seq1, seq2):
+        """Semi-global alignment and its end cell"""
+        self._check_linear_gaps()
+        a = _residues(seq1)
+        b = _residues(seq2)
+        
+        F = _fill_matrix(
+            _encode(seq1), _encode(seq2), self.scoring,
+            free_a=True, free_b=self.mode == "overlap"
+        )
+        end_pos = self._end_cell(F)
+        aligned_a, aligned_b = self._traceback(F, a, b, end_pos)
+        
+        return int(F[end_pos]), aligned_a, aligned_b, _cell(end_pos)
+
+
+class PointerNeedlemanWunsch(NeedlemanWunsch):
+    """
+    Needleman-Wunsch storing one traceback byte per cell instead of scores
+    Same result as NeedlemanWunsch with a smaller matrix
+    """
+    
+    def align(self, seq1, seq2):
+        """
+        Perform Needleman-Wunsch global alignment with a pointer matrix
+        
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2)
+        """
+        if self.scoring.affine:
+            return super().align(seq1, seq2)  # The affine fill already keeps only pointers
+        fast = _ungapped_alignment(seq1, seq2, self.scoring)
+        if fast is not None:
+            return fast
+        
+        a = _residues(seq1)
+        b = _residues(seq2)
+        P, last_row, _, _ = _pointer_fill(_encode(seq1), _encode(seq2), self.scoring)
+        return (int(last_row[-1]),) + _affine_traceback(P, a, b, (len(a), len(b)))
+
+
+class PointerSmithWaterman(SmithWaterman):
+    """
+    Smith-Waterman storing one traceback byte per cell instead of scores
+    Same result as SmithWaterman with a smaller matrix
+    """
+    
+    def align_span(self, seq1, seq2):
+        """
+        Perform Smith-Waterman local alignment with a pointer matrix
+        
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, end cell)
+        """
+        if self.scoring.affine:
+            return super().align_span(seq1, seq2)
+        fast = _ungapped_alignment(seq1, seq2, self.scoring, local=True)
+        if fast is not None:
+            return fast + ((len(seq1), len(seq2)),)
+        
+        a = _residues(seq1)
+        b = _residues(seq2)
+        P, _, _, (max_score, max_pos) = _pointer_fill(_encode(seq1), _encode(seq2), self.scoring, local=True)
+        if max_score == 0:
+            return 0, '', '', (0, 0)
+        return (max_score,) + _affine_traceback(P, a, b, max_pos) + (_cell(max_pos),)
+
+
+class PointerSemiGlobal(SemiGlobal):
+    """
+    Semi-global alignment storing one traceback byte per cell instead of scores
+    Same result as SemiGlobal with a smaller matrix
+    """
+    
+    def align_span(self, seq1, seq2):
+        """
+        Perform semi-global alignment with a pointer matrix
+        
+        Args:
+            seq1: First sequence / target (string or list)
+            seq2: Second sequence / query (string or list)
+        
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, end cell) restricted to the aligned region
+        """
+        self._check_linear_gaps()
+        a = _residues(seq1)
+        b = _residues(seq2)
+        P, last_row, last_column, _ = _pointer_fill(
+            _encode(seq1), _encode(seq2), self.scoring,
+            free_a=True, free_b=self.mode == "overlap"
+        )
+        
+        # Same end cell as SemiGlobal._end_cell
+        end_pos = (int(last_column.argmax()), len(b))
+        score = last_column[end_pos[0]]
+        if self.mode == "overlap":
+            j = int(last_row.argmax())
+            if last_row[j] > score:
+                end_pos, score = (len(a), j), last_row[j]
+        
+        return (int(score),) + _affine_traceback(P, a, b, end_pos) + (_cell(end_pos),)
+
+
+class BitParallelNeedlemanWunsch(NeedlemanWunsch):
+    """
+    Needleman-Wunsch for edit-distance-equivalent scoring
+    score() runs the bit-parallel edit distance instead of the DP fill
+    """
+    
+    def score(self, seq1, seq2):
+        """Return the global score from the unit-cost edit distance"""
+        cost = self.scoring.edit_cost()
+        distance = edit_distance(_residues(seq2), _residues(seq1))
+        return (len(seq1) + len(seq2)) * (cost + self.scoring.gap) - cost * distance
+
+
+class BitParallelSemiGlobal(SemiGlobal):
+    """
+    Semi-global alignment (query contained in target) for edit-distance-equivalent scoring
+    score() runs the bit-parallel edit distance instead of the DP fill
+    """
+    
+    def __init__(self, scoring: AlignmentScoring):
+        super().__init__(scoring, mode="contained")
+    
+    def score(self, seq1, seq2):
+        """Return the semi-global score from the unit-cost edit distance"""
+        cost = self.scoring.edit_cost(free_end_gaps=True)
+        return -cost * edit_distance(_residues(seq2), _residues(seq1), mode="semi-global")
+
+
+def warmup(scorings=()):
+    """
+    Prepare the library for low first-request latency
+    
+    Builds the substitution tables of the given scoring schemes and compiles
+    (or loads from cache) the fill kernels, then runs one tiny alignment per
+    engine family so every code path is initialised.
+    
+    Args:
+        scorings: AlignmentScoring objects expected at runtime (default scheme if empty)
+    """
+    scorings = list(scorings) or [AlignmentScoring()]
+    tables = {}
+    for scoring in scorings:
+        table = scoring.table
+        tables[table.dtype] = table
+    kernels.warmup(tables.values())
+    
+    for scoring in scorings:
+        aligners = [NeedlemanWunsch(scoring), SmithWaterman(scoring)]
+        if not scoring.affine:
+            aligners.append(SemiGlobal(scoring))
+        for aligner in aligners:
+            aligner.align("ACGT", "AGT")
 
 
 def get_aligner(algorithm_type, scoring):
@@ -189,15 +1294,27 @@ def get_aligner(algorithm_type, scoring):
     Factory function to get appropriate aligner
     
     Args:
-        algorithm_type: "needleman-wunsch" or "smith-waterman"
+        algorithm_type: "needleman-wunsch", "smith-waterman", "smith-waterman-linear",
+            "semi-global" (query contained in target) or "overlap"
         scoring: AlignmentScoring object
     
     Returns:
-        SequenceAligner instance
+        SequenceAligner instance (bit-parallel variants are chosen automatically
+        when the scoring is equivalent to unit-cost edit distance)
     """
     if algorithm_type.lower() in ["needleman-wunsch", "needleman", "global"]:
+        if scoring.edit_cost() is not None:
+            return BitParallelNeedlemanWunsch(scoring)
         return NeedlemanWunsch(scoring)
     elif algorithm_type.lower() in ["smith-waterman", "smith", "local"]:
         return SmithWaterman(scoring)
+    elif algorithm_type.lower() in ["smith-waterman-linear", "linear-local"]:
+        return LinearSpaceSmithWaterman(scoring)
+    elif algorithm_type.lower() in ["semi-global", "glocal", "contained"]:
+        if scoring.edit_cost(free_end_gaps=True) is not None:
+            return BitParallelSemiGlobal(scoring)
+        return SemiGlobal(scoring, mode="contained")
+    elif algorithm_type.lower() in ["overlap", "semi-global-overlap"]:
+        return SemiGlobal(scoring, mode="overlap")
     else:
         raise ValueError(f"Unknown algorithm type: {algorithm_type}")
@@ -0,0 +1,170 @@
+"""
+Banded Alignment Module
+Needleman-Wunsch restricted to a band of diagonals around the main one
+
+The band is widened (doubled) until the banded score is provably optimal:
+any path leaving the band needs enough gaps that its score cannot beat the
+banded one. Similar sequences are aligned in O(n * bandwidth) time and memory.
+"""
+
+import numpy as np
+
+from src.algorithms import NeedlemanWunsch, _encode, _residues, _ungapped_alignment
+
+# Score of cells outside the band (far from overflow when gaps are added)
+_OUTSIDE = np.iinfo(np.int64).min // 4
+_CELL_BYTES = np.dtype(np.int64).itemsize
+
+
+class _BandView:
+    """F[i, j] over a banded matrix, with cells outside the band scoring _OUTSIDE"""
+
+    def __init__(self, B, lo):
+        self.B = B
+        self.lo = lo
+
+    def __getitem__(self, index):
+        i, j = index
+        t = j - i - self.lo
+        if 0 <= t < self.B.shape[1] - 1:
+            return self.B[i, t]
+        return _OUTSIDE
+
+
+class BandedNeedlemanWunsch(NeedlemanWunsch):
+    """
+    Needleman-Wunsch over a diagonal band that is widened until optimal
+
+    The score always equals the NeedlemanWunsch score. When several optimal
+    alignments exist, the one inside the band is returned, which may differ
+    from the full-matrix traceback.
+
+    Args:
+        bandwidth: Initial number of diagonals on each side of the band
+        memory_budget: Optional limit in bytes for the band matrix; MemoryError
+            is raised when the band would have to grow past it
+    """
+
+    def __init__(self, scoring, bandwidth=32, memory_budget=None):
+        super().__init__(scoring)
+        self._check_linear_gaps()
+        self.bandwidth = max(1, bandwidth)
+        self.memory_budget = memory_budget
+
+    @staticmethod
+    def band_bytes(n, m, bandwidth):
+        """Memory of the band matrix for an n x m pair"""
+        return (n+1) * (abs(m - n) + 2 * bandwidth + 2) * _CELL_BYTES
+
+    def _required_bandwidth(self, n, m, score):
+        """
+        Smallest bandwidth whose band provably contains an alignment scoring
+        at least score, or None when no finite band is guaranteed to
+
+        A path touching a diagonal outside a band of width k has at least
+        g = |m - n| + 2 * (k + 1) gap columns and at most (n + m - g) // 2
+        substitutions, so it scores at most (n + m - g) / 2 * best + g * gap.
+        """
+        best = int(self.scoring.table.max())
+        gap = self.scoring.gap
+        if 2 * gap >= best:
+            return None  # Extra gaps cost no more than the substitutions they replace
+        # Gap columns needed before the bound drops to score
+        min_gaps = max(0, (n + m) * best / 2 - score) / (best / 2 - gap)
+        return max(1, int(np.ceil((min_gaps - abs(m - n)) / 2)) - 1)
+
+    def _fill_band(self, a, b, bandwidth):
+        """
+        Fill the band of diagonals within bandwidth of [min(0, m-n), max(0, m-n)]
+
+        Returns:
+            tuple: (B, lo) where B[i, t] holds F[i, i + lo + t]; the last
+                column of B is padding that stays outside the band
+        """
+        n, m = len(a), len(b)
+        gap = self.scoring.gap
+        table = self.scoring.table
+        lo = min(0, m - n) - bandwidth
+        width = abs(m - n) + 2 * bandwidth + 1
+        offsets = np.arange(width) * gap
+
+        B = np.full((n+1, width+1), _OUTSIDE, dtype=np.int64)
+        t0, t1 = -lo, min(width - 1, m - lo)
+        B[0, t0:t1+1] = np.arange(t1 - t0 + 1) * gap
+
+        for i in range(1, n+1):
+            # Columns of row i inside the matrix: j = i + lo + t for t in [t0, t1]
+            t0, t1 = max(0, -i - lo), min(width - 1, m - i - lo)
+            if t0 > t1:
+                continue
+            prev, row = B[i-1], B[i]
+            first = t0
+            if i + lo + t0 == 0:
+                row[t0] = i * gap
+                first += 1
+
+            # (i-1, j-1) is on the same diagonal, (i-1, j) one to the right
+            j0 = i + lo + first
+            sub = table[a[i-1]][b[j0-1:i+lo+t1]]
+            cells = np.maximum(prev[first:t1+1] + sub, prev[first+1:t1+2] + gap)
+            row[first:t1+1] = cells
+
+            # Left dependency with the running maximum of _fill_row
+            segment = row[t0:t1+1]
+            segment -= offsets[:t1-t0+1]
+            np.maximum.accumulate(segment, out=segment)
+            segment += offsets[:t1-t0+1]
+
+        return B, lo
+
+    def _band(self, seq1, seq2):
+        """
+        Fill bands until the score is provably optimal; returns (score, B, lo)
+
+        The score of the initial band is a lower bound of the optimum and
+        gives the width that certifies it, so at most two fills are needed.
+        """
+        a, b = _encode(seq1), _encode(seq2)
+        n, m = len(a), len(b)
+        bandwidth = self.bandwidth
+        while True:
+            bandwidth = min(bandwidth, max(n, m))
+            if self.memory_budget is not None and self.band_bytes(n, m, bandwidth) > self.memory_budget:
+                raise MemoryError(
+                    f"Band of width {bandwidth} for a {n}x{m} alignment exceeds "
+                    f"the memory budget of {self.memory_budget} bytes"
+                )
+            B, lo = self._fill_band(a, b, bandwidth)
+            score = int(B[n, m - n - lo])
+            if bandwidth == max(n, m):
+                return score, B, lo  # The band covers the whole matrix
+            required = self._required_bandwidth(n, m, score)
+            if required is not None and required <= bandwidth:
+                return score, B, lo
+            bandwidth = max(n, m) if required is None else max(required, 2 * bandwidth)
+
+    def score(self, seq1, seq2):
+        """Global alignment score"""
+        fast = _ungapped_alignment(seq1, seq2, self.scoring)
+        if fast is not None:
+            return fast[0]
+        return self._band(seq1, seq2)[0]
+
+    def align(self, seq1, seq2):
+        """
+        Perform banded Needleman-Wunsch global alignment
+
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2)
+        """
+        fast = _ungapped_alignment(seq1, seq2, self.scoring)
+        if fast is not None:
+            return fast
+
+        score, B, lo = self._band(seq1, seq2)
+        aligned_a, aligned_b = self._traceback(_BandView(B, lo), _residues(seq1), _residues(seq2))
+        return score, aligned_a, aligned_b
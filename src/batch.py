@@ -0,0 +1,153 @@
+"""
+Batch Alignment Module
+One-vs-many and all-vs-all alignment on top of the pairwise aligners,
+with an optional prefilter that skips pairs unlikely to score well
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.algorithms import encode, prepare, reverse_complement
+
+
+class BatchResult:
+    """Result of one aligned pair in a batch run"""
+
+    def __init__(self, index1, index2, score, aligned_seq1=None, aligned_seq2=None, strand="+", end=None):
+        self.index1 = index1
+        self.index2 = index2
+        self.score = score
+        self.aligned_seq1 = aligned_seq1
+        self.aligned_seq2 = aligned_seq2
+        self.strand = strand  # Orientation of seq2 that produced the result
+
+        # Aligned residues are seq1[ref_start:ref_end] and seq2[query_start:query_end],
+        # seq2 in the orientation of strand; None without a traceback end cell
+        self.ref_start = self.ref_end = self.query_start = self.query_end = None
+        if end is not None and aligned_seq1 and aligned_seq2:
+            self.ref_end, self.query_end = end
+            self.ref_start = self.ref_end - (len(aligned_seq1) - aligned_seq1.count('-'))
+            self.query_start = self.query_end - (len(aligned_seq2) - aligned_seq2.count('-'))
+
+    def as_tuple(self):
+        """Return (score, aligned_seq1, aligned_seq2) like SequenceAligner.align"""
+        return self.score, self.aligned_seq1, self.aligned_seq2
+
+    def __repr__(self):
+        return f"BatchResult({self.index1}, {self.index2}, score={self.score}, strand={self.strand!r})"
+
+
+def _run_pair(aligner, seq1, seq2, index1, index2, score_only, strand):
+    """Align one pair and wrap the output"""
+    if strand == "+":
+        if score_only:
+            return BatchResult(index1, index2, aligner.score(seq1, seq2))
+        score, aligned1, aligned2, end = aligner.align_span(seq1, seq2)
+        return BatchResult(index1, index2, score, aligned1, aligned2, end=end)
+
+    if score_only:
+        score, best_strand = aligner.score_strands(seq1, seq2, strand)
+        return BatchResult(index1, index2, score, strand=best_strand)
+    score, aligned1, aligned2, end, best_strand = aligner.align_span_strands(seq1, seq2, strand)
+    return BatchResult(index1, index2, score, aligned1, aligned2, best_strand, end)
+
+
+def _passes(prefilter, seq1, seq2, strand):
+    """Apply the prefilter to every orientation of seq2 that will be aligned"""
+    if strand in ("+", "both") and prefilter.passes(seq1, seq2):
+        return True
+    if strand in ("-", "both"):
+        return prefilter.passes(seq1, reverse_complement(seq2))
+    return False
+
+
+def _run_job(job):
+    """Executor entry point for one prepared pair"""
+    return _run_pair(*job)
+
+
+def _write_results(writer, jobs, results):
+    """Append results to a ResultWriter as they arrive; returns how many were written"""
+    count = 0
+    for job, result in zip(jobs, results):
+        query = job[2] if result.strand == "+" else reverse_complement(job[2])
+        writer.append(result, job[1], query)
+        count += 1
+    writer.flush()
+    return count
+
+
+def align_pairs(aligner, pairs, prefilter=None, score_only=False, strand="+", workers=None, writer=None):
+    """
+    Align (index1, seq1, index2, seq2) pairs, skipping those rejected by the prefilter
+
+    Args:
+        aligner: SequenceAligner instance
+        pairs: Iterable of (index1, seq1, index2, seq2)
+        prefilter: Optional object with passes(seq1, seq2), e.g. sketch.SketchFilter
+        score_only: Only compute scores (no traceback)
+        strand: Orientation of seq2 to align: "+", "-" or "both" (best strand is kept)
+        workers: Size of a thread pool running the alignments concurrently. The
+            compiled kernels release the GIL, so threads avoid the pickling and
+            start-up cost of process pools for many small alignments.
+        writer: Optional export.ResultWriter; results are appended to it as they
+            complete instead of being collected in memory
+
+    Returns:
+        list: BatchResult for every pair that passed the prefilter, in input order
+            (with a writer: the number of results written)
+    """
+    # Every distinct sequence object is encoded once and shared by all its pairs
+    encoded = {}
+
+    def shared(seq):
+        key = id(seq)
+        if key not in encoded:
+            encoded[key] = (seq, encode(seq))  # Keep seq alive so its id stays unique
+        return encoded[key][1]
+
+    jobs = []
+    for index1, seq1, index2, seq2 in pairs:
+        if prefilter is not None and not _passes(prefilter, seq1, seq2, strand):
+            continue
+        jobs.append((aligner, shared(seq1), shared(seq2), index1, index2, score_only, strand))
+
+    if not workers or workers <= 1:
+        results = map(_run_job, jobs)
+        return list(results) if writer is None else _write_results(writer, jobs, results)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_run_job, jobs)
+        return list(results) if writer is None else _write_results(writer, jobs, results)
+
+
+def align_one_vs_many(aligner, query, targets, prefilter=None, score_only=False, strand="+", workers=None,
+                      writer=None):
+    """
+    Align one query against many targets
+
+    Each target is passed as seq1 (reference) and the query as seq2, matching
+    the aligner argument order. index1 is the target index, index2 is 0.
+    The query is prepared once (see algorithms.prepare), so its encoding,
+    score profile and reverse complement are shared by all targets.
+
+    Returns:
+        list: BatchResult per target that passed the prefilter
+    """
+    query = prepare(query)
+    pairs = ((i, target, 0, query) for i, target in enumerate(targets))
+    return align_pairs(aligner, pairs, prefilter, score_only, strand, workers, writer)
+
+
+def align_all_vs_all(aligner, sequences, prefilter=None, score_only=False, strand="+", workers=None,
+                     writer=None):
+    """
+    Align every unordered pair (i < j) of sequences
+
+    Returns:
+        list: BatchResult per pair that passed the prefilter
+    """
+    pairs = (
+        (i, sequences[i], j, sequences[j])
+        for i in range(len(sequences))
+        for j in range(i + 1, len(sequences))
+    )
+    return align_pairs(aligner, pairs, prefilter, score_only, strand, workers, writer)
@@ -0,0 +1,77 @@
+"""
+Bit-Parallel Edit Distance Module
+Myers / Hyyro bit-vector algorithm: one DP column is packed into a Python int,
+so every text character updates len(pattern) cells with a few word operations
+"""
+
+
+def _pattern_masks(pattern):
+    """Bitmask of the positions of every character in the pattern"""
+    peq = {}
+    for i, c in enumerate(pattern):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def edit_distance(pattern, text, mode="global", max_distance=None):
+    """
+    Unit-cost edit distance between pattern and text
+
+    Args:
+        pattern: Sequence packed into the bit vectors (string or list)
+        text: Sequence scanned character by character (string or list)
+        mode: "global" (both sequences end to end) or "semi-global"
+            (pattern aligned anywhere inside text, text ends are free)
+        max_distance: Optional threshold; the scan stops early and returns
+            None as soon as the distance is guaranteed to exceed it
+
+    Returns:
+        int or None: Edit distance, or None when it exceeds max_distance
+    """
+    if mode not in ("global", "semi-global"):
+        raise ValueError(f"Unknown edit distance mode: {mode}")
+    is_global = mode == "global"
+
+    m, n = len(pattern), len(text)
+    if m == 0:
+        distance = n if is_global else 0
+        return None if max_distance is not None and distance > max_distance else distance
+    if is_global and max_distance is not None and abs(n - m) > max_distance:
+        return None
+
+    peq = _pattern_masks(pattern)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    top = 1 if is_global else 0  # Horizontal delta entering the first row
+
+    pv, mv = mask, 0
+    score = best = m
+
+    for j, c in enumerate(text, start=1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+
+        ph = ((ph << 1) | top) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+        if is_global:
+            # The last row changes by at most one per remaining column
+            if max_distance is not None and score - (n - j) > max_distance:
+                return None
+        elif score < best:
+            best = score
+
+    distance = score if is_global else best
+    if max_distance is not None and distance > max_distance:
+        return None
+    return distance
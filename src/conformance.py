@@ -0,0 +1,446 @@
+"""
+Engine Conformance Module
+Differential testing and speed comparison of every alignment engine
+
+Each registered engine is run on randomized and edge-case pairs for every
+scoring scheme of config.SCORING_SCHEMES it supports, in global, local and
+semi-global (contained, overlap) mode, and checked against the reference
+engine of the mode (NeedlemanWunsch, SmithWaterman or SemiGlobal):
+
+    valid     the aligned strings use the input residues in order (all of
+              them for global alignments, all of seq2 for contained ones)
+              and rescore to the reported score
+    optimal   the reported score equals the reference score
+    score     score(), which many engines implement without a traceback
+              (bit-parallel, tiled, banded, row-by-row), equals the
+              reference score as well
+
+Heuristic engines are only required to be valid. align() and score() are
+timed separately per length bucket and reported as the speedup over the
+same method of the reference engine.
+
+Run with: python -m src.conformance --lengths 32 128 512
+"""
+
+import argparse
+import importlib
+import importlib.util
+import random
+import time
+from collections import defaultdict
+
+from config import SCORING_SCHEMES
+from src import kernels
+from src.algorithms import (
+    AlignmentScoring,
+    BitParallelNeedlemanWunsch,
+    LinearSpaceSmithWaterman,
+    NeedlemanWunsch,
+    BitParallelSemiGlobal,
+    PointerNeedlemanWunsch,
+    PointerSemiGlobal,
+    PointerSmithWaterman,
+    SemiGlobal,
+    SequenceAligner,
+    SmithWaterman,
+)
+from src.banded import BandedNeedlemanWunsch
+from src.incremental import IncrementalAligner
+from src.planner import AlignmentPlanner
+from src.tiled import TiledNeedlemanWunsch, TiledSmithWaterman
+
+MODES = ("global", "local", "contained", "overlap")
+METHODS = ("align", "score")
+DNA = "ACGT"
+PROTEIN = "ARNDCQEGHILKMFPSTWYV"
+DEFAULT_LENGTHS = (32, 128, 512)
+
+
+class Engine:
+    """
+    Registered engine
+
+    Args:
+        name: Row label in the reports
+        mode: One of MODES
+        factory: Builds the aligner from an AlignmentScoring
+        supports: Predicate on the scoring (default: any)
+        exact: Whether the score must be optimal (False for heuristics)
+    """
+
+    def __init__(self, name, mode, factory, supports=None, exact=True):
+        self.name = name
+        self.mode = mode
+        self.factory = factory
+        self.supports = supports or (lambda scoring: True)
+        self.exact = exact
+
+
+class _NumpyBackend(SequenceAligner):
+    """Run an engine with the compiled kernels switched off"""
+
+    def __init__(self, aligner):
+        super().__init__(aligner.scoring)
+        self.aligner = aligner
+
+    def _call(self, method, seq1, seq2):
+        enabled = kernels.jit_enabled()
+        kernels.set_jit_enabled(False)
+        try:
+            return method(seq1, seq2)
+        finally:
+            kernels.set_jit_enabled(enabled)
+
+    def align(self, seq1, seq2):
+        return self._call(self.aligner.align, seq1, seq2)
+
+    def score(self, seq1, seq2):
+        return self._call(self.aligner.score, seq1, seq2)
+
+
+class _LegacyFunction(SequenceAligner):
+    """Function of tests/algorithms_all.py, which hard-codes the Standard scheme"""
+
+    def __init__(self, scoring, function):
+        super().__init__(scoring)
+        self.function = function
+
+    def align(self, seq1, seq2):
+        score, aligned_a, aligned_b = self.function(seq1, seq2)[:3]
+        return int(score), ''.join(aligned_a), ''.join(aligned_b)
+
+
+def _linear(scoring):
+    return not scoring.affine
+
+
+def _standard(scoring):
+    # MATCH, MISMATCH and GAP of tests/algorithms_all.py
+    return scoring.matrix is None and not scoring.affine and (scoring.match, scoring.mismatch, scoring.gap) == (1, -1, -2)
+
+
+def _legacy(name):
+    """Factory for a function of tests/algorithms_all.py (imported on first use)"""
+    def factory(scoring):
+        module = importlib.import_module("tests.algorithms_all")
+        return _LegacyFunction(scoring, getattr(module, name))
+    return factory
+
+
+def _planned(mode):
+    return lambda scoring: AlignmentPlanner(workers=1).aligner(mode, scoring)
+
+
+def _semi_global(engine, mode):
+    return lambda scoring: engine(scoring, mode)
+
+
+def default_engines():
+    """Every engine of the library, plus the variants of tests/algorithms_all.py"""
+    engines = [
+        Engine("NeedlemanWunsch", "global", NeedlemanWunsch),
+        Engine("NeedlemanWunsch[numpy]", "global", lambda s: _NumpyBackend(NeedlemanWunsch(s))),
+        Engine("PointerNeedlemanWunsch", "global", PointerNeedlemanWunsch, _linear),
+        Engine("BitParallelNeedlemanWunsch", "global", BitParallelNeedlemanWunsch,
+               lambda s: s.edit_cost() is not None),
+        Engine("BandedNeedlemanWunsch", "global", BandedNeedlemanWunsch, _linear),
+        Engine("TiledNeedlemanWunsch", "global", lambda s: TiledNeedlemanWunsch(s, tile_size=48, workers=1), _linear),
+        Engine("TiledNeedlemanWunsch[numpy]", "global",
+               lambda s: _NumpyBackend(TiledNeedlemanWunsch(s, tile_size=48, workers=1)), _linear),
+        Engine("IncrementalAligner", "global", IncrementalAligner, _linear),
+        Engine("PlannedAligner", "global", _planned("global")),
+        Engine("SmithWaterman", "local", SmithWaterman),
+        Engine("SmithWaterman[numpy]", "local", lambda s: _NumpyBackend(SmithWaterman(s))),
+        Engine("PointerSmithWaterman", "local", PointerSmithWaterman, _linear),
+        Engine("LinearSpaceSmithWaterman", "local", LinearSpaceSmithWaterman, _linear),
+        Engine("TiledSmithWaterman", "local", lambda s: TiledSmithWaterman(s, tile_size=48, workers=1), _linear),
+        Engine("IncrementalAligner[local]", "local", lambda s: IncrementalAligner(s, local=True), _linear),
+        Engine("PlannedAligner[local]", "local", _planned("local")),
+    ]
+    for mode in ("contained", "overlap"):
+        engines += [
+            Engine(f"SemiGlobal[{mode}]", mode, _semi_global(SemiGlobal, mode), _linear),
+            Engine(f"PointerSemiGlobal[{mode}]", mode, _semi_global(PointerSemiGlobal, mode), _linear),
+            Engine(f"PlannedAligner[{mode}]", mode, _planned(mode), _linear),
+        ]
+    engines.append(Engine("BitParallelSemiGlobal", "contained", BitParallelSemiGlobal,
+                          lambda s: s.edit_cost(free_end_gaps=True) is not None))
+    if importlib.util.find_spec("numba") is not None:
+        engines += [
+            Engine("legacy.needleman_wunsch", "global", _legacy("needleman_wunsch"), _standard),
+            Engine("legacy.needleman_wunsch_numba", "global", _legacy("needleman_wunsch_numba"), _standard),
+            Engine("legacy.needleman_wunsch_diag_numpy", "global", _legacy("needleman_wunsch_diag_numpy"), _standard),
+            Engine("legacy.needleman_wunsch_diagbounded_numpy", "global",
+                   _legacy("needleman_wunsch_diagbounded_numpy"), _standard, exact=False),
+            # Known baseline bug: it can miss the optimal local score
+            Engine("legacy.smith_waterman", "local", _legacy("smith_waterman"), _standard, exact=False),
+        ]
+    return engines
+
+
+REFERENCE = {
+    "global": "NeedlemanWunsch",
+    "local": "SmithWaterman",
+    "contained": "SemiGlobal[contained]",
+    "overlap": "SemiGlobal[overlap]",
+}
+_REFERENCE_ENGINES = {
+    "global": (NeedlemanWunsch, None),
+    "local": (SmithWaterman, None),
+    "contained": (_semi_global(SemiGlobal, "contained"), _linear),
+    "overlap": (_semi_global(SemiGlobal, "overlap"), _linear),
+}
+
+
+def rescore(aligned_seq1, aligned_seq2, scoring):
+    """Score of an alignment recomputed from its gapped strings"""
+    if len(aligned_seq1) != len(aligned_seq2):
+        raise ValueError("Aligned sequences differ in length")
+    score = 0
+    run1 = run2 = 0
+    for x, y in zip(aligned_seq1, aligned_seq2):
+        if x == '-' and y == '-':
+            raise ValueError("Column with two gaps")
+        if x == '-':
+            run1 += 1
+        elif run1:
+            score += scoring.gap_cost(run1)
+            run1 = 0
+        if y == '-':
+            run2 += 1
+        elif run2:
+            score += scoring.gap_cost(run2)
+            run2 = 0
+        if x != '-' and y != '-':
+            score += scoring.similarity(x, y)
+    return score + scoring.gap_cost(run1) + scoring.gap_cost(run2)
+
+
+def check(result, seq1, seq2, scoring, mode, reference_score, exact=True):
+    """
+    Problems of one engine output
+
+    Returns:
+        list: Human-readable issues (empty when the output conforms)
+    """
+    score, aligned1, aligned2 = result
+    issues = []
+    residues1, residues2 = aligned1.replace('-', ''), aligned2.replace('-', '')
+    if mode == "global" and (residues1 != seq1 or residues2 != seq2):
+        issues.append("alignment does not cover the inputs")
+    if mode == "contained" and (residues1 not in seq1 or residues2 != seq2):
+        issues.append("alignment does not cover seq2 inside seq1")
+    if mode in ("local", "overlap") and (residues1 not in seq1 or residues2 not in seq2):
+        issues.append("aligned residues are not substrings of the inputs")
+    try:
+        rescored = rescore(aligned1, aligned2, scoring)
+    except ValueError as error:
+        issues.append(str(error))
+    else:
+        if rescored != score:
+            issues.append(f"reported score {score} but the alignment scores {rescored}")
+    if exact and score != reference_score:
+        issues.append(f"score {score} differs from the reference {reference_score}")
+    return issues
+
+
+def _mutate(seq, rate, alphabet, rng):
+    out = []
+    for residue in seq:
+        roll = rng.random()
+        if roll < rate / 2:
+            out.append(rng.choice(alphabet))
+        elif roll < 3 * rate / 4:
+            continue
+        elif roll < rate:
+            out.extend((residue, rng.choice(alphabet)))
+        else:
+            out.append(residue)
+    return ''.join(out)
+
+
+def edge_cases(alphabet):
+    """Small pairs exercising borders, ties and degenerate inputs"""
+    a, b = alphabet[0], alphabet[1]
+    return [
+        ("", alphabet), (alphabet, ""), (a, a), (a, b), (a, a * 5), (a * 4, b * 4),
+        (alphabet, alphabet), (alphabet, alphabet[::-1]),
+        ((a + b) * 8, (b + a) * 8), (a * 12, a * 3 + b + a * 8),
+        (alphabet * 3, alphabet[1:] * 2),
+    ]
+
+
+def random_cases(length, count, alphabet, rng):
+    """Unrelated and mutated pairs around a target length"""
+    cases = []
+    for k in range(count):
+        seq1 = ''.join(rng.choice(alphabet) for _ in range(length))
+        if k % 2:
+            seq2 = ''.join(rng.choice(alphabet) for _ in range(rng.randint(length // 2, length)))
+        else:
+            seq2 = _mutate(seq1, 0.15, alphabet, rng) or alphabet[0]
+        cases.append((seq1, seq2))
+    return cases
+
+
+class ConformanceReport:
+    """
+    Issues and timings of a conformance run
+
+    Attributes:
+        issues: (scheme, engine, seq1, seq2, issue) tuples
+        skipped: {(scheme, engine): reason} for unsupported schemes
+        timings: {(scheme, mode, engine, length, method): seconds summed over the cases}
+    """
+
+    def __init__(self):
+        self.issues = []
+        self.skipped = {}
+        self.timings = defaultdict(float)
+        self.lengths = []
+        self.modes = {}
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def speedups(self):
+        """
+        {(engine, length, method): reference time / engine time}
+
+        Times are summed over the schemes the engine ran and compared with the
+        same method of the reference engine.
+        """
+        engine_time, reference_time = defaultdict(float), defaultdict(float)
+        for (scheme, mode, name, length, method), seconds in self.timings.items():
+            engine_time[(name, length, method)] += seconds
+            reference_time[(name, length, method)] += self.timings.get(
+                (scheme, mode, REFERENCE[mode], length, method), 0.0
+            )
+        return {key: reference_time[key] / seconds
+                for key, seconds in engine_time.items() if seconds > 0 and reference_time[key]}
+
+    def format_table(self):
+        """Speedup of align() and score() over the reference engine per length bucket, and the issue counts"""
+        speedups = self.speedups()
+        counts = defaultdict(int)
+        for _, name, _, _, _ in self.issues:
+            counts[name] += 1
+
+        columns = [(method, n) for method in METHODS for n in self.lengths]
+        header = (f"{'engine':<42}{'mode':<11}" + ''.join(f"{f'{method} {n}':>12}" for method, n in columns)
+                  + f"{'issues':>8}")
+        lines = [header, "-" * len(header)]
+        for name, mode in self.modes.items():
+            cells = ''.join(
+                f"{speedups[(name, n, method)]:>11.2f}x" if (name, n, method) in speedups else f"{'-':>12}"
+                for method, n in columns
+            )
+            lines.append(f"{name:<42}{mode:<11}{cells}{counts[name]:>8}")
+        return "\n".join(lines)
+
+
+def run_conformance(engines=None, schemes=None, lengths=DEFAULT_LENGTHS, cases=4, seed=0, timed_lengths=None):
+    """
+    Run every engine on every supported scheme and collect issues and timings
+
+    Args:
+        engines: Engine list (default: default_engines())
+        schemes: {name: scheme dict} (default: config.SCORING_SCHEMES)
+        lengths: Length buckets of the random cases
+        cases: Random pairs per bucket and scheme
+        seed: Random seed
+        timed_lengths: Buckets timed (default: all); edge cases are never timed
+
+    Returns:
+        ConformanceReport
+    """
+    engines = default_engines() if engines is None else engines
+    schemes = SCORING_SCHEMES if schemes is None else schemes
+    timed_lengths = set(lengths if timed_lengths is None else timed_lengths)
+    rng = random.Random(seed)
+    report = ConformanceReport()
+    report.lengths = list(lengths)
+    report.modes = {engine.name: engine.mode for engine in engines}
+
+    for scheme_name, scheme in schemes.items():
+        scoring = AlignmentScoring.from_scheme(scheme)
+        alphabet = PROTEIN if scoring.matrix is not None else DNA
+        buckets = [(None, edge_cases(alphabet))]
+        buckets += [(length, random_cases(length, cases, alphabet, rng)) for length in lengths]
+
+        for mode in MODES:
+            factory, supports = _REFERENCE_ENGINES[mode]
+            if supports is not None and not supports(scoring):
+                continue
+            reference = factory(scoring)
+            active = []
+            for engine in engines:
+                if engine.mode != mode:
+                    continue
+                if not engine.supports(scoring):
+                    report.skipped[(scheme_name, engine.name)] = "scoring not supported"
+                    continue
+                active.append((engine, engine.factory(scoring)))
+
+            for length, pairs in buckets:
+                expected = [reference.score(seq1, seq2) for seq1, seq2 in pairs]
+
+                for engine, aligner in active:
+                    outputs = {}
+                    for method in METHODS:
+                        run = getattr(aligner, method)
+                        start = time.perf_counter()
+                        outputs[method] = []
+                        for seq1, seq2 in pairs:
+                            try:
+                                outputs[method].append(run(seq1, seq2))
+                            except Exception as error:  # Reported, not raised: one engine must not stop the run
+                                outputs[method].append(error)
+                        if length in timed_lengths:
+                            report.timings[(scheme_name, mode, engine.name, length, method)] += (
+                                time.perf_counter() - start
+                            )
+
+                    for (seq1, seq2), output, score_output, score in zip(
+                        pairs, outputs["align"], outputs["score"], expected
+                    ):
+                        if isinstance(output, Exception):
+                            issues = [f"raised {type(output).__name__}: {output}"]
+                        else:
+                            issues = check(output, seq1, seq2, scoring, mode, score, engine.exact)
+                        if isinstance(score_output, Exception):
+                            issues.append(f"score() raised {type(score_output).__name__}: {score_output}")
+                        elif engine.exact and score_output != score:
+                            issues.append(f"score() returned {score_output} but the reference scores {score}")
+                        report.issues += [(scheme_name, engine.name, seq1, seq2, issue) for issue in issues]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every alignment engine against the reference engines")
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(DEFAULT_LENGTHS))
+    parser.add_argument("--cases", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--schemes", nargs="+", choices=list(SCORING_SCHEMES), default=list(SCORING_SCHEMES))
+    parser.add_argument("--no-legacy", action="store_true", help="Skip tests/algorithms_all.py")
+    args = parser.parse_args()
+
+    engines = default_engines()
+    if args.no_legacy:
+        engines = [engine for engine in engines if not engine.name.startswith("legacy.")]
+    schemes = {name: SCORING_SCHEMES[name] for name in args.schemes}
+
+    # Compile the kernels before timing
+    kernels.warmup()
+    report = run_conformance(engines, schemes, args.lengths, args.cases, args.seed)
+    print(report.format_table())
+    for scheme, name, seq1, seq2, issue in report.issues[:20]:
+        print(f"[{scheme}] {name}: {issue} ({seq1[:20]!r}, {seq2[:20]!r})")
+    if len(report.issues) > 20:
+        print(f"... {len(report.issues) - 20} more issues")
+    raise SystemExit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Result Export Module
+Columnar on-disk storage of batch alignment results
+
+Results are buffered per writer and flushed as parts, one directory per
+flushed batch holding one .npy file per column:
+
+    results/
+        part-<writer>-<n>/
+            score.npy, ref_start.npy, ...   one value per alignment
+            cigar.npy                       CIGAR strings as concatenated bytes
+            cigar_offsets.npy               start of each row's CIGAR (rows + 1)
+
+A part is written under a temporary name and renamed when complete, so any
+number of writers (threads or processes) can append to the same store and
+readers never see a partial part. Columns are read back memory-mapped.
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from src.algorithms import _residues
+
+# Fixed-width columns and their dtypes (strand is the byte '+' or '-')
+COLUMNS = {
+    "index1": np.int64,
+    "index2": np.int64,
+    "score": np.int64,
+    "strand": np.uint8,
+    "ref_start": np.int64,
+    "ref_end": np.int64,
+    "query_start": np.int64,
+    "query_end": np.int64,
+    "matches": np.int32,
+    "mismatches": np.int32,
+    "gaps": np.int32,
+    "length": np.int32,
+}
+DEFAULT_FLUSH_ROWS = 65536
+
+_GAP = ord('-')
+_CIGAR_OPS = np.frombuffer(b"MID", dtype=np.uint8)
+
+
+def _as_bytes(aligned):
+    return np.frombuffer(aligned.encode('ascii'), dtype=np.uint8)
+
+
+def alignment_counts(aligned_seq1, aligned_seq2):
+    """
+    Matches, mismatches, gaps and length, as defined by AlignmentStats
+
+    Returns:
+        tuple: (matches, mismatches, gaps, length)
+    """
+    a, b = _as_bytes(aligned_seq1), _as_bytes(aligned_seq2)
+    gap_a, gap_b = a == _GAP, b == _GAP
+    same = a == b
+    matches = np.count_nonzero(same & ~gap_a)
+    mismatches = np.count_nonzero(~same & ~gap_a & ~gap_b)
+    return matches, mismatches, int(gap_a.sum() + gap_b.sum()), len(a)
+
+
+def cigar(aligned_seq1, aligned_seq2):
+    """
+    CIGAR string of an alignment with seq1 as the reference
+
+    M: aligned pair, I: residue only in seq2, D: residue only in seq1
+    """
+    a, b = _as_bytes(aligned_seq1), _as_bytes(aligned_seq2)
+    if len(a) == 0:
+        return ""
+    ops = np.where(a == _GAP, 1, np.where(b == _GAP, 2, 0))
+    starts = np.flatnonzero(np.diff(ops, prepend=-1))
+    lengths = np.diff(np.append(starts, len(ops)))
+    return ''.join(f"{length}{chr(_CIGAR_OPS[op])}" for length, op in zip(lengths, ops[starts]))
+
+
+def _span(seq, aligned):
+    """
+    (start, end) of the aligned residues for a result without coordinates
+
+    Only a global alignment, which covers all of seq, can be located from the
+    strings alone; anything else is (-1, -1) rather than a guess that may hit
+    an earlier repeat.
+    """
+    residues = aligned.replace('-', '')
+    if seq is None or not residues or len(residues) != len(seq):
+        return -1, -1
+    return (0, len(seq)) if ''.join(_residues(seq)) == residues else (-1, -1)
+
+
+class ResultWriter:
+    """
+    Append alignment results to a columnar store
+
+    Args:
+        path: Store directory (created if needed)
+        flush_rows: Rows buffered before a part is written
+        writer_id: Name of this writer in its part files (default: random)
+    """
+
+    def __init__(self, path, flush_rows=DEFAULT_FLUSH_ROWS, writer_id=None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_rows = flush_rows
+        self.writer_id = writer_id or uuid.uuid4().hex[:12]
+        self.rows_written = 0
+        self._parts = 0
+        self._reset()
+
+    def _reset(self):
+        self._columns = {name: [] for name in COLUMNS}
+        self._cigars = []
+
+    def append(self, result, seq1=None, seq2=None):
+        """
+        Buffer one result
+
+        Args:
+            result: BatchResult, ScanHit or any object with score,
+                aligned_seq1/aligned_seq2 (or aligned_ref/aligned_query) and
+                optionally index1, index2, strand and the ref_start/ref_end/
+                query_start/query_end coordinates from the traceback
+            seq1, seq2: Input sequences, used to locate global alignments when
+                the result carries no coordinates
+        """
+        aligned1 = getattr(result, "aligned_seq1", None) or getattr(result, "aligned_ref", None) or ""
+        aligned2 = getattr(result, "aligned_seq2", None) or getattr(result, "aligned_query", None) or ""
+
+        if getattr(result, "ref_start", None) is not None:
+            ref = (result.ref_start, result.ref_end)
+            query = (result.query_start, result.query_end)
+        else:
+            ref, query = _span(seq1, aligned1), _span(seq2, aligned2)
+
+        values = (
+            getattr(result, "index1", -1), getattr(result, "index2", -1), result.score,
+            ord(getattr(result, "strand", "+")), *ref, *query,
+            *alignment_counts(aligned1, aligned2),
+        )
+        for name, value in zip(COLUMNS, values):
+            self._columns[name].append(value)
+        self._cigars.append(cigar(aligned1, aligned2))
+
+        if len(self._cigars) >= self.flush_rows:
+            self.flush()
+
+    def extend(self, results):
+        """Buffer several results"""
+        for result in results:
+            self.append(result)
+
+    def flush(self):
+        """Write the buffered rows as a new part"""
+        if not self._cigars:
+            return
+        name = f"part-{self.writer_id}-{self._parts:05d}"
+        temporary = self.path / f".{name}.tmp"
+        temporary.mkdir()
+
+        for column, dtype in COLUMNS.items():
+            np.save(temporary / f"{column}.npy", np.array(self._columns[column], dtype=dtype))
+        encoded = [text.encode('ascii') for text in self._cigars]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in encoded], out=offsets[1:])
+        np.save(temporary / "cigar.npy", np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        np.save(temporary / "cigar_offsets.npy", offsets)
+
+        os.rename(temporary, self.path / name)
+        self.rows_written += len(encoded)
+        self._parts += 1
+        self._reset()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ResultTable:
+    """
+    Read a columnar store written by ResultWriter
+
+    Args:
+        path: Store directory
+        mmap: Memory-map the column files instead of reading them
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = Path(path)
+        self.mmap_mode = 'r' if mmap else None
+        self.parts = sorted(p for p in self.path.glob("part-*") if p.is_dir())
+        self._lengths = [len(self._load(part, "score")) for part in self.parts]
+
+    def _load(self, part, column):
+        return np.load(part / f"{column}.npy", mmap_mode=self.mmap_mode)
+
+    def __len__(self):
+        return sum(self._lengths)
+
+    def column(self, name):
+        """
+        One column over every part (memory-mapped when there is a single part)
+
+        Args:
+            name: A key of COLUMNS
+        """
+        if name not in COLUMNS:
+            raise KeyError(f"Unknown column: {name}")
+        arrays = [self._load(part, name) for part in self.parts]
+        if len(arrays) == 1:
+            return arrays[0]
+        if not arrays:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.concatenate(arrays)
+
+    def iter_parts(self, *names):
+        """Yield a {column: memory-mapped array} dict per part"""
+        for part in self.parts:
+            yield {name: self._load(part, name) for name in names}
+
+    def cigar(self, row):
+        """CIGAR string of one row"""
+        for part, length in zip(self.parts, self._lengths):
+            if row < length:
+                offsets = self._load(part, "cigar_offsets")
+                data = self._load(part, "cigar")
+                return data[offsets[row]:offsets[row+1]].tobytes().decode('ascii')
+            row -= length
+        raise IndexError("Row out of range")
+
+    def to_dict(self):
+        """Every fixed-width column as an array (e.g. for pandas.DataFrame)"""
+        return {name: self.column(name) for name in COLUMNS}
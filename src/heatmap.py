@@ -0,0 +1,177 @@
+"""
+Matrix View Module
+Downsampled DP score matrix with the traceback path, for display
+
+The score matrix is never materialised: DP rows are streamed and pooled
+(block max or mean) into a grid of at most max_side x max_side pixels, so
+memory and the size of the rendered image stay bounded for any sequence
+length. The traceback path is rebuilt from the aligned sequences and reduced
+to the pixels it crosses.
+"""
+
+import numpy as np
+
+from src.algorithms import _encode, _iter_rows
+
+# Viridis-like colour ramp (low -> high scores)
+_RAMP = np.array([
+    [68, 1, 84],
+    [59, 82, 139],
+    [33, 145, 140],
+    [94, 201, 98],
+    [253, 231, 37],
+], dtype=np.float64)
+PATH_COLOR = (255, 59, 48)
+
+
+class MatrixView:
+    """
+    Pooled score matrix and traceback path in pixel coordinates
+
+    Attributes:
+        pooled: (rows, cols) float array of block-reduced scores
+        row_edges: Matrix row where each pixel row starts (plus the end)
+        col_edges: Matrix column where each pixel column starts (plus the end)
+        path: (k, 2) int array of consecutive distinct pixels on the path
+        end: Matrix cell where the alignment ends
+    """
+
+    def __init__(self, pooled, row_edges, col_edges, path, end):
+        self.pooled = pooled
+        self.row_edges = row_edges
+        self.col_edges = col_edges
+        self.path = path
+        self.end = end
+
+    @property
+    def shape(self):
+        return self.pooled.shape
+
+    def to_rgb(self, min_side=0):
+        """
+        Colour the pooled scores and draw the path
+
+        Args:
+            min_side: Upscale (nearest neighbour) until the longer side has at
+                least this many pixels, so small matrices are not blurred
+
+        Returns:
+            np.ndarray: (rows, cols, 3) uint8 image
+        """
+        low, high = self.pooled.min(), self.pooled.max()
+        level = (self.pooled - low) / (high - low) if high > low else np.zeros_like(self.pooled)
+        stops = np.linspace(0, 1, len(_RAMP))
+        rgb = np.stack([np.interp(level, stops, _RAMP[:, c]) for c in range(3)], axis=-1)
+        rgb = rgb.astype(np.uint8)
+
+        if len(self.path):
+            rgb[self.path[:, 0], self.path[:, 1]] = PATH_COLOR
+
+        scale = max(1, -(-min_side // max(self.shape)))
+        if scale > 1:
+            rgb = rgb.repeat(scale, axis=0).repeat(scale, axis=1)
+        return rgb
+
+
+def _block_edges(size, blocks):
+    """Start index of each block when splitting range(size) into blocks (plus size)"""
+    return np.linspace(0, size, blocks+1).astype(np.int64)
+
+
+def pooled_matrix(seq1, seq2, scoring, local=False, max_side=256, reduce="max"):
+    """
+    Block-pool the linear-gap DP matrix without storing it
+
+    Args:
+        seq1: First sequence (matrix rows)
+        seq2: Second sequence (matrix columns)
+        scoring: AlignmentScoring object (linear gaps)
+        local: Smith-Waterman matrix (clamped at zero)
+        max_side: Maximum pixels per side
+        reduce: "max" or "mean" over each block
+
+    Returns:
+        tuple: (pooled, row_edges, col_edges, end) where end is the cell the
+            aligner's traceback starts from ((n, m), or the first maximum for local)
+    """
+    if reduce not in ("max", "mean"):
+        raise ValueError(f"Unknown reduction: {reduce}")
+    if scoring.affine:
+        raise ValueError("The matrix view only supports linear gap penalties")
+
+    a, b = _encode(seq1), _encode(seq2)
+    n, m = len(a), len(b)
+    rows, cols = min(n+1, max_side), min(m+1, max_side)
+    row_edges = _block_edges(n+1, rows)
+    col_edges = _block_edges(m+1, cols)
+    row_block = np.repeat(np.arange(rows), np.diff(row_edges))
+
+    pooled = np.full((rows, cols), -np.inf) if reduce == "max" else np.zeros((rows, cols))
+    col_starts = col_edges[:-1]
+    best_score, end = 0, (0, 0)
+
+    for i, row in enumerate(_iter_rows(a, b, scoring, local=local)):
+        r = row_block[i]
+        if reduce == "max":
+            np.maximum(pooled[r], np.maximum.reduceat(row, col_starts), out=pooled[r])
+        else:
+            pooled[r] += np.add.reduceat(row.astype(np.float64), col_starts)
+        if local:
+            j = int(row.argmax())
+            if row[j] > best_score:
+                best_score, end = int(row[j]), (i, j)
+
+    if reduce == "mean":
+        pooled /= np.outer(np.diff(row_edges), np.diff(col_edges))
+    if not local:
+        end = (n, m)
+    return pooled, row_edges, col_edges, end
+
+
+def path_cells(aligned_seq1, aligned_seq2, end):
+    """
+    Matrix cells visited by an alignment, from its start to its end cell
+
+    Returns:
+        np.ndarray: (len + 1, 2) int array of (i, j)
+    """
+    steps_i = np.frombuffer(aligned_seq1.encode('ascii'), dtype=np.uint8) != ord('-')
+    steps_j = np.frombuffer(aligned_seq2.encode('ascii'), dtype=np.uint8) != ord('-')
+    i = np.concatenate(([0], np.cumsum(steps_i)))
+    j = np.concatenate(([0], np.cumsum(steps_j)))
+    cells = np.stack((i, j), axis=1)
+    return cells + (np.array(end) - cells[-1])
+
+
+def pixel_path(cells, row_edges, col_edges):
+    """
+    Reduce a monotone cell path to the consecutive distinct pixels it crosses
+
+    At most rows + cols pixels remain, whatever the alignment length.
+    """
+    rows = np.searchsorted(row_edges, cells[:, 0], side='right') - 1
+    cols = np.searchsorted(col_edges, cells[:, 1], side='right') - 1
+    pixels = np.stack((rows, cols), axis=1)
+    keep = np.ones(len(pixels), dtype=bool)
+    keep[1:] = np.any(pixels[1:] != pixels[:-1], axis=1)
+    return pixels[keep]
+
+
+def matrix_view(seq1, seq2, scoring, aligned_seq1, aligned_seq2, local=False, max_side=256, reduce="max"):
+    """
+    Build the downsampled matrix and path view for an alignment result
+
+    Args:
+        seq1, seq2: The aligned input sequences
+        scoring: AlignmentScoring used for the alignment
+        aligned_seq1, aligned_seq2: Output of NeedlemanWunsch / SmithWaterman align
+        local: True for Smith-Waterman results
+        max_side: Maximum pixels per side
+        reduce: Block reduction, "max" or "mean"
+
+    Returns:
+        MatrixView
+    """
+    pooled, row_edges, col_edges, end = pooled_matrix(seq1, seq2, scoring, local, max_side, reduce)
+    cells = path_cells(aligned_seq1, aligned_seq2, end)
+    return MatrixView(pooled, row_edges, col_edges, pixel_path(cells, row_edges, col_edges), end)
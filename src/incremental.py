@@ -0,0 +1,178 @@
+"""
+Incremental Alignment Module
+Re-alignment that reuses the DP matrix of earlier runs when a sequence is edited
+
+Cell (i, j) of the linear-gap matrix only depends on the first i residues of
+seq1 and the first j residues of seq2. When a new pair shares a prefix of p
+residues of seq1 and q residues of seq2 with a cached pair, the block
+F[:p+1, :q+1] is copied and only the rows after p and the columns after q are
+recomputed. Editing the end of either sequence therefore costs a few rows or
+columns instead of a whole fill.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from src.algorithms import (
+    NeedlemanWunsch,
+    SequenceAligner,
+    SmithWaterman,
+    _encode,
+    _fill_matrix,
+    _fill_row,
+    _residues,
+    _ungapped_alignment,
+    score_dtype,
+)
+
+DEFAULT_MEMORY_BUDGET = 128 * 2**20
+
+
+def _common_prefix(x, y):
+    """Length of the common prefix of two encoded sequences"""
+    k = min(len(x), len(y))
+    differ = np.flatnonzero(x[:k] != y[:k])
+    return int(differ[0]) if len(differ) else k
+
+
+class IncrementalAligner(SequenceAligner):
+    """
+    Needleman-Wunsch or Smith-Waterman that keeps recent DP matrices
+
+    Results are identical to NeedlemanWunsch / SmithWaterman. The cached
+    matrices are evicted least recently used first, so that at most
+    max_states of them are kept and their total size stays within
+    memory_budget; a matrix larger than the budget is never kept.
+
+    Args:
+        scoring: AlignmentScoring object (linear gaps)
+        local: Smith-Waterman instead of Needleman-Wunsch
+        memory_budget: Bytes the cached matrices may use
+        max_states: Number of matrices kept
+
+    Attributes:
+        reused_cells: Cells copied from a cached matrix by the last fill
+    """
+
+    def __init__(self, scoring, local=False, memory_budget=DEFAULT_MEMORY_BUDGET, max_states=4):
+        super().__init__(scoring)
+        self._check_linear_gaps()
+        self.local = local
+        self.memory_budget = memory_budget
+        self.max_states = max_states
+        self.reused_cells = 0
+        self._engine = SmithWaterman(scoring) if local else NeedlemanWunsch(scoring)
+        self._states = OrderedDict()
+
+    @property
+    def cached_bytes(self):
+        """Memory held by the cached matrices"""
+        return sum(F.nbytes for _, _, F in self._states.values())
+
+    def clear(self):
+        """Drop every cached matrix"""
+        self._states.clear()
+
+    def _closest_state(self, a, b):
+        """Cached state sharing the largest prefix block with (a, b): (key, p, q)"""
+        best, best_cells = None, 0
+        for key, (sa, sb, _) in self._states.items():
+            p, q = _common_prefix(a, sa), _common_prefix(b, sb)
+            if (p + 1) * (q + 1) > best_cells:
+                best, best_cells = (key, p, q), (p + 1) * (q + 1)
+        return best
+
+    def _fill(self, a, b):
+        """DP matrix of the encoded pair, reusing the closest cached matrix"""
+        key = (a.tobytes(), b.tobytes())
+        if key in self._states:
+            self._states.move_to_end(key)
+            F = self._states[key][2]
+            self.reused_cells = F.size
+            return F
+
+        closest = self._closest_state(a, b)
+        if closest is None or closest[1] == 0 and closest[2] == 0:
+            F = _fill_matrix(a, b, self.scoring, local=self.local)
+            self.reused_cells = 0
+        else:
+            state_key, p, q = closest
+            self._states.move_to_end(state_key)
+            F = self._refill(a, b, self._states[state_key][2], p, q)
+            self.reused_cells = (p + 1) * (q + 1)
+
+        self._store(key, a, b, F)
+        return F
+
+    def _refill(self, a, b, cached, p, q):
+        """
+        Copy cached[:p+1, :q+1] and compute the other cells
+
+        The columns after q of the shared rows are filled column by column
+        (the recurrence is the same along either axis), then the rows after p
+        row by row, so an edit at the end of either sequence costs one
+        vectorised step per new residue.
+        """
+        n, m = len(a), len(b)
+        gap = self.scoring.gap
+        table = self.scoring.table
+        dtype = score_dtype(n, m, self.scoring)
+        offsets = np.arange(max(n, m)+1, dtype=dtype) * dtype.type(gap)
+
+        F = np.empty((n+1, m+1), dtype=dtype)
+        F[:p+1, :q+1] = cached[:p+1, :q+1]
+        F[0, q:] = 0 if self.local else offsets[q:m+1]
+
+        for j in range(q+1, m+1):
+            column = _fill_row(F[:p+1, j-1], table[a[:p], b[j-1]], F[0, j], gap, offsets[:p+1], self.local)
+            F[1:p+1, j] = column[1:]
+
+        for i in range(p+1, n+1):
+            first = 0 if self.local else i * gap
+            F[i] = _fill_row(F[i-1], table[a[i-1]][b], first, gap, offsets[:m+1], self.local)
+        return F
+
+    def _store(self, key, a, b, F):
+        """Cache a matrix and evict the least recently used ones past the limits"""
+        if F.nbytes > self.memory_budget:
+            return
+        self._states[key] = (a.copy(), b.copy(), F)
+        while len(self._states) > self.max_states or self.cached_bytes > self.memory_budget:
+            self._states.popitem(last=False)
+
+    def score(self, seq1, seq2):
+        """Alignment score"""
+        return self.align(seq1, seq2)[0]
+
+    def align(self, seq1, seq2):
+        """
+        Perform the alignment, reusing cached rows and columns
+
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2)
+        """
+        return self.align_span(seq1, seq2)[:3]
+
+    def align_span(self, seq1, seq2):
+        """Alignment and the cell where its traceback starts"""
+        fast = _ungapped_alignment(seq1, seq2, self.scoring, local=self.local)
+        if fast is not None:
+            self.reused_cells = 0
+            return fast + ((len(seq1), len(seq2)),)
+
+        a, b = _encode(seq1), _encode(seq2)
+        F = self._fill(a, b)
+        res_a, res_b = _residues(seq1), _residues(seq2)
+
+        if not self.local:
+            end = (len(a), len(b))
+            return (int(F[end]),) + self._engine._traceback(F, res_a, res_b) + (end,)
+
+        max_pos = np.unravel_index(F.argmax(), F.shape)
+        end = (int(max_pos[0]), int(max_pos[1]))
+        return (int(F[max_pos]),) + self._engine._traceback(F, res_a, res_b, max_pos) + (end,)
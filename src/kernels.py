@@ -0,0 +1,286 @@
+"""
+Compiled Kernels Module
+Optional Numba kernels for the DP fill. They are compiled with nogil=True, so
+alignments running in a thread pool execute in parallel inside one process.
+When Numba is not installed the NumPy row fills in src.algorithms are used.
+
+Numba itself is only imported when a kernel is first needed (or by warmup()),
+so importing the library stays cheap.
+"""
+
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+# Set BIOSEQALIGNER_JIT=0 to force the NumPy fill even when Numba is installed
+_jit_enabled = NUMBA_AVAILABLE and os.getenv("BIOSEQALIGNER_JIT", "1") != "0"
+
+
+def jit_enabled():
+    """True when the compiled kernels are used by the aligners"""
+    return _jit_enabled
+
+
+def set_jit_enabled(enabled):
+    """Switch the compiled kernels on or off (no effect without Numba)"""
+    global _jit_enabled
+    _jit_enabled = bool(enabled) and NUMBA_AVAILABLE
+
+
+def _fill_interior(a, b, table, gap, local, F):
+    """
+    Fill F[1:, 1:] from its first row and column (shared by the kernels)
+
+    Args:
+        a: Encoded residues of the rows
+        b: Encoded residues of the columns
+        table: (256, 256) substitution lookup table
+        gap: Linear gap penalty
+        local: Clamp values at zero (Smith-Waterman)
+        F: (len(a)+1, len(b)+1) integer matrix with its borders set
+    """
+    n, m = a.shape[0], b.shape[0]
+    for i in range(1, n + 1):
+        sub = table[a[i - 1]]
+        for j in range(1, m + 1):
+            best = F[i - 1, j - 1] + sub[b[j - 1]]
+            up = F[i - 1, j] + gap
+            if up > best:
+                best = up
+            left = F[i, j - 1] + gap
+            if left > best:
+                best = left
+            if local and best < 0:
+                best = 0
+            F[i, j] = best
+
+
+def _fill_linear(a, b, table, gap, local, free_a, free_b, F):
+    """
+    Fill the linear-gap DP matrix cell by cell
+
+    Same recurrence and borders as src.algorithms._fill_matrix. Cells are
+    computed in int64 and stored in F, whose dtype is chosen by the caller
+    from the score bounds of the pair.
+
+    Args:
+        a: Encoded first sequence (uint8)
+        b: Encoded second sequence (uint8)
+        table: (256, 256) substitution lookup table
+        gap: Linear gap penalty
+        local: Clamp values at zero (Smith-Waterman)
+        free_a: Leading residues of a can be skipped without penalty
+        free_b: Leading residues of b can be skipped without penalty
+        F: Output (n+1, m+1) integer matrix
+
+    Returns:
+        np.ndarray: F, filled
+    """
+    n, m = a.shape[0], b.shape[0]
+
+    F[0, 0] = 0
+    for j in range(1, m + 1):
+        F[0, j] = 0 if local or free_b else j * gap
+    for i in range(1, n + 1):
+        F[i, 0] = 0 if local or free_a else i * gap
+
+    _fill_interior(a, b, table, gap, local, F)
+    return F
+
+
+def _fill_tile(a, b, table, gap, local, top, left):
+    """
+    Fill one rectangular block of the linear-gap DP matrix from its borders
+
+    Args:
+        a: Encoded residues of the block rows
+        b: Encoded residues of the block columns
+        table: (256, 256) substitution lookup table
+        gap: Linear gap penalty
+        local: Clamp values at zero (Smith-Waterman)
+        top: DP values of the row above the block, corner included (len(b)+1)
+        left: DP values of the column left of the block, corner included (len(a)+1)
+
+    Returns:
+        np.ndarray: (len(a)+1, len(b)+1) int64 block with the borders in row/column 0
+    """
+    n, m = a.shape[0], b.shape[0]
+    F = np.empty((n + 1, m + 1), dtype=np.int64)
+    for j in range(m + 1):
+        F[0, j] = top[j]
+    for i in range(1, n + 1):
+        F[i, 0] = left[i]
+
+    _fill_interior(a, b, table, gap, local, F)
+    return F
+
+
+# Affine pointer layout, as in src.algorithms
+_FROM_DIAG, _FROM_UP, _FROM_LEFT, _STOP = 0, 1, 2, 3
+_EXTEND_LEFT, _EXTEND_UP = 4, 8
+_NEG_INF = np.iinfo(np.int64).min // 4
+
+
+def _fill_affine(a, b, table, gap_open, gap_extend, local, P):
+    """
+    Gotoh three-state fill for affine gaps, cell by cell
+
+    Same recurrence, tie-breaking and pointer bytes as
+    src.algorithms._affine_fill. Only the H and F rows are kept.
+
+    Args:
+        a: Encoded first sequence (uint8)
+        b: Encoded second sequence (uint8)
+        table: (256, 256) substitution lookup table
+        gap_open: Score of the first residue of a gap
+        gap_extend: Score of each further residue of a gap
+        local: Smith-Waterman variant (clamp at zero, track best cell)
+        P: Output (n+1, m+1) uint8 pointer matrix
+
+    Returns:
+        tuple: (score, end row, end column)
+    """
+    n, m = a.shape[0], b.shape[0]
+    H = np.empty(m + 1, dtype=np.int64)
+    F = np.full(m + 1, _NEG_INF, dtype=np.int64)
+
+    H[0] = 0
+    P[0, 0] = _STOP
+    for j in range(1, m + 1):
+        if local:
+            H[j] = 0
+            P[0, j] = _STOP
+        else:
+            H[j] = gap_open + (j - 1) * gap_extend
+            P[0, j] = _FROM_LEFT | (_EXTEND_LEFT if j > 1 else 0)
+
+    best_score, best_i, best_j = 0, 0, 0
+    for i in range(1, n + 1):
+        sub = table[a[i - 1]]
+
+        # Column 0: D is the first-column value, no diagonal or horizontal gap
+        f_open = H[0] + gap_open
+        f_ext = F[0] + gap_extend
+        pointer = _EXTEND_UP if f_ext > f_open else 0
+        if local:
+            F[0] = f_open if f_open >= f_ext else f_ext
+            d = 0
+            pointer |= _STOP
+        else:
+            d = gap_open + (i - 1) * gap_extend
+            F[0] = d
+            pointer = _FROM_UP | (_EXTEND_UP if i > 1 else 0)
+        diag_h = H[0]
+        H[0] = d
+        P[i, 0] = pointer
+        row_best, row_j = d, 0
+        e = _NEG_INF
+        d_left = h_left = d
+
+        for j in range(1, m + 1):
+            f_open = H[j] + gap_open
+            f_ext = F[j] + gap_extend
+            f = f_open if f_open >= f_ext else f_ext
+            diag = diag_h + sub[b[j - 1]]
+            diag_h = H[j]
+            F[j] = f
+
+            d = diag if diag >= f else f
+            if local and d < 0:
+                d = 0
+            e_open = d_left + gap_open
+            e_ext = e + gap_extend
+            e = e_open if e_open >= e_ext else e_ext
+            h = d if d >= e else e
+
+            if local and h == 0:
+                pointer = _STOP
+            elif h == diag:
+                pointer = _FROM_DIAG
+            elif h == f:
+                pointer = _FROM_UP
+            else:
+                pointer = _FROM_LEFT
+            if e != h_left + gap_open:
+                pointer |= _EXTEND_LEFT
+            if f_ext > f_open:
+                pointer |= _EXTEND_UP
+            P[i, j] = pointer
+
+            H[j] = h
+            d_left, h_left = d, h
+            if h > row_best:
+                row_best, row_j = h, j
+
+        if local and row_best > best_score:
+            best_score, best_i, best_j = row_best, i, row_j
+
+    if not local:
+        return H[m], n, m
+    return best_score, best_i, best_j
+
+
+_compiled = {}
+_compile_lock = threading.Lock()
+
+
+def _compile(kernel):
+    """Import Numba and wrap a kernel on first use"""
+    global _fill_interior
+    compiled = _compiled.get(kernel)
+    if compiled is None:
+        with _compile_lock:
+            compiled = _compiled.get(kernel)
+            if compiled is None:
+                from numba import njit
+                # The kernels call _fill_interior, so it must be compiled first
+                if not hasattr(_fill_interior, "py_func"):
+                    _fill_interior = njit(nogil=True, cache=True)(_fill_interior)
+                compiled = _compiled[kernel] = njit(nogil=True, cache=True)(kernel)
+    return compiled
+
+
+def fill_linear(a, b, table, gap, local, free_a, free_b, F):
+    """Compiled _fill_linear (requires Numba)"""
+    return _compile(_fill_linear)(a, b, table, gap, local, free_a, free_b, F)
+
+
+def fill_tile(a, b, table, gap, local, top, left):
+    """Compiled _fill_tile (requires Numba)"""
+    return _compile(_fill_tile)(a, b, table, gap, local, top, left)
+
+
+def fill_affine(a, b, table, gap_open, gap_extend, local, P):
+    """Compiled _fill_affine (requires Numba)"""
+    return _compile(_fill_affine)(a, b, table, gap_open, gap_extend, local, P)
+
+
+def warmup(tables=()):
+    """
+    Compile the kernels for the common argument types ahead of the first request
+
+    With cache=True the machine code is stored next to this module, so later
+    processes only load it from disk.
+
+    Args:
+        tables: Substitution tables to compile for (their dtypes matter)
+    """
+    if not jit_enabled():
+        return
+    readonly = np.frombuffer(b"AC", dtype=np.uint8)  # Encoded strings are read-only views
+    writable = np.array([65, 67], dtype=np.uint8)     # Lists and reverse complements
+    for table in tables:
+        for a in (readonly, writable):
+            for b in (readonly, writable):
+                # Score matrices are int16 or int32 unless the pair is huge
+                for dtype in (np.int16, np.int32):
+                    fill_linear(a, b, table, -1, False, False, False, np.empty((3, 3), dtype=dtype))
+                # Tiled and planned score-only fills
+                border = np.zeros(3, dtype=np.int64)
+                fill_tile(a, b, table, -1, False, border, border)
+                # Affine-gap fills
+                fill_affine(a, b, table, -2, -1, False, np.empty((3, 3), dtype=np.uint8))
@@ -0,0 +1,371 @@
+"""
+Multiple Sequence Alignment Module
+Progressive alignment along a guide tree built from pairwise scores
+
+1. Every pair is scored (global alignment, no traceback) on a process pool
+   and the scores are turned into a NumPy distance matrix.
+2. A guide tree is built with UPGMA or neighbor joining.
+3. Profiles are merged bottom-up with a profile-profile DP using the
+   average sum-of-pairs score of two columns.
+
+A profile is a (columns, residues + 1) count array (last column: gaps) plus,
+for each member, the column of each of its residues. Gapped rows are only
+built for the final result, so memory grows with the total sequence length
+rather than with members x columns.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.algorithms import (
+    _FROM_DIAG,
+    _FROM_LEFT,
+    _FROM_UP,
+    _encode,
+    _fill_row,
+    warmup,
+)
+from src.planner import AlignmentPlanner
+
+GUIDE_TREES = ("upgma", "neighbor-joining")
+
+
+def score_distances(scores, self_scores, lengths, gap):
+    """
+    Turn global alignment scores into distances in [0, 1]
+
+    A pair scoring like the mean of its self-alignments is at distance 0;
+    one scoring like aligning every residue against a gap is at distance 1.
+
+    Args:
+        scores: (n, n) pairwise scores
+        self_scores: Score of each sequence against itself
+        lengths: Sequence lengths
+        gap: Linear gap penalty
+
+    Returns:
+        np.ndarray: (n, n) symmetric distance matrix with a zero diagonal
+    """
+    high = (self_scores[:, None] + self_scores[None, :]) / 2
+    low = (lengths[:, None] + lengths[None, :]) * gap
+    span = np.where(high > low, high - low, 1)
+    D = np.clip((high - scores) / span, 0, 1)
+    np.fill_diagonal(D, 0)
+    return D
+
+
+def _score_jobs(job):
+    """Process-pool entry point: scores of a chunk of pairs"""
+    aligner, sequences, pairs = job
+    return [aligner.score(sequences[i], sequences[j]) for i, j in pairs]
+
+
+def pairwise_scores(aligner, sequences, workers=None):
+    """
+    Score every pair of sequences (including each one against itself)
+
+    Args:
+        aligner: SequenceAligner; only its score method is used
+        sequences: List of sequences
+        workers: Processes to spread the pairs over (None or 1: in process)
+
+    Returns:
+        np.ndarray: (n, n) symmetric score matrix
+    """
+    n = len(sequences)
+    pairs = [(i, j) for i in range(n) for j in range(i, n)]
+
+    if not workers or workers <= 1:
+        results = _score_jobs((aligner, sequences, pairs))
+    else:
+        chunks = [pairs[k::4 * workers] for k in range(4 * workers)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=warmup) as executor:
+            parts = executor.map(_score_jobs, [(aligner, sequences, chunk) for chunk in chunks])
+            scored = {pair: score for chunk, part in zip(chunks, parts) for pair, score in zip(chunk, part)}
+        results = [scored[pair] for pair in pairs]
+
+    scores = np.empty((n, n))
+    for (i, j), score in zip(pairs, results):
+        scores[i, j] = scores[j, i] = score
+    return scores
+
+
+def upgma(D):
+    """
+    UPGMA guide tree
+
+    Args:
+        D: (n, n) distance matrix
+
+    Returns:
+        list: (left, right) node ids merged at each step; leaves are 0..n-1
+            and merge k creates node n+k
+    """
+    n = len(D)
+    D = D.astype(np.float64, copy=True)
+    np.fill_diagonal(D, np.inf)
+    nodes = list(range(n))
+    sizes = np.ones(n)
+    merges = []
+
+    for k in range(n - 1):
+        i, j = np.unravel_index(np.argmin(D), D.shape)
+        i, j = min(i, j), max(i, j)
+        merges.append((nodes[i], nodes[j]))
+
+        # Average distance of the new cluster, stored in slot i
+        merged = (D[i] * sizes[i] + D[j] * sizes[j]) / (sizes[i] + sizes[j])
+        D[i], D[:, i] = merged, merged
+        D[i, i] = np.inf
+        D[j], D[:, j] = np.inf, np.inf
+        sizes[i] += sizes[j]
+        nodes[i] = n + k
+    return merges
+
+
+def neighbor_joining(D):
+    """
+    Neighbor-joining guide tree (merge order of the joined pairs)
+
+    Returns:
+        list: (left, right) node ids as in upgma
+    """
+    n = len(D)
+    D = D.astype(np.float64, copy=True)
+    active = list(range(n))
+    nodes = list(range(n))
+    merges = []
+
+    for k in range(n - 1):
+        sub = D[np.ix_(active, active)]
+        r = len(active)
+        if r > 2:
+            totals = sub.sum(axis=1)
+            Q = (r - 2) * sub - totals[:, None] - totals[None, :]
+            np.fill_diagonal(Q, np.inf)
+            a, b = np.unravel_index(np.argmin(Q), Q.shape)
+        else:
+            a, b = 0, 1
+        a, b = min(a, b), max(a, b)
+        i, j = active[a], active[b]
+        merges.append((nodes[i], nodes[j]))
+
+        # Distances to the new node replace row i
+        merged = (D[i] + D[j] - D[i, j]) / 2
+        D[i], D[:, i] = merged, merged
+        D[i, i] = 0
+        nodes[i] = n + k
+        active.remove(j)
+    return merges
+
+
+class Profile:
+    """
+    Aligned group of sequences stored as column counts
+
+    Attributes:
+        counts: (columns, residues + 1) int32 counts; the last column counts gaps
+        members: Input index of each member sequence
+        positions: For each member, the column of each of its residues
+    """
+
+    def __init__(self, counts, members, positions):
+        self.counts = counts
+        self.members = members
+        self.positions = positions
+
+    @classmethod
+    def from_sequence(cls, index, codes, n_symbols):
+        """Single-sequence profile from alphabet indices"""
+        counts = np.zeros((len(codes), n_symbols + 1), dtype=np.int32)
+        counts[np.arange(len(codes)), codes] = 1
+        return cls(counts, [index], [np.arange(len(codes))])
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def size(self):
+        return len(self.members)
+
+    def merge(self, other, columns_self, columns_other, length):
+        """
+        Combine two profiles given the new column of each of their columns
+
+        Args:
+            other: Profile aligned to this one
+            columns_self: New column of each column of self (increasing)
+            columns_other: New column of each column of other
+            length: Number of columns of the merged profile
+        """
+        counts = np.zeros((length, self.counts.shape[1]), dtype=np.int32)
+        counts[columns_self] += self.counts
+        counts[columns_other] += other.counts
+        # Columns inserted into a profile hold a gap for each of its members
+        counts[:, -1] += self.size + other.size
+        counts[columns_self, -1] -= self.size
+        counts[columns_other, -1] -= other.size
+
+        positions = [columns_self[p] for p in self.positions] + [columns_other[p] for p in other.positions]
+        return Profile(counts, self.members + other.members, positions)
+
+
+def _profile_pointers(A, B, S, gap):
+    """
+    Global profile-profile DP with average sum-of-pairs column scores
+
+    Args:
+        A, B: Profiles (rows and columns of the DP)
+        S: (residues + 1, residues + 1) pair scores including gap symbols
+        gap: Linear gap penalty
+
+    Returns:
+        tuple: (score, pointer matrix using the _pointer_fill layout)
+    """
+    n, m = len(A), len(B)
+    pairs = A.size * B.size
+    # Column-column scores are (A.counts @ S @ B.counts.T) / pairs, row by row
+    weighted = A.counts @ S / pairs
+    counts_b = B.counts.T.astype(np.float64)
+    # Aligning a column against an inserted gap column
+    gap_a = gap * (A.counts[:, :-1].sum(axis=1) / A.size)
+    gap_b = gap * (B.counts[:, :-1].sum(axis=1) / B.size)
+    offsets = np.concatenate(([0.0], np.cumsum(gap_b)))
+    first_column = np.concatenate(([0.0], np.cumsum(gap_a)))
+
+    P = np.empty((n+1, m+1), dtype=np.uint8)
+    P[0] = _FROM_LEFT
+    P[:, 0] = _FROM_UP
+    row = offsets.copy()
+    tolerance = 1e-9 * (1 + np.abs(S).max() * (n + m))
+
+    for i in range(1, n+1):
+        sub = weighted[i-1] @ counts_b
+        diag = row[:-1] + sub
+        up = row[1:] + gap_a[i-1]
+        current = _fill_row(row, sub, first_column[i], gap_a[i-1], offsets)
+        cells = current[1:]
+        P[i, 1:] = np.where(
+            cells > np.maximum(diag, up) + tolerance, _FROM_LEFT,
+            np.where(diag >= up, _FROM_DIAG, _FROM_UP)
+        )
+        row = current
+    return float(row[m]), P
+
+
+def _column_maps(P):
+    """New column of every column of both profiles from the DP pointers"""
+    i, j = P.shape[0] - 1, P.shape[1] - 1
+    steps = []
+    while i > 0 or j > 0:
+        source = P[i, j]
+        steps.append(source)
+        if source == _FROM_DIAG:
+            i, j = i - 1, j - 1
+        elif source == _FROM_UP:
+            i -= 1
+        else:
+            j -= 1
+    steps = np.array(steps[::-1], dtype=np.uint8)
+    columns = np.arange(len(steps))
+    return columns[steps != _FROM_LEFT], columns[steps != _FROM_UP], len(steps)
+
+
+class MSAResult:
+    """
+    Multiple alignment of the input sequences
+
+    Attributes:
+        profile: Final Profile (column counts and residue columns)
+        distances: Pairwise distance matrix used for the guide tree
+        merges: Guide tree as (left, right) node ids, see upgma
+        alphabet: Byte code of each profile symbol (gap excluded)
+    """
+
+    def __init__(self, sequences, profile, distances, merges, alphabet):
+        self.sequences = sequences
+        self.profile = profile
+        self.distances = distances
+        self.merges = merges
+        self.alphabet = alphabet
+
+    def __len__(self):
+        return len(self.profile)
+
+    @property
+    def rows(self):
+        """Gapped sequences in input order"""
+        grid = np.full((len(self.sequences), len(self.profile)), ord('-'), dtype=np.uint8)
+        for member, positions in zip(self.profile.members, self.profile.positions):
+            grid[member, positions] = _encode(self.sequences[member])
+        return [row.tobytes().decode('ascii') for row in grid]
+
+    def consensus(self):
+        """Most frequent residue of each column (gaps count as '-')"""
+        symbols = np.append(self.alphabet, ord('-')).astype(np.uint8)
+        return symbols[self.profile.counts.argmax(axis=1)].tobytes().decode('ascii')
+
+
+class ProgressiveAligner:
+    """
+    Progressive multiple sequence alignment
+
+    Args:
+        scoring: AlignmentScoring object (linear gaps)
+        guide_tree: "upgma" or "neighbor-joining"
+        workers: Processes used for the pairwise scores
+    """
+
+    def __init__(self, scoring, guide_tree="upgma", workers=None):
+        if scoring.affine:
+            raise ValueError("ProgressiveAligner only supports linear gap penalties")
+        if guide_tree not in GUIDE_TREES:
+            raise ValueError(f"Unknown guide tree: {guide_tree}")
+        self.scoring = scoring
+        self.guide_tree = guide_tree
+        self.workers = workers
+
+    def distances(self, sequences):
+        """Distance matrix from global alignment scores"""
+        # One thread per process: the pool already uses every core
+        aligner = AlignmentPlanner(workers=1).aligner("global", self.scoring)
+        scores = pairwise_scores(aligner, sequences, self.workers)
+        lengths = np.array([len(seq) for seq in sequences], dtype=np.float64)
+        return score_distances(scores, np.diag(scores).copy(), lengths, self.scoring.gap)
+
+    def align(self, sequences):
+        """
+        Align all sequences
+
+        Args:
+            sequences: List of strings
+
+        Returns:
+            MSAResult
+        """
+        sequences = list(sequences)
+        if not sequences:
+            raise ValueError("No sequences to align")
+
+        encoded = [_encode(seq) for seq in sequences]
+        alphabet = np.unique(np.concatenate(encoded))
+        index = np.zeros(256, dtype=np.intp)
+        index[alphabet] = np.arange(len(alphabet))
+
+        S = np.zeros((len(alphabet) + 1, len(alphabet) + 1))
+        S[:-1, :-1] = self.scoring.table[np.ix_(alphabet, alphabet)]
+        S[-1, :-1] = S[:-1, -1] = self.scoring.gap
+
+        D = self.distances(sequences) if len(sequences) > 1 else np.zeros((1, 1))
+        merges = upgma(D) if self.guide_tree == "upgma" else neighbor_joining(D)
+
+        nodes = [Profile.from_sequence(k, index[codes], len(alphabet)) for k, codes in enumerate(encoded)]
+        for left, right in merges:
+            A, B = nodes[left], nodes[right]
+            _, P = _profile_pointers(A, B, S, self.scoring.gap)
+            columns_a, columns_b, length = _column_maps(P)
+            nodes.append(A.merge(B, columns_a, columns_b, length))
+            nodes[left] = nodes[right] = None  # Free merged profiles
+
+        return MSAResult(sequences, nodes[-1], D, merges, alphabet)
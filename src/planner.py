@@ -0,0 +1,310 @@
+"""
+Alignment Planner Module
+Chooses the engine and memory strategy for each alignment from the sequence
+lengths, the scoring scheme, whether a traceback is needed, the available
+backends and a memory/time budget
+
+Strategies:
+    score-only          score without traceback in O(m) memory
+    full                full score matrix (fastest, narrowest safe dtype)
+    pointer-compressed  one traceback byte per cell instead of scores
+    banded              band of diagonals widened until optimal (global only)
+    linear-space        tiled wavefront with checkpoint rows (bounded memory)
+"""
+
+from src import kernels
+from src.algorithms import (
+    NeedlemanWunsch,
+    PointerNeedlemanWunsch,
+    PointerSemiGlobal,
+    PointerSmithWaterman,
+    SemiGlobal,
+    SequenceAligner,
+    SmithWaterman,
+    get_aligner,
+    score_dtype,
+)
+from src.banded import BandedNeedlemanWunsch
+from src.tiled import TiledNeedlemanWunsch, TiledSmithWaterman
+
+STRATEGIES = ("score-only", "full", "pointer-compressed", "banded", "linear-space")
+
+# Alignment modes and the get_aligner names that select them
+MODES = {
+    "global": ("needleman-wunsch", "needleman", "global"),
+    "local": ("smith-waterman", "smith", "local", "smith-waterman-linear", "linear-local"),
+    "contained": ("semi-global", "glocal", "contained"),
+    "overlap": ("overlap", "semi-global-overlap"),
+}
+
+# Approximate single-core throughput in DP cells per second, measured on
+# 3000x3000 DNA pairs: (compiled kernels, NumPy fallback)
+_THROUGHPUT = {
+    "full": (2.0e8, 7.0e7),
+    "affine": (2.2e7, 2.2e7),
+    "pointer-compressed": (2.7e7, 2.7e7),
+    "banded": (5.0e6, 5.0e6),
+    "linear-space": (9.0e7, 1.8e7),   # Forward pass, band re-sweeps and tile refills
+    "tiled-score": (2.7e8, 4.0e7),
+    "row-score": (5.0e7, 5.0e7),
+    "bit-parallel": (1.3e9, 1.3e9),
+}
+
+DEFAULT_MEMORY_BUDGET = 512 * 2**20
+
+
+def _mode(algorithm_type):
+    """Map a get_aligner algorithm name to its alignment mode"""
+    name = algorithm_type.lower()
+    for mode, names in MODES.items():
+        if name in names:
+            return mode
+    raise ValueError(f"Unknown algorithm type: {algorithm_type}")
+
+
+class AlignmentPlan:
+    """
+    Engine chosen for one alignment with its estimated cost
+
+    Attributes:
+        strategy: One of STRATEGIES
+        aligner: SequenceAligner running the alignment
+        memory_bytes: Estimated peak memory of the engine
+        seconds: Estimated run time
+        fallback: Plan used if the engine runs out of its memory budget
+    """
+
+    def __init__(self, strategy, aligner, memory_bytes, seconds, fallback=None):
+        self.strategy = strategy
+        self.aligner = aligner
+        self.memory_bytes = memory_bytes
+        self.seconds = seconds
+        self.fallback = fallback
+
+    def align(self, seq1, seq2):
+        """Run the planned alignment; returns (score, aligned_seq1, aligned_seq2)"""
+        try:
+            return self.aligner.align(seq1, seq2)
+        except MemoryError:
+            if self.fallback is None:
+                raise
+            return self.fallback.align(seq1, seq2)
+
+    def align_span(self, seq1, seq2):
+        """Run the planned alignment; returns SequenceAligner.align_span's tuple"""
+        try:
+            return self.aligner.align_span(seq1, seq2)
+        except MemoryError:
+            if self.fallback is None:
+                raise
+            return self.fallback.align_span(seq1, seq2)
+
+    def score(self, seq1, seq2):
+        """Run the planned alignment and return only the score"""
+        try:
+            return self.aligner.score(seq1, seq2)
+        except MemoryError:
+            if self.fallback is None:
+                raise
+            return self.fallback.score(seq1, seq2)
+
+    def describe(self):
+        """One-line summary of the decision"""
+        return (f"{self.strategy} ({type(self.aligner).__name__}): "
+                f"~{self.memory_bytes / 2**20:.1f} MiB, ~{self.seconds:.3g} s")
+
+    def __repr__(self):
+        return f"AlignmentPlan({self.describe()})"
+
+
+class AlignmentPlanner:
+    """
+    Pick an engine per request so that no alignment exceeds the memory budget
+
+    Args:
+        memory_budget: Bytes an alignment may use
+        time_budget: Optional limit in seconds on the estimated run time
+        workers: Threads for the tiled engines (default: CPU count)
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, time_budget=None, workers=None):
+        self.memory_budget = memory_budget
+        self.time_budget = time_budget
+        self.workers = workers
+
+    def _rate(self, kind):
+        """Cells per second of an engine kind on the available backend"""
+        compiled, numpy = _THROUGHPUT[kind]
+        return compiled if kernels.jit_enabled() else numpy
+
+    def _tiled(self, engine, scoring, n, m):
+        """
+        Tiled engine whose tiles in flight use at most a quarter of the budget
+
+        A pair filling a single tile row or column has one tile per anti-diagonal,
+        so it gets one worker and no thread pool.
+        """
+        aligner = engine(scoring, memory_budget=self.memory_budget, workers=self.workers)
+        while aligner.tile_size > 64 and (aligner.workers+1) * (aligner.tile_size+1) ** 2 * 8 > self.memory_budget / 4:
+            aligner.tile_size //= 2
+        if min(n, m) <= aligner.tile_size:
+            aligner.workers = 1
+        return aligner
+
+    def candidates(self, algorithm_type, scoring, len1, len2, traceback=True):
+        """
+        All applicable plans in order of preference, ignoring the budgets
+
+        Returns:
+            list: AlignmentPlan objects
+        """
+        mode = _mode(algorithm_type)
+        n, m = len1, len2
+        cells = (n + 1) * (m + 1)
+        row_bytes = (m + 1) * 8
+
+        if mode in ("contained", "overlap") and scoring.affine:
+            raise ValueError("Semi-global alignment only supports linear gap penalties")
+
+        if not traceback:
+            return [self._score_only(mode, scoring, n, m)]
+
+        plans = []
+        if scoring.affine:
+            # The affine fill keeps pointers only; there is no bounded-memory affine engine
+            aligner = NeedlemanWunsch(scoring) if mode == "global" else SmithWaterman(scoring)
+            plans.append(AlignmentPlan(
+                "pointer-compressed", aligner, cells + 4 * row_bytes, cells / self._rate("affine")
+            ))
+            return plans
+
+        full_bytes = cells * score_dtype(n, m, scoring).itemsize
+        plans.append(AlignmentPlan(
+            "full", get_aligner(mode, scoring), full_bytes, cells / self._rate("full")
+        ))
+
+        pointer_engine = {
+            "global": PointerNeedlemanWunsch,
+            "local": PointerSmithWaterman,
+        }.get(mode)
+        pointer = pointer_engine(scoring) if pointer_engine else PointerSemiGlobal(scoring, mode)
+        plans.append(AlignmentPlan(
+            "pointer-compressed", pointer, cells + 3 * row_bytes, cells / self._rate("pointer-compressed")
+        ))
+
+        linear = None
+        if mode in ("global", "local"):
+            engine = TiledNeedlemanWunsch if mode == "global" else TiledSmithWaterman
+            aligner = self._tiled(engine, scoring, n, m)
+            try:
+                memory = aligner.memory_bytes(n, m)
+            except MemoryError:
+                memory = None
+            if memory is not None:
+                linear = AlignmentPlan(
+                    "linear-space", aligner, memory, cells / (self._rate("linear-space") * aligner.workers)
+                )
+
+        if mode == "global":
+            banded = BandedNeedlemanWunsch(scoring, memory_budget=self.memory_budget)
+            # Estimate for similar sequences: one fill of the initial band and one wider
+            band_cells = BandedNeedlemanWunsch.band_bytes(n, m, banded.bandwidth) // 8
+            plans.append(AlignmentPlan(
+                "banded", banded, 3 * band_cells * 8, 3 * band_cells / self._rate("banded"), fallback=linear
+            ))
+
+        if linear is not None:
+            plans.append(linear)
+        return plans
+
+    def _score_only(self, mode, scoring, n, m):
+        """Plan for a score without traceback"""
+        cells = (n + 1) * (m + 1)
+        row_bytes = (m + 1) * 8
+
+        if scoring.affine:
+            aligner = NeedlemanWunsch(scoring) if mode == "global" else SmithWaterman(scoring)
+            return AlignmentPlan("score-only", aligner, cells + 4 * row_bytes, cells / self._rate("affine"))
+
+        if mode in ("contained", "overlap"):
+            aligner = get_aligner(mode, scoring)
+            kind = "row-score" if type(aligner) is SemiGlobal else "bit-parallel"
+            return AlignmentPlan("score-only", aligner, 2 * row_bytes, cells / self._rate(kind))
+
+        aligner = get_aligner(mode, scoring)
+        if mode == "global" and type(aligner) is not NeedlemanWunsch:
+            # Bit-parallel edit distance
+            return AlignmentPlan("score-only", aligner, 2 * row_bytes, cells / self._rate("bit-parallel"))
+
+        engine = TiledNeedlemanWunsch if mode == "global" else TiledSmithWaterman
+        aligner = self._tiled(engine, scoring, n, m)
+        # The score pass keeps one DP row plus the tiles in flight
+        tile_bytes = (min(aligner.tile_size, n) + 1) * (min(aligner.tile_size, m) + 1) * 8
+        memory = 2 * row_bytes + (aligner.workers + 1) * tile_bytes
+        return AlignmentPlan(
+            "score-only", aligner, memory, cells / (self._rate("tiled-score") * aligner.workers)
+        )
+
+    def plan(self, algorithm_type, scoring, len1, len2, traceback=True):
+        """
+        Choose the preferred plan that fits the memory and time budgets
+
+        Args:
+            algorithm_type: Any name accepted by get_aligner
+            scoring: AlignmentScoring object
+            len1: Length of the first sequence
+            len2: Length of the second sequence
+            traceback: Whether aligned sequences are needed (False: score only)
+
+        Returns:
+            AlignmentPlan
+
+        Raises:
+            MemoryError: No strategy fits the memory budget
+            TimeoutError: No strategy within the memory budget fits the time budget
+        """
+        plans = self.candidates(algorithm_type, scoring, len1, len2, traceback)
+        fitting = [plan for plan in plans if plan.memory_bytes <= self.memory_budget]
+        if not fitting:
+            raise MemoryError(
+                f"No alignment strategy fits {len1}x{len2} in {self.memory_budget} bytes "
+                f"(smallest: {min(plans, key=lambda plan: plan.memory_bytes).describe()})"
+            )
+        if self.time_budget is not None:
+            fast = [plan for plan in fitting if plan.seconds <= self.time_budget]
+            if not fast:
+                raise TimeoutError(
+                    f"No alignment strategy fits {len1}x{len2} in {self.time_budget} s "
+                    f"(fastest: {min(fitting, key=lambda plan: plan.seconds).describe()})"
+                )
+            fitting = fast
+        return fitting[0]
+
+    def aligner(self, algorithm_type, scoring):
+        """SequenceAligner that plans every pair it aligns (for batch jobs)"""
+        return PlannedAligner(self, algorithm_type, scoring)
+
+
+class PlannedAligner(SequenceAligner):
+    """Aligner delegating each pair to the plan chosen for its lengths"""
+
+    def __init__(self, planner, algorithm_type, scoring):
+        super().__init__(scoring)
+        _mode(algorithm_type)  # Validate the name early
+        self.planner = planner
+        self.algorithm_type = algorithm_type
+
+    def align(self, seq1, seq2):
+        """Align with the plan for this pair"""
+        plan = self.planner.plan(self.algorithm_type, self.scoring, len(seq1), len(seq2))
+        return plan.align(seq1, seq2)
+
+    def align_span(self, seq1, seq2):
+        """Align with the plan for this pair, with the end cell"""
+        plan = self.planner.plan(self.algorithm_type, self.scoring, len(seq1), len(seq2))
+        return plan.align_span(seq1, seq2)
+
+    def score(self, seq1, seq2):
+        """Score with the score-only plan for this pair"""
+        plan = self.planner.plan(self.algorithm_type, self.scoring, len(seq1), len(seq2), traceback=False)
+        return plan.score(seq1, seq2)
@@ -0,0 +1,369 @@
+"""
+Genome Scan Module
+Local alignment of a query against a whole genome in overlapping windows
+
+The reference is streamed from FASTA and cut into windows that share twice
+the longest reference span a hit can have under the scoring scheme. Each
+window owns the hits ending past its first span and before its last one
+(the first and last windows of a record own up to their edges), so every
+hit lies entirely inside the window that reports it and is seen with a full
+span of context on its right. Windows are scored without traceback in blocks
+of rows on a pool of workers, keeping the best score ending on each
+reference row. Every peak of that profile reaching the threshold and
+separated from higher peaks by a drop of at least `drop` is re-aligned with
+a traceback over just its end region; hits overlapping a better or earlier
+reported hit are dropped, and the rest are yielded in reference order.
+Memory does not depend on the genome length.
+
+Run with: python -m src.scan QUERY --min-score 50
+"""
+
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.algorithms import AlignmentScoring, SmithWaterman, _encode, _fill_matrix, _residues, reverse_complement
+from src.tiled import fill_tile
+
+DEFAULT_WINDOW = 100_000
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class ScanHit:
+    """Local alignment of the query found in the reference"""
+
+    def __init__(self, record, score, ref_start, ref_end, query_start, query_end,
+                 aligned_ref, aligned_query, strand="+"):
+        self.record = record            # FASTA record name
+        self.score = score
+        self.ref_start = ref_start      # 0-based, end exclusive, on the record
+        self.ref_end = ref_end
+        self.query_start = query_start  # On the query as aligned (reverse complement for '-')
+        self.query_end = query_end
+        self.aligned_ref = aligned_ref
+        self.aligned_query = aligned_query
+        self.strand = strand
+
+    def as_tuple(self):
+        """Return (score, aligned_ref, aligned_query) like SequenceAligner.align"""
+        return self.score, self.aligned_ref, self.aligned_query
+
+    def __repr__(self):
+        return (f"ScanHit({self.record!r}, score={self.score}, "
+                f"ref={self.ref_start}-{self.ref_end}, strand={self.strand!r})")
+
+
+def fasta_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream the sequences of a FASTA file without loading them
+
+    Yields:
+        tuple: (record name, chunk of at most about chunk_size residues)
+    """
+    name, parts, size = None, [], 0
+    with open(path) as handle:
+        for line in handle:
+            if line.startswith('>'):
+                if parts:
+                    yield name, ''.join(parts)
+                header = line[1:].split()
+                name, parts, size = header[0] if header else "", [], 0
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            parts.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield name, ''.join(parts)
+                parts, size = [], 0
+    if parts:
+        yield name, ''.join(parts)
+
+
+def sliding_windows(chunks, window, overlap):
+    """
+    Cut streamed (record, chunk) pieces into overlapping windows
+
+    Consecutive windows of a record start window - overlap residues apart;
+    the last one is shorter. A trailing piece already covered by the previous
+    window's overlap is not repeated.
+
+    Yields:
+        tuple: (record, start, window sequence)
+    """
+    if not 0 <= overlap < window:
+        raise ValueError("The overlap must be shorter than the window")
+    step = window - overlap
+    record, buffer, start = None, "", 0
+
+    for name, chunk in chunks:
+        if name != record:
+            if buffer and (start == 0 or len(buffer) > overlap):
+                yield record, start, buffer
+            record, buffer, start = name, "", 0
+        buffer += chunk
+        while len(buffer) >= window:
+            yield record, start, buffer[:window]
+            buffer = buffer[step:]
+            start += step
+
+    if buffer and (start == 0 or len(buffer) > overlap):
+        yield record, start, buffer
+
+
+def _flag_last(windows):
+    """Add to each (record, start, seq) whether it is the last window of its record"""
+    previous = None
+    for window in windows:
+        if previous is not None:
+            yield (*previous, window[0] != previous[0])
+        previous = window
+    if previous is not None:
+        yield (*previous, True)
+
+
+def max_hit_span(query_length, scoring, min_score):
+    """
+    Longest reference span of a local alignment scoring at least min_score
+
+    The query side has at most query_length aligned pairs, each scoring at
+    most the best substitution, so the reference gaps can cost at most
+    query_length * best - min_score.
+
+    Raises:
+        ValueError: For affine or non-negative gap penalties, where no such
+            bound holds for the linear scan
+    """
+    if scoring.affine or scoring.gap >= 0:
+        raise ValueError("The genome scan needs a negative linear gap penalty")
+    best = max(int(scoring.table.max()), 0)
+    return query_length + max(0, query_length * best - max(min_score, 1)) // -scoring.gap
+
+
+def _peaks(profile, min_score, drop):
+    """
+    Rows of the profile peaks reaching min_score that stand out by at least drop
+
+    Flat runs count as one row, their rightmost. A peak is kept when, on each
+    side, the profile falls by at least drop before reaching a higher value
+    (ties go to the rightmost peak) or the window edge. This keeps one peak
+    per hit and drops the bumps along the decaying tail of a stronger hit.
+    """
+    if len(profile) == 0:
+        return []
+    last = np.flatnonzero(np.append(profile[1:] != profile[:-1], True))
+    runs = profile[last]
+    floor = np.iinfo(np.int64).min
+    previous = np.concatenate(([floor], runs[:-1]))
+    following = np.concatenate((runs[1:], [floor]))
+    peaks = last[(runs >= min_score) & (runs > previous) & (runs > following)]
+    if len(peaks) == 0:
+        return []
+
+    # Lowest row between consecutive peaks; lower peaks never bound a higher one
+    values = profile[peaks].tolist()
+    bounds = np.column_stack((peaks[:-1] + 1, peaks[1:])).ravel()
+    valleys = np.minimum.reduceat(profile, bounds)[::2].tolist() if len(bounds) else []
+
+    def drops(order, bounded_by_ties):
+        # One pass with a stack of (peak value, lowest value since the peak below it)
+        result, stack = {}, []
+        for k in order:
+            value = values[k]
+            low = valleys[min(k, k - order.step)] if 0 <= k - order.step < len(values) else 0
+            while stack and (stack[-1][0] < value or (not bounded_by_ties and stack[-1][0] == value)):
+                low = min(low, *stack.pop())
+            result[k] = value - (low if stack else 0)
+            stack.append((value, low))
+        return result
+
+    left = drops(range(len(values)), bounded_by_ties=False)
+    right = drops(range(len(values) - 1, -1, -1), bounded_by_ties=True)
+    return [int(p) for k, p in enumerate(peaks) if min(left[k], right[k]) >= drop]
+
+
+class GenomeScanner:
+    """
+    Scan a query along a reference with score-only local alignment per window
+
+    Args:
+        scoring: AlignmentScoring object (linear gaps)
+        min_score: Report hits scoring at least this much
+        window: Reference residues per window
+        overlap: Longest reference span of a reportable hit; consecutive
+            windows share twice this (default and minimum: max_hit_span of
+            the query)
+        workers: Threads scoring windows concurrently (the compiled kernels
+            release the GIL)
+        tile_size: Reference rows filled per block of a window
+        drop: Score drop separating two hits in one window (default: min_score)
+    """
+
+    def __init__(self, scoring, min_score, window=DEFAULT_WINDOW, overlap=None, workers=None, tile_size=1024,
+                 drop=None):
+        max_hit_span(1, scoring, min_score)  # Validate the gap penalty
+        self.scoring = scoring
+        self.min_score = min_score
+        self.window = window
+        self.overlap = overlap
+        self.workers = workers or 1
+        self.tile_size = tile_size
+        self.drop = min_score if drop is None else drop
+        self._traceback = SmithWaterman(scoring)._traceback
+
+    def _overlap(self, query):
+        span = max_hit_span(len(query), self.scoring, self.min_score)
+        if self.overlap is None:
+            return span
+        if self.overlap < span:
+            raise ValueError(f"An overlap of {self.overlap} is shorter than the longest possible hit ({span})")
+        return self.overlap
+
+    def _row_maxima(self, seq, query):
+        """Best local score ending on each row of the window, in blocks of tile_size rows"""
+        a, b = _encode(seq), _encode(query)
+        profile = np.empty(len(a), dtype=np.int64)
+        top = np.zeros(len(b) + 1, dtype=np.int64)
+        for r0 in range(0, len(a), self.tile_size):
+            r1 = min(r0 + self.tile_size, len(a))
+            F = fill_tile(a[r0:r1], b, self.scoring, True, top, np.zeros(r1 - r0 + 1, dtype=np.int64))
+            profile[r0:r1] = F[1:].max(axis=1)
+            top = F[-1]
+        return profile
+
+    def _hit(self, record, start, seq, query, strand, overlap, i):
+        """Best alignment ending on row i of the window, re-aligned over its end region"""
+        # The alignment spans at most overlap residues
+        offset = max(0, i - overlap)
+        region = seq[offset:i]
+        F = _fill_matrix(_encode(region), _encode(query), self.scoring, local=True)
+        end_i, end_j = len(region), int(F[-1].argmax())
+        aligned_ref, aligned_query = self._traceback(F, region, query, (end_i, end_j))
+
+        ref_end = start + i
+        return ScanHit(
+            record, int(F[end_i, end_j]),
+            ref_end - (len(aligned_ref) - aligned_ref.count('-')), ref_end,
+            end_j - (len(aligned_query) - aligned_query.count('-')), end_j,
+            aligned_ref, aligned_query, strand,
+        )
+
+    def _window_hits(self, record, start, seq, query, strand, overlap, last):
+        """Hits of one strand ending in the part of the window it owns"""
+        owned_from = 0 if start == 0 else overlap
+        owned_to = len(seq) if last else len(seq) - overlap
+        threshold = max(self.min_score, 1)
+        hits = [
+            self._hit(record, start, seq, query, strand, overlap, p + 1)
+            for p in _peaks(self._row_maxima(seq, query), threshold, self.drop)
+            if owned_from < p + 1 <= owned_to
+        ]
+
+        # Peaks along one alignment re-align to overlapping spans: keep the best
+        kept = []
+        for hit in sorted(hits, key=lambda hit: -hit.score):
+            if all(hit.ref_end <= other.ref_start or other.ref_end <= hit.ref_start for other in kept):
+                kept.append(hit)
+        return kept
+
+    def _scan_window(self, job):
+        record, start, seq, last, queries, overlap = job
+        hits = []
+        for strand, query in queries:
+            hits += self._window_hits(record, start, seq, query, strand, overlap, last)
+        return sorted(hits, key=lambda hit: hit.ref_end)
+
+    def scan(self, query, chunks, strand="+"):
+        """
+        Stream the hits of query along a reference
+
+        Args:
+            query: Query sequence (string)
+            chunks: Iterable of (record, sequence piece), e.g. fasta_chunks(path)
+                or [("chr", genome)]
+            strand: Query orientation to scan: "+", "-" (reverse complement) or "both"
+
+        Yields:
+            ScanHit: Every hit (per strand) reaching min_score, in reference
+                order of their ends; each hit is reported once
+        """
+        if strand not in SmithWaterman.STRANDS:
+            raise ValueError(f"Unknown strand: {strand}")
+        queries = []
+        if strand in ("+", "both"):
+            queries.append(("+", ''.join(_residues(query))))
+        if strand in ("-", "both"):
+            queries.append(("-", _residues(reverse_complement(query))))
+
+        overlap = self._overlap(query)
+        window = max(self.window, 4 * overlap)
+        jobs = ((record, start, seq, last, queries, overlap)
+                for record, start, seq, last in _flag_last(sliding_windows(chunks, window, 2 * overlap)))
+
+        # A window can re-find the tail of a hit reported by the previous one
+        reported = {}
+        for hits in self._map(jobs):
+            for hit in hits:
+                spans = reported.setdefault((hit.record, hit.strand), deque())
+                while spans and spans[0][1] <= hit.ref_end - window:
+                    spans.popleft()
+                if any(hit.ref_start < end and start < hit.ref_end for start, end in spans):
+                    continue
+                spans.append((hit.ref_start, hit.ref_end))
+                yield hit
+
+    def _map(self, jobs):
+        """Run window jobs in order with at most 2 * workers in flight"""
+        if self.workers <= 1:
+            for job in jobs:
+                yield self._scan_window(job)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for job in jobs:
+                pending.append(executor.submit(self._scan_window, job))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def scan_fasta(self, query, path, strand="+", chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream the hits of query along every record of a FASTA file"""
+        return self.scan(query, fasta_chunks(path, chunk_size), strand)
+
+
+def main():
+    from config import ECOLI_PATH
+
+    parser = argparse.ArgumentParser(description="Scan a query along a genome with local alignment")
+    parser.add_argument("query", help="Query sequence, or a FASTA file with it")
+    parser.add_argument("--genome", default=ECOLI_PATH)
+    parser.add_argument("--min-score", type=int, required=True)
+    parser.add_argument("--strand", choices=SmithWaterman.STRANDS, default="both")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--match", type=int, default=1)
+    parser.add_argument("--mismatch", type=int, default=-1)
+    parser.add_argument("--gap", type=int, default=-2)
+    args = parser.parse_args()
+
+    query = args.query
+    if query.endswith((".fa", ".fasta", ".fna")):
+        query = ''.join(chunk for _, chunk in fasta_chunks(query))
+
+    scanner = GenomeScanner(
+        AlignmentScoring(args.match, args.mismatch, args.gap),
+        args.min_score, window=args.window, workers=args.workers,
+    )
+    print("record\tstrand\tscore\tref_start\tref_end\tquery_start\tquery_end")
+    for hit in scanner.scan_fasta(query, args.genome, args.strand):
+        print(f"{hit.record}\t{hit.strand}\t{hit.score}\t{hit.ref_start}\t{hit.ref_end}"
+              f"\t{hit.query_start}\t{hit.query_end}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+Alignment Service Module
+Local HTTP/JSON service around get_aligner (standard library only).
+
+Concurrent requests are split into pairs, coalesced into micro-batches and run
+on a persistent worker pool. Admission control rejects work whose estimated
+DP cost (len(seq1) * len(seq2) cells) exceeds the configured limits, and
+batched requests stream one NDJSON line per pair as soon as it completes.
+
+Run with: python -m src.service --port 8765
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.algorithms import AlignmentScoring, get_aligner, warmup
+
+SCORING_KEYS = ("match", "mismatch", "gap", "matrix", "gap_open", "gap_extend")
+
+
+class AdmissionError(Exception):
+    """Raised when a request exceeds the service cost limits"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+@lru_cache(maxsize=64)
+def _cached_aligner(algorithm, scoring_items):
+    """Aligners are stateless, so each worker reuses one per configuration"""
+    return get_aligner(algorithm, AlignmentScoring(**dict(scoring_items)))
+
+
+def _run_job(job):
+    """Align one pair described by a job dict and return a JSON-ready result"""
+    aligner = _cached_aligner(job["algorithm"], job["scoring"])
+    strand = job["strand"]
+    if job["score_only"]:
+        score, strand = aligner.score_strands(job["seq1"], job["seq2"], strand)
+        return {"score": int(score), "strand": strand}
+    score, aligned1, aligned2, strand = aligner.align_strands(job["seq1"], job["seq2"], strand)
+    return {"score": int(score), "aligned_seq1": aligned1, "aligned_seq2": aligned2, "strand": strand}
+
+
+def run_batch(jobs):
+    """
+    Worker entry point: run a micro-batch of jobs
+
+    Errors are reported per job so one bad pair does not fail its batch.
+
+    Returns:
+        list: (ok, result_or_message) per job; ok is False for invalid jobs
+            and None for unexpected errors
+    """
+    outputs = []
+    for job in jobs:
+        try:
+            outputs.append((True, _run_job(job)))
+        except (ValueError, TypeError, KeyError, UnicodeError) as e:
+            outputs.append((False, str(e)))
+        except Exception as e:
+            outputs.append((None, f"{type(e).__name__}: {e}"))
+    return outputs
+
+
+class MicroBatcher:
+    """
+    Coalesce individual jobs into micro-batches for a persistent worker pool
+
+    A dispatcher thread takes the first waiting job, then keeps collecting for
+    up to max_wait seconds or max_batch_size jobs before submitting the batch.
+    """
+
+    def __init__(self, executor, max_batch_size=32, max_wait=0.005):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._dispatch, daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """Queue one job and return a Future for its result"""
+        future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        """Gather a batch starting with the first job"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Let the dispatch loop see the shutdown
+                break
+            batch.append(item)
+        return batch
+
+    def _dispatch(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            futures = [future for _, future in batch]
+            pending = self.executor.submit(run_batch, [job for job, _ in batch])
+            pending.add_done_callback(lambda done, futures=futures: self._distribute(done, futures))
+
+    @staticmethod
+    def _distribute(done, futures):
+        """Resolve every job future of a finished batch"""
+        if done.exception() is not None:
+            for future in futures:
+                future.set_exception(done.exception())
+            return
+        for future, (ok, value) in zip(futures, done.result()):
+            if ok:
+                future.set_result(value)
+            elif ok is None:
+                future.set_exception(RuntimeError(value))
+            else:
+                future.set_exception(ValueError(value))
+
+
+class AlignmentService:
+    """
+    Request validation, admission control and batching in front of the worker pool
+
+    Args:
+        workers: Size of the persistent worker pool
+        executor: "thread" (compiled kernels release the GIL) or "process"
+        max_batch_size: Maximum jobs per micro-batch
+        max_wait: Seconds to wait for more jobs before submitting a batch
+        max_pair_cells: Largest accepted len(seq1) * len(seq2) for one pair
+        max_inflight_cells: Total DP cells allowed in flight before requests get 503
+    """
+
+    def __init__(self, workers=4, executor="thread", max_batch_size=32, max_wait=0.005,
+                 max_pair_cells=25_000_000, max_inflight_cells=200_000_000):
+        if executor == "thread":
+            warmup()
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+        elif executor == "process":
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=warmup)
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+        self.batcher = MicroBatcher(self.pool, max_batch_size, max_wait)
+        self.max_pair_cells = max_pair_cells
+        self.max_inflight_cells = max_inflight_cells
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def inflight_cells(self):
+        return self._inflight
+
+    def parse_jobs(self, payload):
+        """
+        Turn a request body into job dicts
+
+        A body holds either one pair ("seq1", "seq2") or a list of "pairs";
+        "algorithm", "scoring", "strand" and "score_only" can be set at the top
+        level and overridden per pair.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        defaults = {
+            "algorithm": payload.get("algorithm", "global"),
+            "scoring": payload.get("scoring", {}),
+            "strand": payload.get("strand", "+"),
+            "score_only": payload.get("score_only", False),
+        }
+        pairs = payload["pairs"] if "pairs" in payload else [payload]
+        if not isinstance(pairs, list) or not pairs:
+            raise ValueError("'pairs' must be a non-empty list")
+
+        jobs = []
+        for pair in pairs:
+            if not isinstance(pair, dict):
+                raise ValueError("Every pair must be a JSON object")
+            job = dict(defaults)
+            job.update({k: pair[k] for k in defaults if k in pair})
+            if not isinstance(job["algorithm"], str) or not isinstance(job["strand"], str):
+                raise ValueError("'algorithm' and 'strand' must be strings")
+            if not isinstance(job["score_only"], bool):
+                raise ValueError("'score_only' must be true or false")
+            seq1, seq2 = pair.get("seq1"), pair.get("seq2")
+            if not isinstance(seq1, str) or not isinstance(seq2, str):
+                raise ValueError("Every pair needs string 'seq1' and 'seq2'")
+            scoring = job["scoring"]
+            if not isinstance(scoring, dict) or set(scoring) - set(SCORING_KEYS):
+                raise ValueError(f"'scoring' accepts only {', '.join(SCORING_KEYS)}")
+            for key, value in scoring.items():
+                valid = isinstance(value, str) if key == "matrix" else (
+                    isinstance(value, (int, float)) and not isinstance(value, bool))
+                if not valid and value is not None:
+                    raise ValueError(f"Invalid scoring value for '{key}': {value!r}")
+            job["seq1"] = seq1.strip().upper()
+            job["seq2"] = seq2.strip().upper()
+            job["scoring"] = tuple(sorted(scoring.items()))
+            jobs.append(job)
+        return jobs
+
+    def admit(self, jobs):
+        """
+        Reserve the estimated cost of the jobs or raise AdmissionError
+
+        Returns:
+            int: Reserved cells, to be passed to release()
+        """
+        costs = [max(1, len(job["seq1"]) * len(job["seq2"])) for job in jobs]
+        if max(costs) > self.max_pair_cells:
+            raise AdmissionError(
+                f"Pair of {max(costs)} cells exceeds the limit of {self.max_pair_cells}", 413
+            )
+        total = sum(costs)
+        with self._lock:
+            if self._inflight and self._inflight + total > self.max_inflight_cells:
+                raise AdmissionError("Service is at capacity, retry later", 503)
+            self._inflight += total
+        return total
+
+    def release(self, cells):
+        with self._lock:
+            self._inflight -= cells
+
+    def submit(self, jobs):
+        """Queue admitted jobs; returns one Future per job"""
+        return [self.batcher.submit(job) for job in jobs]
+
+    def close(self):
+        self.batcher.close()
+        self.pool.shutdown()
+
+
+class AlignmentRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front-end: POST /align, GET /health"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body are written separately
+    max_body_bytes = 64 * 1024 * 1024
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "Not found"})
+            return
+        self._send_json(200, {"status": "ok", "inflight_cells": self.service.inflight_cells})
+
+    def do_POST(self):
+        if self.path != "/align":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self._send_json(400, {"error": "Invalid Content-Length"})
+            self.close_connection = True
+            return
+        if length > self.max_body_bytes:
+            self._send_json(413, {"error": "Request body too large"})
+            self.close_connection = True
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"null")
+            jobs = self.service.parse_jobs(payload)
+            reserved = self.service.admit(jobs)
+        except AdmissionError as e:
+            headers = {"Retry-After": "1"} if e.status == 503 else None
+            self._send_json(e.status, {"error": str(e)}, headers)
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            futures = self.service.submit(jobs)
+            if "pairs" in payload:
+                self._stream_results(futures)
+            else:
+                self._send_single(futures[0])
+        finally:
+            self.service.release(reserved)
+
+    def _send_single(self, future):
+        try:
+            result = future.result()
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"Internal error: {e}"})
+        else:
+            self._send_json(200, result)
+
+    def _stream_results(self, futures):
+        """Send one NDJSON line per pair as results complete (chunked encoding)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        index_of = {future: i for i, future in enumerate(futures)}
+        for future in as_completed(futures):
+            line = {"index": index_of[future]}
+            try:
+                line.update(future.result())
+            except ValueError as e:
+                line["error"] = str(e)
+            except Exception as e:
+                line["error"] = f"Internal error: {e}"
+            self._write_chunk(json.dumps(line).encode() + b"\n")
+        self._write_chunk(b"")
+
+
+def make_server(host="127.0.0.1", port=8765, verbose=False, **service_options):
+    """
+    Build the HTTP server (call serve_forever() to run it)
+
+    Args:
+        host: Interface to bind (local only by default)
+        port: TCP port, 0 picks a free one
+        verbose: Log every request
+        **service_options: Passed to AlignmentService
+    """
+    server = ThreadingHTTPServer((host, port), AlignmentRequestHandler)
+    server.daemon_threads = True
+    server.service = AlignmentService(**service_options)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BioSeqAligner HTTP alignment service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-pair-cells", type=int, default=25_000_000)
+    parser.add_argument("--max-inflight-cells", type=int, default=200_000_000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port, args.verbose,
+        workers=args.workers,
+        executor=args.executor,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        max_pair_cells=args.max_pair_cells,
+        max_inflight_cells=args.max_inflight_cells,
+    )
+    print(f"Serving alignments on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Sequence Sketching Module
+Bottom-k MinHash sketches of k-mer sets, used to estimate similarity between
+sequences cheaply and skip pairs that cannot align well
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _mix64(x):
+    """SplitMix64 finalizer, applied element-wise to a uint64 array"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def kmer_hashes(seq, k):
+    """
+    Hash every k-mer of a sequence
+
+    Args:
+        seq: Sequence (string)
+        k: k-mer length
+
+    Returns:
+        np.ndarray: uint64 hash of each of the len(seq)-k+1 k-mers
+    """
+    codes = np.frombuffer(seq.upper().encode('ascii'), dtype=np.uint8).astype(np.uint64)
+    if len(codes) < k:
+        return np.empty(0, dtype=np.uint64)
+
+    # Polynomial rolling value over the window (wraps modulo 2**64), then mixed
+    powers = np.uint64(257) ** np.arange(k - 1, -1, -1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        values = (sliding_window_view(codes, k) * powers).sum(axis=1, dtype=np.uint64)
+        return _mix64(values)
+
+
+class KmerSketch:
+    """Bottom-k MinHash sketch of the k-mer set of one sequence"""
+
+    def __init__(self, hashes, n_kmers):
+        self.hashes = hashes      # Sorted, unique, at most sketch_size values
+        self.n_kmers = n_kmers    # Number of k-mers in the sequence
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def jaccard(self, other, sketch_size):
+        """Estimate the Jaccard index of the two k-mer sets"""
+        if len(self) == 0 or len(other) == 0:
+            return 0.0
+        union = np.union1d(self.hashes, other.hashes)[:sketch_size]
+        shared = np.intersect1d(self.hashes, other.hashes, assume_unique=True)
+        shared = np.count_nonzero(shared <= union[-1])
+        return shared / len(union)
+
+    def containment(self, other, sketch_size):
+        """Estimate the fraction of this sketch's k-mers present in other"""
+        j = self.jaccard(other, sketch_size)
+        if j == 0.0:
+            return 0.0
+        # |A n B| = J * (|A| + |B|) / (1 + J), with set sizes approximated by k-mer counts
+        shared = j * (self.n_kmers + other.n_kmers) / (1 + j)
+        return min(1.0, shared / self.n_kmers)
+
+
+class MinHashSketcher:
+    """
+    Compute and cache MinHash sketches of sequences
+
+    Sketches are computed once per distinct sequence and kept in a bounded
+    LRU cache, so one-vs-many and all-vs-all runs sketch each input once.
+    """
+
+    def __init__(self, k=11, sketch_size=128, cache_size=4096):
+        self.k = k
+        self.sketch_size = sketch_size
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def sketch(self, seq):
+        """Return the (cached) sketch of a sequence"""
+        if isinstance(seq, np.ndarray):
+            seq = seq.tobytes().decode('ascii')
+        elif not isinstance(seq, str):
+            seq = ''.join(seq)
+        cached = self._cache.get(seq)
+        if cached is not None:
+            self._cache.move_to_end(seq)
+            return cached
+
+        hashes = kmer_hashes(seq, self.k)
+        sketch = KmerSketch(np.unique(hashes)[:self.sketch_size], len(hashes))
+
+        self._cache[seq] = sketch
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return sketch
+
+    def jaccard(self, seq1, seq2):
+        """Estimated Jaccard similarity of the k-mer sets of two sequences"""
+        return self.sketch(seq1).jaccard(self.sketch(seq2), self.sketch_size)
+
+    def containment(self, seq1, seq2):
+        """Estimated fraction of the k-mers of the shorter sequence found in the longer one"""
+        s1, s2 = self.sketch(seq1), self.sketch(seq2)
+        if s1.n_kmers > s2.n_kmers:
+            s1, s2 = s2, s1
+        return s1.containment(s2, self.sketch_size)
+
+
+class SketchFilter:
+    """
+    Threshold prefilter placed in front of the aligners
+
+    A pair passes when its estimated similarity reaches the threshold.
+    Pairs where a sequence is shorter than k cannot be sketched and always pass.
+    """
+
+    METRICS = ("jaccard", "containment")
+
+    def __init__(self, threshold=0.05, metric="containment", k=11, sketch_size=128, cache_size=4096):
+        if metric not in self.METRICS:
+            raise ValueError(f"Unknown sketch metric: {metric}")
+        self.threshold = threshold
+        self.metric = metric
+        self.sketcher = MinHashSketcher(k, sketch_size, cache_size)
+
+    def similarity(self, seq1, seq2):
+        """Estimated similarity of the pair under the configured metric"""
+        if self.metric == "jaccard":
+            return self.sketcher.jaccard(seq1, seq2)
+        return self.sketcher.containment(seq1, seq2)
+
+    def passes(self, seq1, seq2):
+        """True if the pair should be aligned"""
+        if min(len(seq1), len(seq2)) < self.sketcher.k:
+            return True
+        return self.similarity(seq1, seq2) >= self.threshold
@@ -0,0 +1,370 @@
+"""
+Tiled Alignment Module
+Global and local alignment of a single pair too large for a full DP matrix
+
+The matrix is cut into square tiles filled in anti-diagonal (wavefront) order:
+the tiles of one anti-diagonal only depend on the previous one, so they run
+concurrently on a thread pool (the compiled tile kernel releases the GIL).
+Tiles exchange their borders through row and column buffers shared by the
+workers. Only checkpoint rows are kept; the traceback recomputes the tiles it
+walks through, one band of tile rows at a time.
+"""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src import kernels
+from src.algorithms import (
+    NeedlemanWunsch,
+    SmithWaterman,
+    _encode,
+    _fill_row,
+    _residues,
+    _ungapped_alignment,
+)
+
+_CELL_BYTES = np.dtype(np.int64).itemsize
+
+
+def fill_tile(a, b, scoring, local, top, left):
+    """
+    Fill one block of the linear-gap DP matrix from its top row and left column
+
+    Args:
+        a: Encoded residues of the block rows
+        b: Encoded residues of the block columns
+        scoring: AlignmentScoring object (linear gaps)
+        local: Clamp values at zero (Smith-Waterman)
+        top: DP row above the block, corner included (len(b)+1)
+        left: DP column left of the block, corner included (len(a)+1)
+
+    Returns:
+        np.ndarray: (len(a)+1, len(b)+1) block including its borders
+    """
+    if kernels.jit_enabled():
+        return kernels.fill_tile(a, b, scoring.table, scoring.gap, local, top, left)
+
+    gap = scoring.gap
+    table = scoring.table
+    offsets = np.arange(len(b)+1) * gap
+    F = np.empty((len(a)+1, len(b)+1), dtype=np.int64)
+    F[0] = top
+    for i, x in enumerate(a, start=1):
+        F[i] = _fill_row(F[i-1], table[x][b], left[i], gap, offsets, local)
+    return F
+
+
+class TiledFill:
+    """
+    Wavefront fill of the DP matrix of encoded sequences a and b
+
+    Tile (R, C) covers rows R*tile_size .. (R+1)*tile_size and the matching
+    columns, borders included, so neighbouring tiles share one row or column.
+    """
+
+    def __init__(self, a, b, scoring, local, tile_size, executor=None):
+        self.a = a
+        self.b = b
+        self.scoring = scoring
+        self.local = local
+        self.tile_size = tile_size
+        self.executor = executor
+        self.n_tile_rows = math.ceil(len(a) / tile_size)
+        self.n_tile_cols = math.ceil(len(b) / tile_size)
+
+    def row_span(self, R):
+        """First and last matrix row of tile row R"""
+        return R * self.tile_size, min((R+1) * self.tile_size, len(self.a))
+
+    def col_span(self, C):
+        """First and last matrix column of tile column C"""
+        return C * self.tile_size, min((C+1) * self.tile_size, len(self.b))
+
+    def first_row(self):
+        """Row 0 of the DP matrix"""
+        if self.local:
+            return np.zeros(len(self.b)+1, dtype=np.int64)
+        return np.arange(len(self.b)+1, dtype=np.int64) * self.scoring.gap
+
+    def first_column(self, r0, r1):
+        """Column 0 of the DP matrix between rows r0 and r1"""
+        if self.local:
+            return np.zeros(r1 - r0 + 1, dtype=np.int64)
+        return np.arange(r0, r1+1, dtype=np.int64) * self.scoring.gap
+
+    def sweep(self, start, stop, n_cols, row, checkpoints=None, borders=None):
+        """
+        Fill tile rows start..stop-1 over the first n_cols tile columns
+
+        Args:
+            start: First tile row
+            stop: End tile row (exclusive)
+            n_cols: Number of tile columns to fill
+            row: DP row at the top of tile row start; overwritten with the
+                bottom row of the swept region
+            checkpoints: Optional {tile row: array}; the DP row at the top of
+                each listed tile row is written into its array
+            borders: Optional dict receiving (top, left) of every filled tile
+
+        Returns:
+            tuple: (best score, (i, j)) over the swept cells, first in row-major order
+        """
+        # Right column of the last tile filled in each tile column. Tile rows
+        # alternate between two slots so that tile (R, C) never overwrites the
+        # column still needed by tile (R-1, C+1) on the same anti-diagonal.
+        right = [[None] * n_cols, [None] * n_cols]
+
+        def run(R, C):
+            r0, r1 = self.row_span(R)
+            c0, c1 = self.col_span(C)
+            left = self.first_column(r0, r1) if C == 0 else right[R % 2][C-1]
+            top = np.concatenate(([left[0]], row[c0+1:c1+1]))
+            F = fill_tile(self.a[r0:r1], self.b[c0:c1], self.scoring, self.local, top, left)
+
+            if borders is not None:
+                borders[(R, C)] = (top, left)
+            right[R % 2][C] = F[:, -1].copy()
+            row[c0+1:c1+1] = F[-1, 1:]
+            if C == 0:
+                row[0] = left[-1]
+            if checkpoints is not None and R+1 in checkpoints:
+                checkpoints[R+1][c0:c1+1] = F[-1]
+
+            if not self.local:
+                return 0, (0, 0)
+            i, j = np.unravel_index(F.argmax(), F.shape)
+            return int(F[i, j]), (r0 + int(i), c0 + int(j))
+
+        best = (0, (0, 0))
+        for diagonal in range(stop - start + n_cols - 1):
+            tiles = [
+                (R, diagonal - (R - start))
+                for R in range(start, stop)
+                if 0 <= diagonal - (R - start) < n_cols
+            ]
+            if self.executor is None or len(tiles) == 1:
+                results = [run(R, C) for R, C in tiles]
+            else:
+                results = list(self.executor.map(lambda tile: run(*tile), tiles))
+            for score, pos in results:
+                if score > best[0] or (score == best[0] and score > 0 and pos < best[1]):
+                    best = (score, pos)
+        return best
+
+
+class _TileView:
+    """
+    Read-only F[i, j] over a TiledFill, recomputing tiles on demand
+
+    A request outside the current tile re-sweeps the band of tile rows
+    starting at the nearest checkpoint above it (recording tile borders),
+    then refills just the requested tile.
+    """
+
+    def __init__(self, fill, checkpoints, band_rows):
+        self.fill = fill
+        self.checkpoints = checkpoints
+        self.band_rows = band_rows
+        self.band = None
+        self.borders = {}
+        self.tile = None
+        self.origin = (0, 0)
+        self.shape = (0, 0)
+
+    def __getitem__(self, index):
+        i, j = index
+        r0, c0 = self.origin
+        if not (0 <= i - r0 < self.shape[0] and 0 <= j - c0 < self.shape[1]):
+            size = self.fill.tile_size
+            self._load(max(i-1, 0) // size, max(j-1, 0) // size)
+            r0, c0 = self.origin
+        return self.tile[i - r0, j - c0]
+
+    def _load(self, R, C):
+        band = R // self.band_rows
+        if band != self.band or (R, C) not in self.borders:
+            start = band * self.band_rows
+            stop = min(start + self.band_rows, self.fill.n_tile_rows)
+            self.borders = {}
+            self.fill.sweep(start, stop, C+1, self.checkpoints[start].copy(), borders=self.borders)
+            self.band = band
+
+        r0, r1 = self.fill.row_span(R)
+        c0, c1 = self.fill.col_span(C)
+        top, left = self.borders[(R, C)]
+        self.tile = fill_tile(
+            self.fill.a[r0:r1], self.fill.b[c0:c1], self.fill.scoring, self.fill.local, top, left
+        )
+        self.origin = (r0, c0)
+        self.shape = self.tile.shape
+
+
+class TiledAligner:
+    """
+    Shared configuration of the tiled aligners
+
+    Args:
+        tile_size: Side of the square tiles
+        memory_budget: Bytes available for checkpoint rows and traceback buffers
+        workers: Threads filling the tiles of one anti-diagonal (default: CPU count)
+    """
+
+    def __init__(self, scoring, tile_size=1024, memory_budget=256 * 2**20, workers=None):
+        super().__init__(scoring)
+        self._check_linear_gaps()
+        self.tile_size = tile_size
+        self.memory_budget = memory_budget
+        self.workers = workers or os.cpu_count() or 1
+
+    def _memory(self, n, m, band_rows):
+        """Bytes of checkpoint rows and traceback buffers for a given checkpoint spacing"""
+        n_tile_rows = math.ceil(n / self.tile_size)
+        n_tile_cols = math.ceil(m / self.tile_size)
+        row_bytes = (m+1) * _CELL_BYTES
+        tile_bytes = (min(self.tile_size, n)+1) * (min(self.tile_size, m)+1) * _CELL_BYTES
+
+        checkpoint_bytes = math.ceil(n_tile_rows / band_rows) * row_bytes
+        border_bytes = band_rows * n_tile_cols * 2 * (self.tile_size+1) * _CELL_BYTES
+        working_bytes = 2 * row_bytes + (self.workers + 1) * tile_bytes
+        return checkpoint_bytes + border_bytes + working_bytes
+
+    def band_rows(self, n, m):
+        """
+        Tile rows between checkpoints: the smallest spacing whose checkpoint
+        rows and traceback buffers fit the memory budget
+        """
+        for band_rows in range(1, math.ceil(n / self.tile_size) + 1):
+            if self._memory(n, m, band_rows) <= self.memory_budget:
+                return band_rows
+        raise MemoryError(
+            f"A {n}x{m} alignment with tile size {self.tile_size} does not fit "
+            f"in a memory budget of {self.memory_budget} bytes"
+        )
+
+    def memory_bytes(self, n, m):
+        """Peak memory of an n x m alignment (MemoryError if over budget)"""
+        return self._memory(n, m, self.band_rows(n, m))
+
+    def _run(self, seq1, seq2, local, traceback):
+        """
+        Forward wavefront fill, keeping checkpoint rows when a traceback follows
+
+        Returns:
+            tuple: (last DP row, best local (score, pos), _TileView or None)
+        """
+        a, b = _encode(seq1), _encode(seq2)
+        band_rows = self.band_rows(len(a), len(b))
+
+        # With a single tile row or column every anti-diagonal holds one tile
+        parallel = self.workers > 1 and min(len(a), len(b)) > self.tile_size
+        executor = ThreadPoolExecutor(max_workers=self.workers) if parallel else None
+        try:
+            fill = TiledFill(a, b, self.scoring, local, self.tile_size, executor)
+            row = fill.first_row()
+            checkpoints = None
+            if traceback:
+                checkpoints = {R: np.empty_like(row) for R in range(band_rows, fill.n_tile_rows, band_rows)}
+            best = fill.sweep(0, fill.n_tile_rows, fill.n_tile_cols, row, checkpoints)
+
+            view = None
+            if traceback:
+                checkpoints[0] = fill.first_row()
+                # Traceback bands are swept sequentially
+                fill.executor = None
+                view = _TileView(fill, checkpoints, band_rows)
+            return row, best, view
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+
+class TiledNeedlemanWunsch(TiledAligner, NeedlemanWunsch):
+    """
+    Needleman-Wunsch over a tiled wavefront fill
+    Same result as NeedlemanWunsch in memory bounded by memory_budget
+    """
+
+    def score(self, seq1, seq2):
+        """Global alignment score (no checkpoints, no traceback)"""
+        if len(seq1) == 0 or len(seq2) == 0:
+            return super().score(seq1, seq2)
+        fast = _ungapped_alignment(seq1, seq2, self.scoring)
+        if fast is not None:
+            return fast[0]
+        row, _, _ = self._run(seq1, seq2, local=False, traceback=False)
+        return int(row[-1])
+
+    def align(self, seq1, seq2):
+        """
+        Perform tiled Needleman-Wunsch global alignment
+
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2)
+        """
+        if len(seq1) == 0 or len(seq2) == 0:
+            return NeedlemanWunsch.align(self, seq1, seq2)
+        fast = _ungapped_alignment(seq1, seq2, self.scoring)
+        if fast is not None:
+            return fast
+
+        row, _, view = self._run(seq1, seq2, local=False, traceback=True)
+        aligned_a, aligned_b = self._traceback(view, _residues(seq1), _residues(seq2))
+        return int(row[-1]), aligned_a, aligned_b
+
+
+class TiledSmithWaterman(TiledAligner, SmithWaterman):
+    """
+    Smith-Waterman over a tiled wavefront fill
+    Same result as SmithWaterman in memory bounded by memory_budget
+    """
+
+    def score(self, seq1, seq2):
+        """Best local alignment score (no checkpoints, no traceback)"""
+        if len(seq1) == 0 or len(seq2) == 0:
+            return 0
+        fast = _ungapped_alignment(seq1, seq2, self.scoring, local=True)
+        if fast is not None:
+            return fast[0]
+        return self.best_cell(seq1, seq2)[0]
+
+    def best_cell(self, seq1, seq2):
+        """
+        Best local score and the first cell reaching it, in O(m) memory
+
+        Returns:
+            tuple: (score, (i, j)), (0, (0, 0)) when nothing scores above zero
+        """
+        if len(seq1) == 0 or len(seq2) == 0:
+            return 0, (0, 0)
+        _, best, _ = self._run(seq1, seq2, local=True, traceback=False)
+        return best
+
+    def align_span(self, seq1, seq2):
+        """
+        Perform tiled Smith-Waterman local alignment
+
+        Args:
+            seq1: First sequence (string or list)
+            seq2: Second sequence (string or list)
+
+        Returns:
+            tuple: (score, aligned_seq1, aligned_seq2, end cell)
+        """
+        if len(seq1) == 0 or len(seq2) == 0:
+            return 0, '', '', (0, 0)
+        fast = _ungapped_alignment(seq1, seq2, self.scoring, local=True)
+        if fast is not None:
+            return fast + ((len(seq1), len(seq2)),)
+
+        _, (max_score, max_pos), view = self._run(seq1, seq2, local=True, traceback=True)
+        if max_score == 0:
+            return 0, '', '', (0, 0)
+        aligned_a, aligned_b = self._traceback(view, _residues(seq1), _residues(seq2), max_pos)
+        return max_score, aligned_a, aligned_b, (int(max_pos[0]), int(max_pos[1]))
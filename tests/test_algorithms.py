@@ -0,0 +1,282 @@
+"""
+Tests for the alignment engines in src.algorithms
+Run with: python -m pytest tests/test_algorithms.py
+"""
+
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src import kernels
+from src.bitparallel import edit_distance
+from src.algorithms import (
+    AlignmentScoring,
+    BitParallelNeedlemanWunsch,
+    NeedlemanWunsch,
+    PointerNeedlemanWunsch,
+    PointerSemiGlobal,
+    PointerSmithWaterman,
+    SmithWaterman,
+    LinearSpaceSmithWaterman,
+    SemiGlobal,
+    PreparedSequence,
+    get_aligner,
+    prepare,
+    reverse_complement,
+    score_dtype,
+)
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+def test_linear_space_local_matches_smith_waterman():
+    """Linear-space local alignment returns exactly the SmithWaterman result"""
+    rng = random.Random(26)
+    for match, mismatch, gap in [(1, -1, -2), (2, -2, -3), (1, 0, -1), (1, -3, -2)]:
+        scoring = AlignmentScoring(match, mismatch, gap)
+        for _ in range(100):
+            seq1 = random_dna(rng.randint(0, 30), rng)
+            seq2 = random_dna(rng.randint(0, 30), rng)
+            expected = SmithWaterman(scoring).align(seq1, seq2)
+            assert LinearSpaceSmithWaterman(scoring).align(seq1, seq2) == expected
+
+
+def test_linear_space_local_in_long_target():
+    """The hit is recovered when embedded in a long unrelated target"""
+    rng = random.Random(7)
+    hit = "GGGTTTACGATCGATCGGA"
+    target = random_dna(500, rng) + hit + random_dna(500, rng)
+    aligner = get_aligner("smith-waterman-linear", AlignmentScoring())
+    assert aligner.align(target, hit) == SmithWaterman(AlignmentScoring()).align(target, hit)
+
+
+def test_semi_global_contained_read():
+    """The whole query is aligned inside the target without end-gap penalties"""
+    aligner = get_aligner("semi-global", AlignmentScoring())
+    score, aligned_target, aligned_read = aligner.align("TTTTGATTACATTTT", "GATTCA")
+    assert aligned_read.replace('-', '') == "GATTCA"
+    assert aligned_target == "GATTACA"
+    assert score == 4
+    assert aligner.score("TTTTGATTACATTTT", "GATTCA") == score
+
+
+def test_semi_global_overlap():
+    """A suffix of seq1 is aligned to a prefix of seq2"""
+    aligner = SemiGlobal(AlignmentScoring(), mode="overlap")
+    assert aligner.align("CCCCGATTACA", "GATTACAGGGG") == (7, "GATTACA", "GATTACA")
+    assert aligner.score("CCCCGATTACA", "GATTACAGGGG") == 7
+
+
+def test_protein_substitution_matrix():
+    """Matrix scores are looked up by residue and used by every engine"""
+    scoring = AlignmentScoring(gap=-4, matrix="BLOSUM62")
+    assert scoring.similarity('W', 'W') == 11
+    assert scoring.similarity('a', 'R') == -1
+    assert scoring.table.dtype.itemsize == 1
+    
+    score, aligned_a, aligned_b = NeedlemanWunsch(scoring).align("HEAGAWGHEE", "PAWHEAE")
+    assert sum(
+        scoring.gap if '-' in (x, y) else scoring.similarity(x, y)
+        for x, y in zip(aligned_a, aligned_b)
+    ) == score
+    assert SmithWaterman(scoring).align("HEAGAWGHEE", "PAWHEAE") == \
+        LinearSpaceSmithWaterman(scoring).align("HEAGAWGHEE", "PAWHEAE")
+
+
+def test_unknown_matrix():
+    with pytest.raises(ValueError):
+        AlignmentScoring(matrix="BLOSUM999")
+
+
+def test_affine_gaps_prefer_single_long_gap():
+    """With affine penalties one long gap beats several short ones"""
+    scoring = AlignmentScoring(match=2, mismatch=-1, gap_open=-5, gap_extend=-1)
+    score, aligned_a, aligned_b = NeedlemanWunsch(scoring).align("ACGTTTTTACGT", "ACGTACGT")
+    assert aligned_b.count('-') == 4 and '----' in aligned_b
+    assert score == 8 * 2 + scoring.gap_cost(4)
+    
+    score, aligned_a, aligned_b = SmithWaterman(scoring).align(
+        "GGGACGTACGATTTTTCGTACGAGGG", "ACGTACGACGTACGA"
+    )
+    assert aligned_b == "ACGTACGA-----CGTACGA"
+    assert score == 15 * 2 + scoring.gap_cost(5)
+
+
+def test_affine_with_equal_penalties_is_linear():
+    rng = random.Random(29)
+    linear = AlignmentScoring(gap=-3)
+    affine = AlignmentScoring(gap_open=-3, gap_extend=-3)
+    for _ in range(50):
+        seq1, seq2 = random_dna(rng.randint(0, 20), rng), random_dna(rng.randint(0, 20), rng)
+        assert NeedlemanWunsch(affine).align(seq1, seq2) == NeedlemanWunsch(linear).align(seq1, seq2)
+
+
+def test_bit_parallel_edit_distance():
+    assert edit_distance("GATTACA", "GCATGCU") == 4
+    assert edit_distance("GATTACA", "TTTTGATTCATTTT", mode="semi-global") == 1
+    assert edit_distance("", "ACGT") == 4
+    assert edit_distance("GATTACA", "GCATGCU", max_distance=3) is None
+    assert edit_distance("A" * 200, "C" * 10, max_distance=5) is None
+
+
+def test_bit_parallel_dispatch_matches_dp_score():
+    """Edit-distance-equivalent schemes dispatch to the bit-parallel engine"""
+    rng = random.Random(30)
+    for match, mismatch, gap in [(0, -1, -1), (2, 0, -1), (4, 0, -2)]:
+        scoring = AlignmentScoring(match, mismatch, gap)
+        aligner = get_aligner("global", scoring)
+        assert isinstance(aligner, BitParallelNeedlemanWunsch)
+        for _ in range(50):
+            seq1, seq2 = random_dna(rng.randint(0, 90), rng), random_dna(rng.randint(0, 90), rng)
+            assert aligner.score(seq1, seq2) == NeedlemanWunsch(scoring).align(seq1, seq2)[0]
+    
+    assert type(get_aligner("global", AlignmentScoring(1, -1, -2))) is NeedlemanWunsch
+
+
+def test_reverse_complement_strand_selection():
+    rng = random.Random(32)
+    ref = random_dna(200, rng)
+    read = ref[50:110]
+    read_rc = reverse_complement(read)
+    assert reverse_complement("ACGTNacgt").tobytes() == b"acgtNACGT"
+    
+    aligner = get_aligner("semi-global", AlignmentScoring())
+    score, aligned_ref, aligned_read, strand = aligner.align_strands(ref, read_rc)
+    assert strand == "-"
+    assert (score, aligned_ref, aligned_read) == aligner.align(ref, read)
+    assert aligner.score_strands(ref, read, strand="+") == (60, "+")
+
+
+@pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="numba not installed")
+def test_compiled_kernel_matches_numpy_fill():
+    rng = random.Random(33)
+    scoring = AlignmentScoring(2, -1, -2)
+    cases = [(random_dna(rng.randint(0, 40), rng), random_dna(rng.randint(0, 40), rng)) for _ in range(30)]
+    previous = kernels.jit_enabled()
+    try:
+        for engine in ("global", "local", "semi-global", "overlap"):
+            aligner = get_aligner(engine, scoring)
+            kernels.set_jit_enabled(False)
+            expected = [aligner.align(seq1, seq2) for seq1, seq2 in cases]
+            kernels.set_jit_enabled(True)
+            assert [aligner.align(seq1, seq2) for seq1, seq2 in cases] == expected
+    finally:
+        kernels.set_jit_enabled(previous)
+
+
+@pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="numba not installed")
+def test_compiled_affine_kernel_matches_numpy_fill():
+    from src.algorithms import _affine_fill, _encode
+    rng = random.Random(34)
+    schemes = [AlignmentScoring(2, -1, gap_open=-5, gap_extend=-1), AlignmentScoring(matrix="BLOSUM62", gap_open=-11, gap_extend=-1)]
+    cases = [(random_dna(rng.randint(0, 40), rng), random_dna(rng.randint(0, 40), rng)) for _ in range(30)]
+    previous = kernels.jit_enabled()
+    try:
+        for scoring in schemes:
+            for local in (False, True):
+                kernels.set_jit_enabled(False)
+                expected = [_affine_fill(_encode(seq1), _encode(seq2), scoring, local) for seq1, seq2 in cases]
+                kernels.set_jit_enabled(True)
+                for (seq1, seq2), (score, end_pos, P) in zip(cases, expected):
+                    compiled = _affine_fill(_encode(seq1), _encode(seq2), scoring, local)
+                    assert compiled[:2] == (score, end_pos)
+                    assert np.array_equal(compiled[2], P)
+    finally:
+        kernels.set_jit_enabled(previous)
+
+
+def test_score_dtype_promotion():
+    assert score_dtype(1000, 1000, AlignmentScoring()) == np.int16
+    assert score_dtype(100_000, 100_000, AlignmentScoring()) == np.int32
+
+    # 300 matches of 1000 overflow int16, so the fill is promoted
+    scoring = AlignmentScoring(match=1000, mismatch=-1000, gap=-2000)
+    seq = random_dna(300, random.Random(37))
+    for engine in ("global", "local", "semi-global"):
+        aligner = get_aligner(engine, scoring)
+        assert aligner.matrix_dtype(seq, seq) == np.int32
+        assert aligner.align(seq, seq) == (300_000, seq, seq)
+
+
+def test_pointer_engines_match_score_matrices():
+    rng = random.Random(38)
+    scoring = AlignmentScoring(2, -1, -2)
+    for _ in range(30):
+        seq1, seq2 = random_dna(rng.randint(0, 50), rng), random_dna(rng.randint(0, 50), rng)
+        assert PointerNeedlemanWunsch(scoring).align(seq1, seq2) == NeedlemanWunsch(scoring).align(seq1, seq2)
+        assert PointerSmithWaterman(scoring).align(seq1, seq2) == SmithWaterman(scoring).align(seq1, seq2)
+        for mode in SemiGlobal.MODES:
+            assert PointerSemiGlobal(scoring, mode).align(seq1, seq2) == SemiGlobal(scoring, mode).align(seq1, seq2)
+
+
+def test_ungapped_fast_path(monkeypatch):
+    import src.algorithms as algorithms
+    rng = random.Random(39)
+    seq1 = random_dna(500, rng)
+    seq2 = seq1[:100] + ("A" if seq1[100] != "A" else "C") + seq1[101:]
+    scoring = AlignmentScoring(2, -3, -5)
+    expected = {engine: get_aligner(engine, scoring).align(seq1, seq2) for engine in ("global", "local")}
+
+    def no_fill(*args, **kwargs):
+        raise AssertionError("DP matrix filled")
+
+    monkeypatch.setattr(algorithms, "_fill_matrix", no_fill)
+    assert NeedlemanWunsch(scoring).align(seq1, seq1) == (1000, seq1, seq1)
+    assert NeedlemanWunsch(scoring).align(seq1, seq2) == expected["global"] == (995, seq1, seq2)
+    assert SmithWaterman(scoring).align(seq1, seq1) == (1000, seq1, seq1)
+
+    # Beyond the bounds the DP runs: one mismatch locally, three mismatches globally
+    with pytest.raises(AssertionError):
+        SmithWaterman(scoring).align(seq1, seq2)
+    seq3 = str(reverse_complement(seq2[200:203])[::-1].tobytes(), 'ascii')  # Complement: 3 mismatches
+    with pytest.raises(AssertionError):
+        NeedlemanWunsch(scoring).align(seq1, seq2[:200] + seq3 + seq2[203:])
+
+
+def test_ungapped_fast_path_with_several_substitutions(monkeypatch):
+    import src.algorithms as algorithms
+    rng = random.Random(139)
+    scoring = AlignmentScoring(1, -1, -2)
+    seq1 = random_dna(300, rng)
+    seq2 = list(seq1)
+    for k in range(25, 300, 40):  # 7 substitutions
+        seq2[k] = "A" if seq1[k] != "A" else "C"
+    seq2 = ''.join(seq2)
+    optimum = algorithms._fill_matrix(algorithms._encode(seq1), algorithms._encode(seq2), scoring)[-1, -1]
+
+    def no_fill(*args, **kwargs):
+        raise AssertionError("DP matrix filled")
+
+    monkeypatch.setattr(algorithms, "_fill_matrix", no_fill)
+    assert NeedlemanWunsch(scoring).align(seq1, seq2) == (optimum, seq1, seq2) == (300 - 14, seq1, seq2)
+
+
+def test_prepared_query_matches_plain_sequences():
+    rng = random.Random(45)
+    query = random_dna(150, rng)
+    targets = [random_dna(rng.randint(100, 200), rng) for _ in range(5)]
+    prepared = prepare(query)
+    assert prepare(query) is prepared and prepare(prepared) is prepared
+    assert reverse_complement(prepared) is prepared.reverse_complement()
+    assert type(prepared[10:20]) is PreparedSequence and prepared[10:20].score_rows(np.zeros(1)) is None
+
+    linear, affine = AlignmentScoring(2, -1, -2), AlignmentScoring(gap_open=-5, gap_extend=-1)
+    engines = [
+        NeedlemanWunsch(linear), SmithWaterman(linear), PointerNeedlemanWunsch(linear),
+        SemiGlobal(linear), LinearSpaceSmithWaterman(linear), NeedlemanWunsch(affine),
+    ]
+    for engine in engines:
+        for target in targets:
+            assert engine.align(target, engine.prepare(query)) == engine.align(target, query)
+        assert engine.align_strands(targets[0], prepared) == engine.align_strands(targets[0], query)
+
+
+def test_import_is_lazy():
+    code = "import sys, src.algorithms; print('numba' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "False"
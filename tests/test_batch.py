@@ -0,0 +1,76 @@
+"""
+Tests for batch alignment and sketch prefiltering
+Run with: python -m pytest tests/test_batch.py
+"""
+
+import random
+
+from src.algorithms import AlignmentScoring, get_aligner, reverse_complement
+from src.batch import align_all_vs_all, align_one_vs_many
+from src.mutations import mutate_seq
+from src.sketch import MinHashSketcher, SketchFilter
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+def test_sketch_similarity():
+    rng = random.Random(31)
+    ref = random_dna(2000, rng)
+    mutated, _ = mutate_seq(ref, n_mutations=40, seed=1)
+    unrelated = random_dna(2000, rng)
+
+    sketcher = MinHashSketcher(k=11, sketch_size=128)
+    assert sketcher.jaccard(ref, ref) == 1.0
+    assert sketcher.jaccard(ref, mutated) > 0.3
+    assert sketcher.jaccard(ref, unrelated) < 0.05
+    assert sketcher.sketch(ref) is sketcher.sketch(ref)  # Cached
+
+
+def test_one_vs_many_prefilter_skips_unrelated_targets():
+    rng = random.Random(32)
+    query = random_dna(300, rng)
+    related, _ = mutate_seq(query, n_mutations=10, seed=2)
+    targets = [random_dna(300, rng), related, random_dna(300, rng)]
+
+    aligner = get_aligner("global", AlignmentScoring())
+    results = align_one_vs_many(aligner, query, targets, prefilter=SketchFilter(threshold=0.2))
+    assert [r.index1 for r in results] == [1]
+    assert results[0].as_tuple() == aligner.align(related, query)
+
+    unfiltered = align_one_vs_many(aligner, query, targets, score_only=True)
+    assert [r.score for r in unfiltered] == [aligner.score(t, query) for t in targets]
+
+
+def test_all_vs_all_pairs():
+    sequences = ["GATTACA", "GTCGACGC", "GATTACA"]
+    results = align_all_vs_all(get_aligner("global", AlignmentScoring()), sequences)
+    assert [(r.index1, r.index2) for r in results] == [(0, 1), (0, 2), (1, 2)]
+    assert results[1].score == 7
+
+
+def test_both_strands_in_batch():
+    rng = random.Random(33)
+    ref = random_dna(400, rng)
+    reads = [ref[10:90], reverse_complement(ref[200:280]).tobytes().decode('ascii')]
+
+    aligner = get_aligner("local", AlignmentScoring())
+    results = [
+        align_one_vs_many(aligner, read, [ref], prefilter=SketchFilter(threshold=0.2), strand="both")[0]
+        for read in reads
+    ]
+    assert [r.strand for r in results] == ["+", "-"]
+    assert [r.score for r in results] == [80, 80]
+
+
+def test_thread_pool_matches_sequential():
+    rng = random.Random(34)
+    query = random_dna(80, rng)
+    targets = [random_dna(200, rng) for _ in range(20)]
+    aligner = get_aligner("local", AlignmentScoring())
+
+    sequential = align_one_vs_many(aligner, query, targets)
+    threaded = align_one_vs_many(aligner, query, targets, workers=4)
+    assert [r.as_tuple() for r in threaded] == [r.as_tuple() for r in sequential]
+    assert [r.index1 for r in threaded] == list(range(20))
@@ -0,0 +1,66 @@
+"""
+Tests for the engine conformance harness
+Run with: python -m pytest tests/test_conformance.py
+"""
+
+import importlib.util
+
+import pytest
+
+from src.algorithms import AlignmentScoring, NeedlemanWunsch, SequenceAligner
+from src.conformance import Engine, default_engines, rescore, run_conformance
+
+
+def test_rescore_charges_affine_gap_runs():
+    scoring = AlignmentScoring(match=1, mismatch=-1, gap_open=-5, gap_extend=-1)
+    assert rescore("AC--GT", "ACTTGA", scoring) == 1 + 1 - 6 + 1 - 1
+    assert rescore("A-C-", "AGCT", scoring) == 1 - 5 + 1 - 5
+
+
+def test_library_engines_conform():
+    engines = [engine for engine in default_engines() if not engine.name.startswith("legacy.")]
+    report = run_conformance(engines, lengths=(12, 40), cases=2, seed=1)
+
+    assert report.issues == []
+    speedups = report.speedups()
+    assert ("NeedlemanWunsch", 40, "align") in speedups and ("BitParallelNeedlemanWunsch", 40, "score") in speedups
+    assert ("BitParallelSemiGlobal", 40, "score") in speedups
+    assert "TiledSmithWaterman" in report.format_table()
+
+
+@pytest.mark.skipif(importlib.util.find_spec("numba") is None, reason="numba not installed")
+def test_default_run_passes_with_legacy_engines():
+    engines = [engine for engine in default_engines() if engine.name.startswith("legacy.")]
+    schemes = {"Standard": {"match": 1, "mismatch": -1, "gap": -2}}
+    report = run_conformance(engines, schemes, lengths=(16,), cases=4, seed=0)
+
+    assert report.ok, report.issues
+
+
+class _OffByOne(SequenceAligner):
+    def align(self, seq1, seq2):
+        return 1, seq1 + '-' * len(seq2), '-' * len(seq1) + seq2
+
+
+def test_wrong_scores_are_reported():
+    schemes = {"Standard": {"match": 1, "mismatch": -1, "gap": -2}}
+    report = run_conformance([Engine("broken", "global", _OffByOne)], schemes, lengths=(8,), cases=1)
+
+    issues = {issue for _, name, _, _, issue in report.issues}
+    assert any(issue.startswith("reported score 1") for issue in issues)
+    assert any("differs from the reference" in issue for issue in issues)
+
+
+class _WrongScore(SequenceAligner):
+    def align(self, seq1, seq2):
+        return NeedlemanWunsch(self.scoring).align(seq1, seq2)
+
+    def score(self, seq1, seq2):
+        return self.align(seq1, seq2)[0] + 1
+
+
+def test_score_fast_paths_are_checked():
+    schemes = {"Standard": {"match": 1, "mismatch": -1, "gap": -2}}
+    report = run_conformance([Engine("fast", "global", _WrongScore)], schemes, lengths=(8,), cases=1)
+
+    assert report.issues and all(issue.startswith("score() returned") for *_, issue in report.issues)
@@ -0,0 +1,78 @@
+"""
+Tests for the columnar result export
+Run with: python -m pytest tests/test_export.py
+"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.algorithms import AlignmentScoring, PointerSemiGlobal, SemiGlobal, SmithWaterman, get_aligner
+from src.batch import BatchResult, align_one_vs_many, align_pairs
+from src.export import ResultTable, ResultWriter, cigar
+from ui import AlignmentStats
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+def test_cigar():
+    assert cigar("AC-GT", "ACTG-") == "2M1I1M1D"
+    assert cigar("", "") == ""
+
+
+def test_batch_export_round_trip(tmp_path):
+    rng = random.Random(44)
+    aligner = SmithWaterman(AlignmentScoring(2, -1, -2))
+    query = random_dna(60, rng)
+    targets = [random_dna(50, rng) + query[5:50] + random_dna(30, rng) for _ in range(25)]
+    expected = align_one_vs_many(aligner, query, targets)
+
+    with ResultWriter(tmp_path / "results", flush_rows=10) as writer:
+        assert align_one_vs_many(aligner, query, targets, writer=writer, workers=2) == 25
+
+    table = ResultTable(tmp_path / "results")
+    assert len(table) == 25 and len(table.parts) == 3
+    assert isinstance(next(table.iter_parts("score"))["score"], np.memmap)
+    assert table.column("score").tolist() == [result.score for result in expected]
+
+    for row, result in enumerate(expected):
+        stats = AlignmentStats(result.aligned_seq1, result.aligned_seq2, result.score)
+        assert table.column("matches")[row] == stats.matches
+        assert table.column("mismatches")[row] == stats.mismatches
+        assert table.column("gaps")[row] == stats.gaps
+        start, end = table.column("ref_start")[row], table.column("ref_end")[row]
+        assert targets[row][start:end] == result.aligned_seq1.replace('-', '')
+        assert table.cigar(row) == cigar(result.aligned_seq1, result.aligned_seq2)
+
+
+def test_concurrent_writers(tmp_path):
+    aligner = get_aligner("global", AlignmentScoring())
+    pairs = [("ACGT" * k, "AGGT" * k) for k in range(1, 41)]
+
+    def work(offset):
+        # Score-only results: no alignment, so no coordinates or CIGAR
+        with ResultWriter(tmp_path, flush_rows=7) as writer:
+            for index in range(offset, len(pairs), 4):
+                writer.append(BatchResult(index, 0, aligner.score(*pairs[index])))
+        return writer.rows_written
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert sum(executor.map(work, range(4))) == 40
+
+    table = ResultTable(tmp_path)
+    order = np.argsort(table.column("index1"))
+    assert table.column("score")[order].tolist() == [aligner.score(*pair) for pair in pairs]
+    assert (table.column("ref_start") == -1).all() and table.cigar(39) == ""
+
+
+def test_coordinates_come_from_the_traceback(tmp_path):
+    # The aligned residues also occur at the start of seq1; the alignment uses the suffix
+    seq1, seq2 = "GATTACAGGGGGGGGGATTACA", "GATTACATTTT"
+    for aligner in (SemiGlobal(AlignmentScoring(), "overlap"), PointerSemiGlobal(AlignmentScoring(), "overlap")):
+        with ResultWriter(tmp_path / type(aligner).__name__) as writer:
+            align_pairs(aligner, [(0, seq1, 0, seq2)], writer=writer)
+        table = ResultTable(tmp_path / type(aligner).__name__)
+        assert [table.column(name)[0] for name in ("ref_start", "ref_end", "query_start", "query_end")] == [15, 22, 0, 7]
@@ -0,0 +1,65 @@
+"""
+Tests for the downsampled DP matrix view
+Run with: python -m pytest tests/test_heatmap.py
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.algorithms import AlignmentScoring, NeedlemanWunsch, SmithWaterman, _encode, _fill_matrix
+from src.heatmap import matrix_view, pooled_matrix
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_pooled_matrix_matches_block_reduction(local):
+    rng = random.Random(40)
+    scoring = AlignmentScoring(2, -1, -2)
+    seq1, seq2 = random_dna(57, rng), random_dna(43, rng)
+    F = _fill_matrix(_encode(seq1), _encode(seq2), scoring, local=local)
+
+    for reduce, func in (("max", np.max), ("mean", np.mean)):
+        pooled, rows, cols, _ = pooled_matrix(seq1, seq2, scoring, local, max_side=10, reduce=reduce)
+        assert pooled.shape == (10, 10)
+        expected = [[func(F[rows[r]:rows[r+1], cols[c]:cols[c+1]]) for c in range(10)] for r in range(10)]
+        assert np.allclose(pooled, expected)
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_path_follows_alignment(local):
+    rng = random.Random(41)
+    scoring = AlignmentScoring(1, -1, -2)
+    seq1 = random_dna(30, rng)
+    seq2 = seq1[5:20] + random_dna(4, rng) + seq1[20:]
+    aligner = SmithWaterman(scoring) if local else NeedlemanWunsch(scoring)
+    _, aligned1, aligned2 = aligner.align(seq1, seq2)
+
+    # One pixel per cell: the path is the traceback itself
+    view = matrix_view(seq1, seq2, scoring, aligned1, aligned2, local=local, max_side=100)
+    steps = np.diff(view.path, axis=0)
+    assert np.all((steps >= 0) & (steps <= 1)) and np.all(steps.sum(axis=1) > 0)
+    assert tuple(view.path[-1]) == view.end
+    if not local:
+        assert tuple(view.path[0]) == (0, 0) and view.end == (len(seq1), len(seq2))
+    i, j = view.path[0]
+    assert seq1[i:view.end[0]] == aligned1.replace('-', '')
+    assert seq2[j:view.end[1]] == aligned2.replace('-', '')
+
+
+def test_view_size_is_bounded():
+    rng = random.Random(42)
+    scoring = AlignmentScoring(1, -1, -2)
+    seq1 = random_dna(3000, rng)
+    seq2 = seq1[:1500] + seq1[1510:]
+    _, aligned1, aligned2 = NeedlemanWunsch(scoring).align(seq1, seq2)
+
+    view = matrix_view(seq1, seq2, scoring, aligned1, aligned2, max_side=64)
+    assert view.shape == (64, 64)
+    assert len(view.path) <= 2 * 64
+    assert view.to_rgb().shape == (64, 64, 3)
+    assert view.to_rgb(min_side=200).shape == (256, 256, 3)
@@ -0,0 +1,56 @@
+"""
+Tests for incremental re-alignment
+Run with: python -m pytest tests/test_incremental.py
+"""
+
+import random
+
+import pytest
+
+from src.algorithms import AlignmentScoring, NeedlemanWunsch, SmithWaterman
+from src.incremental import IncrementalAligner
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_edits_match_full_alignment(local):
+    rng = random.Random(41)
+    scoring = AlignmentScoring(2, -1, -2)
+    incremental = IncrementalAligner(scoring, local=local, max_states=2)
+    reference = SmithWaterman(scoring) if local else NeedlemanWunsch(scoring)
+    seq1, seq2 = random_dna(120, rng), random_dna(100, rng)
+    reused = 0
+
+    for step in range(30):
+        # Edit the end of seq1, seq2 or both
+        if step % 3 != 1:
+            seq1 = seq1[:rng.randrange(len(seq1))] + random_dna(rng.randint(1, 6), rng)
+        if step % 3 != 0:
+            seq2 = seq2[:rng.randrange(len(seq2))] + random_dna(rng.randint(1, 6), rng)
+        assert incremental.align(seq1, seq2) == reference.align(seq1, seq2)
+        reused += incremental.reused_cells
+    assert reused > 0
+
+
+def test_states_are_evicted():
+    rng = random.Random(42)
+    scoring = AlignmentScoring(1, -1, -2)
+    seq1, seq2 = random_dna(200, rng), random_dna(200, rng)
+
+    aligner = IncrementalAligner(scoring, max_states=2)
+    for k in range(5):
+        aligner.align(seq1 + "A" * k, seq2)
+    assert len(aligner._states) == 2
+    aligner.align(seq1 + "A" * 4, seq2)
+    assert aligner.reused_cells == 205 * 201
+
+    # A budget below one matrix keeps nothing
+    small = IncrementalAligner(scoring, memory_budget=1000)
+    small.align(seq1, seq2)
+    assert small.cached_bytes == 0
+
+    with pytest.raises(ValueError):
+        IncrementalAligner(AlignmentScoring(gap_open=-5, gap_extend=-1))
@@ -0,0 +1,69 @@
+"""
+Tests for progressive multiple sequence alignment
+Run with: python -m pytest tests/test_msa.py
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.algorithms import AlignmentScoring, NeedlemanWunsch
+from src.msa import ProgressiveAligner, neighbor_joining, upgma
+
+
+def related_sequences(count, length, edits, rng):
+    base = ''.join(rng.choice("ACGT") for _ in range(length))
+    sequences = []
+    for _ in range(count):
+        seq = list(base)
+        for _ in range(edits):
+            position, kind = rng.randrange(len(seq)), rng.random()
+            if kind < 0.6:
+                seq[position] = rng.choice("ACGT")
+            elif kind < 0.8:
+                del seq[position]
+            else:
+                seq.insert(position, rng.choice("ACGT"))
+        sequences.append(''.join(seq))
+    return base, sequences
+
+
+def test_guide_trees_join_closest_pairs():
+    D = np.array([
+        [0, 2, 9, 9],
+        [2, 0, 9, 9],
+        [9, 9, 0, 4],
+        [9, 9, 4, 0],
+    ], dtype=float)
+    assert upgma(D) == [(0, 1), (2, 3), (4, 5)]
+    merges = neighbor_joining(D)
+    assert len(merges) == 3 and merges[0] in [(0, 1), (2, 3)]
+    assert {node for merge in merges for node in merge} == set(range(6)) - {6}
+
+
+@pytest.mark.parametrize("guide_tree", ["upgma", "neighbor-joining"])
+def test_progressive_alignment(guide_tree):
+    rng = random.Random(43)
+    scoring = AlignmentScoring(1, -1, -2)
+    base, sequences = related_sequences(8, 120, 6, rng)
+
+    result = ProgressiveAligner(scoring, guide_tree).align(sequences)
+    rows = result.rows
+    assert [row.replace('-', '') for row in rows] == sequences
+    assert {len(row) for row in rows} == {len(result)}
+    assert result.profile.counts.sum(axis=1).tolist() == [len(sequences)] * len(result)
+    assert result.consensus().replace('-', '') == base
+
+
+def test_two_sequences_match_pairwise_score():
+    rng = random.Random(44)
+    scoring = AlignmentScoring(2, -1, -2)
+    _, sequences = related_sequences(2, 80, 8, rng)
+
+    rows = ProgressiveAligner(scoring).align(sequences).rows
+    score = sum(
+        0 if x == y == '-' else scoring.gap if '-' in (x, y) else scoring.similarity(x, y)
+        for x, y in zip(*rows)
+    )
+    assert score == NeedlemanWunsch(scoring).score(*sequences)
@@ -0,0 +1,67 @@
+"""
+Tests for the banded engine and the alignment planner
+Run with: python -m pytest tests/test_planner.py
+"""
+
+import random
+
+import pytest
+
+from src.algorithms import AlignmentScoring, NeedlemanWunsch, get_aligner
+from src.banded import BandedNeedlemanWunsch
+from src.batch import align_one_vs_many
+from src.mutations import mutate_seq
+from src.planner import AlignmentPlanner
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+def rescore(aligned1, aligned2, scoring):
+    return sum(
+        scoring.gap if '-' in (x, y) else scoring.similarity(x, y)
+        for x, y in zip(aligned1, aligned2)
+    )
+
+
+def test_banded_score_is_optimal():
+    rng = random.Random(381)
+    scoring = AlignmentScoring(2, -3, -4)
+    for trial in range(40):
+        seq1 = random_dna(rng.randint(1, 120), rng)
+        seq2 = mutate_seq(seq1, n_mutations=rng.randint(0, 8), seed=trial)[0] if trial % 2 else random_dna(90, rng)
+        score, aligned1, aligned2 = BandedNeedlemanWunsch(scoring, bandwidth=2).align(seq1, seq2)
+        assert score == NeedlemanWunsch(scoring).align(seq1, seq2)[0]
+        assert rescore(aligned1, aligned2, scoring) == score
+        assert aligned1.replace('-', '') == seq1 and aligned2.replace('-', '') == seq2
+
+
+def test_planner_strategies():
+    scoring = AlignmentScoring(2, -3, -4)
+    planner = AlignmentPlanner(memory_budget=64 * 2**20)
+    assert planner.plan("global", scoring, 1000, 1000).strategy == "full"
+    assert planner.plan("local", scoring, 5000, 5000).strategy == "pointer-compressed"
+    assert planner.plan("global", scoring, 20_000, 20_000).strategy == "banded"
+    assert planner.plan("local", scoring, 50_000, 50_000).strategy == "linear-space"
+    assert planner.plan("global", scoring, 50_000, 50_000, traceback=False).strategy == "score-only"
+    assert planner.plan("local", scoring, 100, 100, traceback=False).aligner.workers == 1
+    with pytest.raises(MemoryError):
+        planner.plan("semi-global", scoring, 50_000, 50_000)
+    with pytest.raises(TimeoutError):
+        AlignmentPlanner(time_budget=1e-3).plan("local", scoring, 50_000, 50_000)
+
+
+def test_planned_aligner_under_tight_budget():
+    rng = random.Random(382)
+    scoring = AlignmentScoring(2, -3, -4)
+    query = random_dna(2000, rng)
+    targets = [mutate_seq(query, n_mutations=20, seed=seed)[0] for seed in range(3)]
+
+    # Too small for a 2000x2000 pointer matrix
+    planner = AlignmentPlanner(memory_budget=3.5 * 2**20)
+    for engine in ("global", "local"):
+        assert planner.plan(engine, scoring, 2000, 2000).strategy in ("banded", "linear-space")
+        results = align_one_vs_many(planner.aligner(engine, scoring), query, targets)
+        expected = get_aligner(engine, scoring)
+        assert [r.score for r in results] == [expected.score(t, query) for t in targets]
@@ -0,0 +1,105 @@
+"""
+Tests for the sliding-window genome scan
+Run with: python -m pytest tests/test_scan.py
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.algorithms import AlignmentScoring, SmithWaterman, _residues, reverse_complement
+from src.scan import GenomeScanner, _peaks, fasta_chunks, max_hit_span, sliding_windows
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+def test_windows_cover_the_records():
+    rng = random.Random(42)
+    genome = random_dna(10_000, rng)
+    chunks = [("chr", genome[k:k+333]) for k in range(0, len(genome), 333)] + [("plasmid", "ACGT" * 10)]
+
+    windows = list(sliding_windows(chunks, window=1000, overlap=200))
+    chr_windows = [(start, seq) for record, start, seq in windows if record == "chr"]
+    assert all(genome[start:start+len(seq)] == seq for start, seq in chr_windows)
+    assert chr_windows[-1][0] + len(chr_windows[-1][1]) == len(genome)
+    assert all(b[0] - a[0] == 800 for a, b in zip(chr_windows, chr_windows[1:]))
+    assert windows[-1] == ("plasmid", 0, "ACGT" * 10)
+
+
+def test_scan_finds_planted_hits(tmp_path):
+    rng = random.Random(43)
+    scoring = AlignmentScoring(1, -1, -2)
+    query = random_dna(200, rng)
+    variant = query[:80] + query[83:150] + "T" + query[151:]
+    reverse = _residues(reverse_complement(query))
+    genome = random_dna(7000, rng) + variant + random_dna(5000, rng) + reverse + random_dna(3000, rng)
+
+    path = tmp_path / "genome.fasta"
+    lines = [genome[k:k+70] for k in range(0, len(genome), 70)]
+    path.write_text(">chr1 test genome\n" + "\n".join(lines) + "\n")
+    assert ''.join(chunk for _, chunk in fasta_chunks(path, chunk_size=1000)) == genome
+
+    # Windows of 1500 residues put both hits near or across window boundaries
+    scanner = GenomeScanner(scoring, min_score=120, window=1500, workers=2)
+    hits = list(scanner.scan_fasta(query, path, strand="both", chunk_size=1000))
+
+    assert [(hit.record, hit.strand) for hit in hits] == [("chr1", "+"), ("chr1", "-")]
+    forward, backward = hits
+    assert forward.score == SmithWaterman(scoring).score(genome[6500:8000], query)
+    assert genome[forward.ref_start:forward.ref_end] == forward.aligned_ref.replace('-', '')
+    start = 7000 + len(variant) + 5000
+    assert (backward.score, backward.ref_start, backward.ref_end) == (200, start, start + 200)
+
+
+def test_scan_reports_every_hit_once():
+    rng = random.Random(44)
+    scoring = AlignmentScoring(1, -1, -2)
+    query = random_dna(200, rng)
+    first = query[:60] + query[62:]                     # Two deletions
+    second = query[:120] + "A" + query[121:]
+    genome = random_dna(3000, rng) + first + random_dna(4000, rng) + second + random_dna(2500, rng)
+    starts = (3000, 3000 + len(first) + 4000)
+
+    # Both copies share the first window; the second puts a window start inside the first copy
+    for window in (20_000, 1267):
+        scanner = GenomeScanner(scoring, min_score=100, window=window)
+        hits = list(scanner.scan(query, [("chr", genome)]))
+        assert [hit.ref_start for hit in hits] == list(starts)
+        for hit, start in zip(hits, starts):
+            copy = genome[start:start+len(query)+2]
+            assert hit.score == SmithWaterman(scoring).score(copy, query)
+            assert genome[hit.ref_start:hit.ref_end] == hit.aligned_ref.replace('-', '')
+
+
+def test_flat_tops_count_as_one_peak():
+    assert _peaks(np.array([0, 5, 5, 0]), 3, 3) == [2]
+    assert _peaks(np.array([0, 5, 5, 0, 5, 5, 0]), 3, 3) == [2, 5]
+    assert _peaks(np.array([0, 5, 5, 4, 5, 5, 0]), 3, 3) == [5]
+    assert _peaks(np.array([7, 7, 1, 7, 0]), 3, 3) == [1, 3]
+    assert _peaks(np.array([], dtype=np.int64), 3, 3) == []
+
+
+def test_scan_repeated_query():
+    scoring = AlignmentScoring(1, -1, -2)
+    hits = list(GenomeScanner(scoring, 4).scan("AAAAAA", [("c", "CCCCCCAAAAAAACCCCCC")]))
+    assert [(hit.score, hit.ref_start, hit.ref_end) for hit in hits] == [(6, 7, 13)]
+
+    rng = random.Random(45)
+    query = "ACGTTG" * 20
+    genome = random_dna(2000, rng) + query + query[:30] + random_dna(1500, rng) + query + random_dna(1000, rng)
+    for window in (20_000, 700):
+        hits = list(GenomeScanner(scoring, min_score=100, window=window).scan(query, [("chr", genome)]))
+        assert [hit.score for hit in hits] == [120, 120]
+        assert all(genome[hit.ref_start:hit.ref_end] == query for hit in hits)
+
+
+def test_overlap_must_bound_the_hit_span():
+    scoring = AlignmentScoring(3, -1, -2)  # match > |gap|: a hit can span more than twice the query
+    assert max_hit_span(100, scoring, min_score=50) == 100 + (300 - 50) // 2
+    with pytest.raises(ValueError):
+        list(GenomeScanner(scoring, min_score=50, overlap=200).scan("ACGT" * 25, [("chr", "ACGT" * 100)]))
+    with pytest.raises(ValueError):
+        GenomeScanner(AlignmentScoring(gap_open=-5, gap_extend=-1), min_score=50)
@@ -0,0 +1,106 @@
+"""
+Tests for the local HTTP alignment service
+Run with: python -m pytest tests/test_service.py
+"""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from src.algorithms import AlignmentScoring, get_aligner
+from src.service import make_server, run_batch
+
+
+def _post(port, body):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/align", body=json.dumps(body))
+    response = conn.getresponse()
+    if response.getheader("Content-Type") == "application/x-ndjson":
+        data = [json.loads(line) for line in response if line.strip()]
+    else:
+        data = json.loads(response.read())
+    conn.close()
+    return response.status, data
+
+
+def test_service_single_batch_and_admission():
+    server = make_server(port=0, workers=2, max_pair_cells=10_000)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        status, result = _post(port, {"seq1": "GATTACA", "seq2": "GTCGACGC"})
+        expected = get_aligner("global", AlignmentScoring()).align("GATTACA", "GTCGACGC")
+        assert status == 200
+        assert (result["score"], result["aligned_seq1"], result["aligned_seq2"]) == expected
+
+        status, lines = _post(port, {
+            "algorithm": "local",
+            "score_only": True,
+            "pairs": [{"seq1": "AAAGGGTTTTCCCC", "seq2": "GGGTT"}, {"seq1": "ACGT", "seq2": "ACGT", "algorithm": "nope"}],
+        })
+        assert status == 200
+        by_index = {line["index"]: line for line in lines}
+        assert by_index[0]["score"] == 5
+        assert "error" in by_index[1]
+
+        status, result = _post(port, {"seq1": "A" * 200, "seq2": "A" * 200})
+        assert status == 413
+
+        status, result = _post(port, {"seq1": "ACGT"})
+        assert status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.service.close()
+
+
+def test_bad_jobs_fail_alone():
+    job = {"algorithm": 5, "scoring": (), "strand": "+", "score_only": True, "seq1": "ACGT", "seq2": "ACGT"}
+    good = dict(job, algorithm="global")
+    (ok, message), (good_ok, result) = run_batch([job, good])
+    assert ok is None and "AttributeError" in message
+    assert good_ok and result["score"] == 4
+
+    server = make_server(port=0, workers=1, max_wait=0.05)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        results = {}
+
+        def post(name, body):
+            results[name] = _post(port, body)
+
+        clients = [
+            threading.Thread(target=post, args=("bad", {"seq1": "ACGT", "seq2": "ACGT", "algorithm": 5})),
+            threading.Thread(target=post, args=("scoring", {"seq1": "ACGT", "seq2": "ACGT", "scoring": {"gap": "x"}})),
+            threading.Thread(target=post, args=("good", {"seq1": "ACGT", "seq2": "ACGT"})),
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        assert results["bad"][0] == 400
+        assert results["scoring"][0] == 400
+        assert results["good"] == (200, {"score": 4, "aligned_seq1": "ACGT", "aligned_seq2": "ACGT", "strand": "+"})
+
+        # A string flag is truthy, so only JSON booleans are accepted
+        for payload in ({"pairs": [{"seq1": "ACGT", "seq2": "ACGT", "score_only": "false"}]},
+                        {"seq1": "ACGT", "seq2": "ACGT", "score_only": 1}):
+            with pytest.raises(ValueError):
+                server.service.parse_jobs(payload)
+        assert _post(port, {"pairs": [{"seq1": "ACGT", "seq2": "ACGT", "score_only": "false"}]})[0] == 400
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.putrequest("POST", "/align")
+        conn.putheader("Content-Length", "abc")
+        conn.endheaders()
+        assert conn.getresponse().status == 400
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.service.close()
@@ -0,0 +1,40 @@
+"""
+Tests for the tiled wavefront aligners
+Run with: python -m pytest tests/test_tiled.py
+"""
+
+import random
+
+import pytest
+
+from src.algorithms import AlignmentScoring, NeedlemanWunsch, SmithWaterman
+from src.mutations import mutate_seq
+from src.tiled import TiledNeedlemanWunsch, TiledSmithWaterman
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+
+@pytest.mark.parametrize("tiled, reference", [
+    (TiledNeedlemanWunsch, NeedlemanWunsch),
+    (TiledSmithWaterman, SmithWaterman),
+])
+def test_tiled_matches_full_matrix(tiled, reference):
+    rng = random.Random(36)
+    scoring = AlignmentScoring(2, -1, -2)
+    # Small tiles and a tight budget force several checkpoint bands
+    aligner = tiled(scoring, tile_size=7, memory_budget=25_000, workers=3)
+    for _ in range(20):
+        seq1 = random_dna(rng.randint(0, 150), rng)
+        seq2, _ = mutate_seq(seq1, n_mutations=10, seed=rng.randint(0, 999)) if seq1 else ("ACGT", None)
+        expected = reference(scoring).align(seq1, seq2)
+        assert aligner.align(seq1, seq2) == expected
+        assert aligner.score(seq1, seq2) == expected[0]
+
+
+def test_tiled_memory_budget():
+    aligner = TiledNeedlemanWunsch(AlignmentScoring(), tile_size=64, memory_budget=4 * 2**20)
+    assert aligner.band_rows(10_000, 10_000) > 1
+    with pytest.raises(MemoryError):
+        aligner.band_rows(10**7, 10**7)